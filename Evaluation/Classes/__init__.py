@@ -4,4 +4,15 @@
 Classes for the evaluation of the survey results from LimeSurvey.
 """
 
-from .save_fig import SaveFig
\ No newline at end of file
+from .artifacts import ARTIFACTS, ArtifactWriter
+from .figure_files import FORMATS, FigureFiles
+from .figure_spec import FigureSpec, figure
+from .render_pool import plan_figures, render_figures
+
+def __getattr__(name: str):
+    # SaveFig is a matplotlib figure; Import matplotlib only once it is needed
+    if name == 'SaveFig':
+        from .save_fig import SaveFig
+        return SaveFig
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Write the generated files (figures, TeX snippets, manifests) only when their content changes.
+"""
+
+from contextlib import contextmanager
+import hashlib
+import io
+import json
+import os
+import stat
+import tempfile
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, TextIO
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+# Salt of the ids of the SVG elements; Random by default, so every rendering differed
+SVG_HASH_SALT = 'STUPA-Vollsolidar-Statistik'
+
+# Metadata of the images without the dates of their rendering
+METADATA: Dict[str, Dict[str, Any]] = {
+    'svg': {'Date': None},
+    'pdf': {'CreationDate': None},
+}
+
+def digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def write_atomic(filename: str, data: bytes) -> None:
+    """
+    Replace the file with the data at once, keeping its permissions; Readers never see a partial file.
+    """
+
+    folder = os.path.dirname(filename) or '.'
+    os.makedirs(folder, exist_ok=True)
+
+    fd, tmp = tempfile.mkstemp(dir=folder, suffix='.tmp')
+
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+
+        os.chmod(tmp, stat.S_IMODE(os.stat(filename).st_mode) if os.path.exists(filename) else 0o644)
+        os.replace(tmp, filename)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+class ArtifactWriter:
+    """
+    Writes generated files only if their bytes changed, so unchanged files keep their modification time and latexmk
+    only rebuilds what depends on changed ones. Figures are rendered deterministically (fixed SVG ids, no dates).
+
+    Every write is recorded as created, changed or unchanged, with the digest of the content, for the manifest of the run.
+    """
+
+    __records: List[Dict[str, str]]
+
+    def __init__(self):
+        self.__records = []
+
+    @property
+    def records(self) -> List[Dict[str, str]]:
+        return self.__records
+
+    def write(self, filename: str, data: bytes | str) -> bool:
+        """
+        Write the data to the file unless it holds the same bytes already; Returns whether the file was written.
+        """
+
+        data = data.encode('utf-8') if isinstance(data, str) else data
+        content = digest(data)
+
+        status = 'created'
+
+        if os.path.exists(filename):
+            status = 'changed'
+
+            # Files of another size differ anyway
+            if os.path.getsize(filename) == len(data):
+                with open(filename, 'rb') as f:
+                    if digest(f.read()) == content:
+                        status = 'unchanged'
+
+        if status != 'unchanged':
+            write_atomic(filename, data)
+
+        self.__records.append({'filename': filename, 'status': status, 'digest': content})
+
+        return status != 'unchanged'
+
+    @contextmanager
+    def open(self, filename: str) -> Iterator[TextIO]:
+        """
+        Open a text file for writing; It is written on leaving the block, if its content changed.
+        """
+
+        buffer = io.StringIO()
+
+        yield buffer
+
+        self.write(filename, buffer.getvalue())
+
+    def savefig(self, fig: 'Figure', filename: str, format: str, **kwargs: Any) -> bool:
+        """
+        Render the figure deterministically into `filename`, in `format`; Returns whether the file was written.
+        """
+
+        from matplotlib import rc_context
+
+        buffer = io.BytesIO()
+
+        with rc_context({'svg.hashsalt': SVG_HASH_SALT}):
+            fig.savefig(buffer, format=format, metadata=METADATA.get(format), **kwargs)
+
+        return self.write(filename, buffer.getvalue())
+
+    def take(self, start: int=0) -> List[Dict[str, str]]:
+        """
+        Get and forget the records since the `start`-th one, e.g. to send the writes of a worker to the main process.
+        """
+
+        records = self.__records[start:]
+        del self.__records[start:]
+
+        return records
+
+    def extend(self, records: List[Dict[str, str]]) -> None:
+        self.__records.extend(records)
+
+    def manifest(self) -> Dict[str, Any]:
+        """
+        Get the written files by status and the digests of all files; Later writes of a file win.
+        """
+
+        files = {record['filename']: record for record in self.__records}
+
+        return {
+            **{
+                status: sorted(filename for filename, record in files.items() if record['status'] == status)
+                for status in ('created', 'changed', 'unchanged')
+            },
+            'digests': {filename: files[filename]['digest'] for filename in sorted(files)},
+        }
+
+    def write_manifest(self, filename: str) -> None:
+        write_atomic(filename, json.dumps(self.manifest(), indent=1).encode('utf-8'))
+
+    def format(self) -> str:
+        manifest = self.manifest()
+
+        return ', '.join(f'{len(manifest[status])} {status}' for status in ('created', 'changed', 'unchanged'))
+
+# Writer of this process; Forked workers inherit it and send their records back
+ARTIFACTS = ArtifactWriter()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Files of a figure: The image, the tex file including it and the manifest it was rendered with.
+"""
+
+import json
+import os
+from typing import Dict, List
+
+from .artifacts import ARTIFACTS
+
+# Formats figures can be saved in; SVG is included with the svg package (converted by Inkscape), the others with graphicx
+FORMATS = ['svg', 'pdf', 'png', 'jpg', 'jpeg']
+
+class FigureFiles:
+    """
+    Paths and staleness of the files of a figure; Checking them does not need matplotlib.
+    """
+
+    __folder_image = 'Build/Images'
+    __folder_tex = 'Build/TeX/Figures'
+    __folder_manifest = 'Build/Manifests'
+
+    __filename_image: str
+    __filename_preview: str | None
+    __filename_tex: str
+    __filename_manifest: str
+
+    __format: str
+
+    __caption: str
+
+    __basename: str
+
+    __language: str | None
+
+    __manifest: Dict[str, str] | None
+
+    @property
+    def filename_image(self):
+        return self.__filename_image
+
+    @property
+    def filename_preview(self):
+        return self.__filename_preview
+
+    @property
+    def filename_tex(self):
+        return self.__filename_tex
+
+    @property
+    def filename_manifest(self):
+        return self.__filename_manifest
+
+    @property
+    def manifest(self):
+        return self.__manifest
+
+    @property
+    def format(self):
+        return self.__format
+
+    @property
+    def caption(self):
+        return self.__caption
+
+    @property
+    def basename(self):
+        return self.__basename
+
+    @property
+    def language(self):
+        return self.__language
+
+    @property
+    def label(self):
+        return self.__basename if self.__language is None else f'{self.__basename} [{self.__language}]'
+
+    def __init__(
+            self,
+            filename: str,
+            caption: str='A Caption',
+            folder_image: str=None,
+            folder_tex: str=None,
+            manifest: Dict[str, str]=None,
+            language: str=None,
+            format: str=None,
+            preview: bool=False
+        ):
+        """
+        `manifest` fingerprints what the figure depends on; Without one, any change of the questions or the data outdates the figure.
+
+        With a `language`, the files go to the folders of that language (e.g. Build/Images/de). The image is saved as
+        `format` (by default the extension of the filename, else SVG); With `preview`, a PNG preview is saved next to it.
+        """
+
+        assert '/' not in filename, f"Invalid filename: {filename}"
+
+        self.__caption = caption
+        self.__language = language
+
+        if folder_image is not None:
+            self.__folder_image = folder_image
+
+        if folder_tex is not None:
+            self.__folder_tex = folder_tex
+
+        if language is not None:
+            self.__folder_image = os.path.join(self.__folder_image, language)
+            self.__folder_tex = os.path.join(os.path.dirname(self.__folder_tex), language, os.path.basename(self.__folder_tex))
+            self.__folder_manifest = os.path.join(self.__folder_manifest, language)
+
+        basename, extension = os.path.splitext(filename)
+
+        # A known extension selects the format, unless one is given
+        if extension[1:] in FORMATS:
+            format = format or extension[1:]
+        else:
+            basename = filename
+
+        self.__format = format or 'svg'
+
+        assert self.__format in FORMATS, f"Unsupported format: {self.__format}"
+
+        self.__basename = basename
+
+        self.__filename_image = os.path.join(self.__folder_image, f'{basename}.{self.__format}')
+        self.__filename_preview = os.path.join(self.__folder_image, f'{basename}.png') if preview and self.__format != 'png' else None
+        self.__filename_tex = os.path.join(self.__folder_tex, f'{basename}.tex')
+
+        self.__filename_manifest = os.path.join(self.__folder_manifest, f'{self.basename}.json')
+
+        # Changing the format rebuilds the figure, even if the image of the new format is left from an earlier run
+        if manifest is not None:
+            manifest = {**manifest, 'format': self.__format, **({'preview': 'png'} if self.__filename_preview else {})}
+
+        self.__manifest = manifest
+
+    def filenames(self) -> List[str]:
+        """
+        Get the files the figure is saved to: The image, its preview and the tex file.
+        """
+
+        return [self.__filename_image, *([self.__filename_preview] if self.__filename_preview else []), self.__filename_tex]
+
+    def has_changed(self):
+        # Check if the TeX file and the images exist
+        if not all(os.path.exists(filename) for filename in self.filenames()):
+            return True
+
+        if self.__manifest is not None:
+            return self.read_manifest() != self.__manifest
+
+        # Get last change timestamp for Evaluation/Data/Questions/__init__.py
+        last_change = os.path.getmtime('Evaluation/Data/Questions/__init__.py')
+
+        # Get last change timestamp for Evaluation/Data/*.json
+        last_change_json = max([
+            os.path.getmtime(
+                os.path.join('Evaluation/Data', file)
+            )
+            for file in os.listdir('Evaluation/Data') if file.endswith('.json')
+        ])
+
+        # Get Max of __init__.py and *.json
+        last_change = max(last_change, last_change_json)
+
+        # Get Min of the TeX file and the images
+        last_change_files = min(os.path.getmtime(filename) for filename in self.filenames())
+
+        return last_change > last_change_files
+
+    def read_manifest(self) -> Dict[str, str] | None:
+        try:
+            with open(self.filename_manifest, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def make_manifest(self):
+        """
+        Save the manifest the figure was rendered with.
+        """
+
+        if self.__manifest is None:
+            return
+
+        ARTIFACTS.write(self.filename_manifest, json.dumps(self.__manifest, indent=4, sort_keys=True))
+
+    def make_tex(self):
+        """
+        Save the figure as a tex file.
+        """
+
+        include_function = 'includesvg' if self.format == 'svg' else 'includegraphics'
+
+        with ARTIFACTS.open(self.filename_tex) as f:
+            f.write(f"""% TEX root = {os.path.relpath('Main.tex', os.path.dirname(self.filename_tex))}
+% Path: {self.filename_tex}
+\\begin{{figure}}[H]
+    \\centering
+    \\{include_function}[width=0.95\\textwidth]{{{self.filename_image}}} % Include the {self.format} file
+    \\caption{{{self.caption}}}
+    \\label{{fig:{self.basename}}}
+\\end{{figure}}""")
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Declarative registry of the figures of the evaluation.
+"""
+
+from fnmatch import fnmatchcase
+import hashlib
+import inspect
+import json
+import os
+import types
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping
+
+from ..Data.Questions import density as density_module, language as language_module, question as question_module, regression as regression_module, significance as significance_module
+from ..Data.Questions.language import translate
+from ..Data.Questions.memo import fingerprint
+from ..Data.Questions.question import Question, WEIGHT_COLUMN
+from .figure_files import FORMATS, FigureFiles
+
+if TYPE_CHECKING:
+    from .save_fig import SaveFig
+
+# Sources whose changes outdate every figure
+LIBRARY_SOURCES = [
+    question_module.__file__,
+    language_module.__file__,
+    density_module.__file__,
+    regression_module.__file__,
+    significance_module.__file__,
+    os.path.join(os.path.dirname(__file__), 'save_fig.py'),
+    os.path.join(os.path.dirname(__file__), 'figure_files.py'),
+]
+
+def digest(*parts: Any) -> str:
+    return hashlib.blake2b(''.join(map(str, parts)).encode(), digest_size=16).hexdigest()
+
+def read_source(filename: str) -> str:
+    with open(filename, 'r', encoding='utf-8') as f:
+        return f.read()
+
+class FigureSpec:
+    """
+    Named figure: its caption, the datasets it reads and the function rendering it.
+
+    The render function is called as `render(fig, *datasets, **params)` with the datasets named by `inputs`. A `format`
+    saves the figure in that format whatever the format of the run (e.g. 'png' for figures too detailed for vectors).
+    """
+
+    __name: str
+    __caption: str
+    __inputs: List[str]
+    __render: Callable[..., None]
+    __params: Dict[str, Any]
+    __format: str | None
+
+    # Static property for all figures, in order of registration
+    FIGURES: Dict[str, 'FigureSpec'] = {}
+
+    @staticmethod
+    def add_figure(spec: 'FigureSpec') -> None:
+        assert spec.name not in FigureSpec.FIGURES, f"Figure '{spec.name}' is registered twice"
+        FigureSpec.FIGURES[spec.name] = spec
+
+    @staticmethod
+    def select(patterns: List[str] | None=None) -> List['FigureSpec']:
+        """
+        Get the figures matching any of the names or glob patterns; All figures if no patterns are given.
+        """
+
+        if not patterns:
+            return list(FigureSpec.FIGURES.values())
+
+        selected = [
+            spec for name, spec in FigureSpec.FIGURES.items()
+            if any(fnmatchcase(name, pattern) for pattern in patterns)
+        ]
+
+        if not selected:
+            raise KeyError(f"No figure matches {', '.join(patterns)}")
+
+        return selected
+
+    def __init__(self, name: str, caption: str, inputs: List[str], render: Callable[..., None], params: Dict[str, Any]=None, format: str | None=None):
+        assert format is None or format in FORMATS, f"Unsupported format of figure '{name}': {format}"
+
+        self.__name = name
+        self.__caption = caption
+        self.__inputs = inputs
+        self.__render = render
+        self.__params = params or {}
+        self.__format = format
+
+        FigureSpec.add_figure(self)
+
+    def __repr__(self) -> str:
+        return f'FigureSpec("{self.__name}", inputs={self.__inputs})'
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def caption(self) -> str:
+        return translate(self.__caption)
+
+    @property
+    def inputs(self) -> List[str]:
+        return self.__inputs
+
+    @property
+    def render(self) -> Callable[..., None]:
+        return self.__render
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        return self.__params
+
+    @property
+    def format(self) -> str | None:
+        return self.__format
+
+    def references(self) -> Dict[str, Any]:
+        """
+        Get the globals (questions, palettes, ...) the render function refers to, including nested functions.
+        """
+
+        names = set()
+        codes = [self.__render.__code__]
+
+        while codes:
+            code = codes.pop()
+            names.update(code.co_names)
+            codes.extend(const for const in code.co_consts if isinstance(const, types.CodeType))
+
+        return {
+            name: self.__render.__globals__[name] for name in sorted(names)
+            if name in self.__render.__globals__ and not isinstance(self.__render.__globals__[name], (types.ModuleType, types.FunctionType, type))
+        }
+
+    def questions(self) -> List[Question]:
+        return [value for value in self.references().values() if isinstance(value, Question)]
+
+    def fingerprint(self, datasets: Mapping[str, Any]) -> Dict[str, str]:
+        """
+        Fingerprint everything the figure depends on: The columns it reads, the questions, the parameters and the code.
+        """
+
+        questions = self.questions()
+        columns = [column for question in questions for column in question.columns]
+
+        data = []
+
+        for name in self.__inputs:
+            df = datasets[name]
+            # Frames without question columns (like the funnel) are fingerprinted as a whole
+            used = [column for column in dict.fromkeys(columns + [WEIGHT_COLUMN]) if column in df.columns] or list(df.columns)
+
+            data.append(f'{name}:{len(df)}:{fingerprint(df, used)}')
+
+        others = {
+            name: value for name, value in self.references().items()
+            if not isinstance(value, Question)
+        }
+
+        return {
+            'data': digest(*data),
+            'questions': digest(*[f'{question!r}:{question.type.value}' for question in questions]),
+            'params': digest(json.dumps(self.__params, sort_keys=True, default=repr)),
+            'code': digest(inspect.getsource(self.__render), repr(others)),
+            'library': digest(*map(read_source, LIBRARY_SOURCES)),
+        }
+
+    def files(self, manifest: Dict[str, str]=None, language: str=None, format: str=None, preview: bool=False) -> FigureFiles:
+        """
+        Get the files of the figure; Its own format takes precedence over the `format` of the run.
+        """
+
+        return FigureFiles(self.__name, translate(self.__caption, language), manifest=manifest, language=language, format=self.__format or format, preview=preview)
+
+    def save_fig(self, force: bool=False, manifest: Dict[str, str]=None, language: str=None, format: str=None, preview: bool=False) -> 'SaveFig':
+        # Import matplotlib only once a figure is drawn
+        from .save_fig import SaveFig
+
+        return SaveFig(
+            self.__name, translate(self.__caption, language), force=force, manifest=manifest, language=language,
+            format=self.__format or format, preview=preview
+        )
+
+    def draw(self, fig: 'SaveFig', datasets: Mapping[str, Any]) -> None:
+        self.__render(fig, *[datasets[name] for name in self.__inputs], **self.__params)
+
+def figure(name: str, caption: str, inputs: List[str]=[], format: str | None=None, **params: Any) -> Callable[[Callable[..., None]], Callable[..., None]]:
+    """
+    Register the decorated function as the render function of a figure; With a `format`, the figure is always saved in it.
+    """
+
+    def register(render: Callable[..., None]) -> Callable[..., None]:
+        FigureSpec(name, caption, list(inputs), render, params, format)
+        return render
+
+    return register
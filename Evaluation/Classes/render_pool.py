@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Render the outdated figures concurrently in a process pool.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from fnmatch import fnmatchcase
+import io
+import multiprocessing
+import os
+import traceback
+from typing import Any, Dict, List, Mapping, Tuple
+
+from ..Data.Questions.instrumentation import RECORDER, profiled
+from ..Data.Questions.language import LANGUAGES, use_language
+from .artifacts import ARTIFACTS
+from .figure_spec import FigureSpec
+
+# Figures and datasets of the running pool; Inherited by the forked workers, so nothing needs to be pickled
+_JOBS: List[Tuple[FigureSpec, Dict[str, str], List[str]]] = []
+_DATASETS: Mapping[str, Any] = {}
+_FORCE: bool = False
+
+# Format of the figures without one of their own and whether PNG previews are saved
+_FORMAT: str | None = None
+_PREVIEW: bool = False
+
+# Figures to profile with cProfile (names or glob patterns) and the folder of the profiles
+_PROFILE: List[str] = []
+FOLDER_PROFILES = 'Build/Profiles'
+
+def render_job(index: int) -> Tuple[str, str | None, List[Dict[str, Any]], List[Dict[str, str]]]:
+    """
+    Render the outdated languages of one figure; Returns the log of the figure, the formatted error, if any, the recorded spans and the written files.
+
+    The languages share the process, so the transforms of the figure are computed once for all of them.
+    """
+
+    spec, manifest, languages = _JOBS[index]
+
+    log = io.StringIO()
+    error = None
+
+    # Spans and files recorded before (inherited by a forked worker) stay where they are
+    start = len(RECORDER.spans)
+    start_artifacts = len(ARTIFACTS.records)
+
+    with redirect_stdout(log):
+        try:
+            for language in languages:
+                profile = os.path.join(FOLDER_PROFILES, language, f'{spec.name}.prof') if any(fnmatchcase(spec.name, pattern) for pattern in _PROFILE) else None
+
+                with use_language(language), profiled(profile):
+                    spec.save_fig(force=_FORCE, manifest=manifest, language=language, format=_FORMAT, preview=_PREVIEW).render(lambda fig: spec.draw(fig, _DATASETS))
+        except Exception:
+            error = traceback.format_exc()
+
+    return log.getvalue(), error, RECORDER.take(start), ARTIFACTS.take(start_artifacts)
+
+def plan_figures(
+        specs: List[FigureSpec],
+        datasets: Mapping[str, Any],
+        languages: List[str]=LANGUAGES,
+        format: str | None=None,
+        preview: bool=False
+    ) -> List[Tuple[FigureSpec, Dict[str, str], List[str]]]:
+    """
+    Get the fingerprint of each of the figures and the languages it differs from the one it was last rendered with (in `format`).
+    """
+
+    plan = []
+
+    for spec in specs:
+        with RECORDER.stage(f'fingerprint:{spec.name}', 'plan'):
+            manifest = spec.fingerprint(datasets)
+
+        plan.append((spec, manifest, [language for language in languages if spec.files(manifest, language, format, preview).has_changed()]))
+
+    return plan
+
+def render_figures(
+        specs: List[FigureSpec],
+        datasets: Mapping[str, Any],
+        workers: int | None=None,
+        force: bool=False,
+        languages: List[str]=LANGUAGES,
+        profile: List[str] | None=None,
+        format: str | None=None,
+        preview: bool=False
+    ) -> None:
+    """
+    Render the outdated figures of `specs` (all of them if `force`) in each of the `languages`, using up to `workers` processes (default: all cores).
+
+    Figures without a format of their own are saved as `format` (SVG by default), with a PNG preview if `preview`.
+
+    Logs are printed in the order of `specs`; Failed figures are reported after all others finished. The figures matching
+    `profile` are profiled with cProfile into `FOLDER_PROFILES`; The spans and files of the workers are merged into this process.
+    """
+
+    global _JOBS, _DATASETS, _FORCE, _PROFILE, _FORMAT, _PREVIEW
+
+    _JOBS = [
+        (spec, manifest, list(languages) if force else outdated)
+        for spec, manifest, outdated in plan_figures(specs, datasets, languages, format, preview)
+    ]
+    _DATASETS = datasets
+    _FORCE = force
+    _PROFILE = list(profile or [])
+    _FORMAT = format
+    _PREVIEW = preview
+
+    outdated = [index for index, (_, _, languages_outdated) in enumerate(_JOBS) if languages_outdated]
+
+    workers = min(workers or os.cpu_count() or 1, max(len(outdated), 1))
+
+    # Forking shares the loaded data with the workers; Elsewhere render in this process
+    if workers > 1 and 'fork' in multiprocessing.get_all_start_methods():
+        executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('fork'))
+        results = {index: executor.submit(render_job, index) for index in outdated}
+    else:
+        executor = None
+        results = {}
+
+    errors: List[Tuple[str, str]] = []
+
+    try:
+        for index, (spec, _, languages_outdated) in enumerate(_JOBS):
+            for language in languages:
+                if language not in languages_outdated:
+                    print(f'\x1b[1;32m[INFO]\x1b[0m Making {spec.name} [{language}]')
+                    print(f'\x1b[1;32m[INFO]\x1b[0m {spec.name} [{language}] is up to date.')
+
+            if index not in outdated:
+                continue
+
+            log, error, spans, records = results[index].result() if executor is not None else render_job(index)
+
+            print(log, end='')
+            RECORDER.extend(spans)
+            ARTIFACTS.extend(records)
+
+            if error is not None:
+                errors.append((spec.name, error))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    for filename, error in errors:
+        print(f'\x1b[1;31m[ERROR]\x1b[0m {filename} failed:\n{error}')
+
+    if errors:
+        raise RuntimeError(f"Failed to render {', '.join(filename for filename, _ in errors)}")
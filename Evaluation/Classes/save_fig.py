@@ -4,158 +4,145 @@
 Save figures to the Output/Images folder.
 """
 
-import inspect
-import os
-import sys
+from typing import Callable, Dict
 from matplotlib.figure import Figure
 
-class SkipWithBlock(Exception):
-    pass
+from ..Data.Questions.instrumentation import RECORDER
+from .artifacts import ARTIFACTS
+from .figure_files import FigureFiles
+
+# Resolution of raster images for print and of the previews
+RASTER_FORMATS = ['png', 'jpg', 'jpeg']
+RASTER_DPI = 300
+PREVIEW_DPI = 100
 
 class SaveFig(Figure):
     """
     Save figures to the Output/Images folder and create a tex file for the figure.
+
+    Used as a context manager, the figure is always saved on exit; `render` skips figures that are up to date.
     """
 
-    __folder_svg = 'Build/Images'
-    __folder_tex = 'Build/TeX/Figures'
+    __files: FigureFiles
 
-    __filename_svg: str
-    __filename_tex: str
-    
-    __format: str
+    __force: bool
 
-    __caption: str
+    @property
+    def files(self):
+        return self.__files
 
-    __basename: str
+    @property
+    def filename_image(self):
+        return self.__files.filename_image
 
     @property
-    def filename_svg(self):
-        return self.__filename_svg
+    def filename_preview(self):
+        return self.__files.filename_preview
 
     @property
     def filename_tex(self):
-        return self.__filename_tex
-    
+        return self.__files.filename_tex
+
+    @property
+    def filename_manifest(self):
+        return self.__files.filename_manifest
+
+    @property
+    def manifest(self):
+        return self.__files.manifest
+
     @property
     def format(self):
-        return self.__format
-    
+        return self.__files.format
+
     @property
     def caption(self):
-        return self.__caption
-    
+        return self.__files.caption
+
     @property
     def basename(self):
-        return self.__basename
+        return self.__files.basename
+
+    @property
+    def language(self):
+        return self.__files.language
+
+    def __init__(
+            self,
+            filename: str,
+            caption: str='A Caption',
+            folder_image: str=None,
+            folder_tex: str=None,
+            force: bool=False,
+            manifest: Dict[str, str]=None,
+            language: str=None,
+            format: str=None,
+            preview: bool=False
+        ):
+        """
+        `manifest` fingerprints what the figure depends on; Without one, any change of the questions or the data outdates the figure.
 
-    def __init__(self, filename: str, caption: str='A Caption', folder_svg: str=None, folder_tex: str=None):
-        assert '/' not in filename, f"Invalid filename: {filename}"
+        The figure is drawn once and saved as `format` (SVG by default) and, with `preview`, as a PNG preview.
+        """
 
-        self.__caption = caption
+        self.__files = FigureFiles(filename, caption, folder_image, folder_tex, manifest, language, format, preview)
+        self.__force = force
 
-        if folder_svg is not None:
-            self.__folder_svg = folder_svg
+        super().__init__()
 
-        if folder_tex is not None:
-            self.__folder_tex = folder_tex
+    def __enter__(self):
+        return self
 
-        self.__filename_svg = os.path.join(self.__folder_svg, filename)
-        self.__filename_tex = os.path.join(self.__folder_tex, filename)
+    def render(self, draw: Callable[['SaveFig'], None]) -> bool:
+        """
+        Draw and save the figure by calling `draw(self)`, unless it is up to date; Returns whether it was drawn.
+        """
 
-        self.__format = filename.split('.')[-1]
-    
-        if filename.count('.') == 0 or format not in ['png', 'jpg', 'jpeg', 'pdf', 'svg']:
-            self.__format = 'svg'
-            self.__filename_svg += '.svg'
-            self.__filename_tex += '.tex'
-        else:
-            self.__filename_tex = filename.replace(self.format, 'tex')
+        print(f'\x1b[1;32m[INFO]\x1b[0m Making {self.files.label}')
 
-        self.__basename = filename.replace(f'.{self.format}', '')
+        if not self.__force and not self.has_changed():
+            print(f'\x1b[1;32m[INFO]\x1b[0m {self.files.label} is up to date.')
+            return False
 
-        super().__init__()
+        print(f'\x1b[1;33m[INFO]\x1b[0m {self.files.label} is outdated.')
+
+        # Drawing includes the transforms the figure aggregates its data with; Saving renders the artists into the files
+        with RECORDER.stage(self.files.label, 'figure'):
+            with self:
+                with RECORDER.stage('draw', 'draw'):
+                    draw(self)
+
+        return True
 
-    def __enter__(self):
-        print(f'\x1b[1;32m[INFO]\x1b[0m Making {self.basename}')
-        if not self.has_changed():
-            print(f'\x1b[1;32m[INFO]\x1b[0m {self.basename} is up to date.')
-            # Do some magic
-            sys.settrace(lambda *args, **keys: None)
-            frame = sys._getframe(1)
-            frame.f_trace = self.trace
-        else:
-            print(f'\x1b[1;33m[INFO]\x1b[0m {self.basename} is outdated.')
-            return self
-            
-    def trace(self, frame, event, arg):
-        raise SkipWithBlock()
-    
     def has_changed(self):
-        # Check if the TeX and SVG files exist
-        if not os.path.exists(self.filename_tex) or not os.path.exists(self.filename_svg):
-            return True
-
-        # Get last change timestamp for Evaluation/Data/Questions/__init__.py
-        last_change = os.path.getmtime('Evaluation/Data/Questions/__init__.py')
-
-        # Get last change timestamp for Evaluation/Data/*.json
-        last_change_json = max([
-            os.path.getmtime(
-                os.path.join('Evaluation/Data', file)
-            )
-            for file in os.listdir('Evaluation/Data') if file.endswith('.json')
-        ])
-    
-        # Get Last Changes for the TeX and SVG files
-        last_change_tex = os.path.getmtime(self.filename_tex)
-        last_change_svg = os.path.getmtime(self.filename_svg)
-
-        # Get Max of __init__.py and *.json
-        last_change = max(last_change, last_change_json)
-
-        # Get Min of TeX and SVG
-        last_change_tex = min(last_change_tex, last_change_svg)
-
-        return last_change > last_change_tex
-
-    def make_svg(self):
+        return self.__files.has_changed()
+
+    def make_image(self):
         """
-        Save the figure as SVG.
+        Save the figure in its format and its preview, if any; Files whose bytes did not change are left alone.
         """
 
-        if not os.path.exists(os.path.dirname(self.filename_svg)):
-            os.makedirs(os.path.dirname(self.filename_svg))
+        ARTIFACTS.savefig(self, self.filename_image, format=self.format, dpi=RASTER_DPI if self.format in RASTER_FORMATS else 'figure')
 
-        self.savefig(self.filename_svg, format=self.format)
+        if self.filename_preview is not None:
+            ARTIFACTS.savefig(self, self.filename_preview, format='png', dpi=PREVIEW_DPI)
 
     def make_tex(self):
         """
         Save the figure as a tex file.
         """
 
-        if not os.path.exists(os.path.dirname(self.filename_tex)):
-            os.makedirs(os.path.dirname(self.filename_tex))
-
-        include_function = 'includesvg' if self.format == 'svg' else 'includegraphics'
-
-        with open(self.filename_tex, 'w') as f:
-            f.write(f"""% TEX root = ../../../Main.tex
-% Path: {self.filename_tex}
-\\begin{{figure}}[H]
-    \\centering
-    \\{include_function}[width=0.95\\textwidth]{{{self.filename_svg}}} % Include the {self.format} file
-    \\caption{{{self.caption}}}
-    \\label{{fig:{self.basename}}}
-\\end{{figure}}""")
+        self.__files.make_tex()
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        if exc_type is SkipWithBlock:
-            return True
-        elif exc_type is not None:
+        if exc_type is not None:
             print(f'\x1b[1;31m[ERROR]\x1b[0m {exc_val}')
             return False
 
-        self.make_svg()
-        self.make_tex()
-        print(f'\x1b[1;32m[INFO]\x1b[0m Saved {self.basename}')
\ No newline at end of file
+        with RECORDER.stage(self.format, 'write'):
+            self.make_image()
+
+        with RECORDER.stage('tex', 'write'):
+            self.make_tex()
+            self.__files.make_manifest()
+        print(f'\x1b[1;32m[INFO]\x1b[0m Saved {self.files.label}')
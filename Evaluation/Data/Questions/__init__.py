@@ -4,6 +4,7 @@
 Questions for the evaluation of the questionnaire
 """
 
+from .language import LANGUAGES, translate, use_language
 from .question import Question, QuestionType, Page
 
 G01 = Page('G01', 'General Information', [])
@@ -11,12 +12,12 @@ G01 = Page('G01', 'General Information', [])
 # Category (Student, Employee, Professor, External)
 G01Q01 = Question(
     'G01Q01',
-    'Which category do you belong to?',
+    {'en': 'Which category do you belong to?', 'de': 'Welcher Gruppe gehörst du an?'},
     {
-        'AO01': 'Student',
-        'AO02': 'Employee',
-        'AO03': 'Professor',
-        'AO04': 'External'
+        'AO01': {'en': 'Student', 'de': 'Studierende'},
+        'AO02': {'en': 'Employee', 'de': 'Mitarbeitende'},
+        'AO03': {'en': 'Professor', 'de': 'Professor:innen'},
+        'AO04': {'en': 'External', 'de': 'Externe'}
     },
     QuestionType.OPTIONS
 )
@@ -24,14 +25,14 @@ G01Q01 = Question(
 # Faculty (INF, LS, ESB, TEC, TEX, other)
 G01Q02 = Question(
     'G01Q02',
-    'Which faculty do you belong to?',
+    {'en': 'Which faculty do you belong to?', 'de': 'Welcher Fakultät gehörst du an?'},
     {
         'AO01': 'INF',
         'AO02': 'LS',
         'AO03': 'ESB',
         'AO04': 'TEC',
         'AO05': 'TEX',
-        '-oth-': 'Other'
+        '-oth-': {'en': 'Other', 'de': 'Sonstige'}
     },
     QuestionType.OPTIONS
 )
@@ -39,10 +40,10 @@ G01Q02 = Question(
 # Exchange-Program (Yes, No)
 G01Q03 = Question(
     'G01Q03',
-    'Are you part of an Exchange Program?',
+    {'en': 'Are you part of an Exchange Program?', 'de': 'Nimmst du an einem Austauschprogramm teil?'},
     {
-        'Y': 'Yes',
-        'N': 'No'
+        'Y': {'en': 'Yes', 'de': 'Ja'},
+        'N': {'en': 'No', 'de': 'Nein'}
     },
     QuestionType.OPTIONS
 )
@@ -50,10 +51,10 @@ G01Q03 = Question(
 # Older than 26 (Yes, No)
 G01Q04 = Question(
     'G01Q04',
-    'Are you older than 26?',
+    {'en': 'Are you older than 26?', 'de': 'Bist du älter als 26?'},
     {
-        'Y': 'Yes',
-        'N': 'No'
+        'Y': {'en': 'Yes', 'de': 'Ja'},
+        'N': {'en': 'No', 'de': 'Nein'}
     },
     QuestionType.OPTIONS
 )
@@ -63,12 +64,12 @@ G02 = Page('G02', 'Knowledge', [])
 # Knowledge of Deutschlandticket (Very bad to Very good; 4 Options)
 G02Q01 = Question(
     'G02Q01',
-    'How well do you know the Deutschlandticket?',
+    {'en': 'How well do you know the Deutschlandticket?', 'de': 'Wie gut kennst du das Deutschlandticket?'},
     {
-        'AO01': 'Very bad',
-        'AO02': 'Bad',
-        'AO03': 'Good',
-        'AO04': 'Very good'
+        'AO01': {'en': 'Very bad', 'de': 'Sehr schlecht'},
+        'AO02': {'en': 'Bad', 'de': 'Schlecht'},
+        'AO03': {'en': 'Good', 'de': 'Gut'},
+        'AO04': {'en': 'Very good', 'de': 'Sehr gut'}
     },
     QuestionType.OPTIONS
 )
@@ -76,12 +77,12 @@ G02Q01 = Question(
 # Knowledge of Vollsolidarmodell (Very bad to Very good; 4 Options)
 G02Q02 = Question(
     'G02Q02',
-    'How well do you know the Vollsolidarmodell?',
+    {'en': 'How well do you know the Vollsolidarmodell?', 'de': 'Wie gut kennst du das Vollsolidarmodell?'},
     {
-        'AO01': 'Very bad',
-        'AO02': 'Bad',
-        'AO03': 'Good',
-        'AO04': 'Very good'
+        'AO01': {'en': 'Very bad', 'de': 'Sehr schlecht'},
+        'AO02': {'en': 'Bad', 'de': 'Schlecht'},
+        'AO03': {'en': 'Good', 'de': 'Gut'},
+        'AO04': {'en': 'Very good', 'de': 'Sehr gut'}
     },
     QuestionType.OPTIONS
 )
@@ -91,12 +92,12 @@ G03 = Page('G03', 'Opinion/Infotext', [])
 # Your informed stance on the Deutschlandticket in the full solidarity model (Very opposed to Very supportive; 4 Options)
 G03Q01 = Question(
     'G03Q01',
-    'What is your opinion on the proposed model?',
+    {'en': 'What is your opinion on the proposed model?', 'de': 'Wie stehst du zum vorgeschlagenen Modell?'},
     {
-        'AO01': 'Strongly opposed',
-        'AO02': 'Opposed',
-        'AO03': 'Supportive',
-        'AO04': 'Very supportive'
+        'AO01': {'en': 'Strongly opposed', 'de': 'Stark dagegen'},
+        'AO02': {'en': 'Opposed', 'de': 'Dagegen'},
+        'AO03': {'en': 'Supportive', 'de': 'Dafür'},
+        'AO04': {'en': 'Very supportive', 'de': 'Sehr dafür'}
     },
     QuestionType.OPTIONS
 )
@@ -106,13 +107,13 @@ G04 = Page('G04', 'Transportation', [])
 # Primary mode of transportation (Car, By foot, Public transportation, Bicycle, Carpooled)
 G04Q01 = Question(
     'G04Q01',
-    'Modes of Transportation',
+    {'en': 'Modes of Transportation', 'de': 'Verkehrsmittel'},
     {
-        'AO01': 'Car',
-        'AO02': 'By foot',
-        'AO03': 'Public transportation',
-        'AO04': 'Bicycle',
-        'AO05': 'Carpooled'
+        'AO01': {'en': 'Car', 'de': 'Auto'},
+        'AO02': {'en': 'By foot', 'de': 'Zu Fuß'},
+        'AO03': {'en': 'Public transportation', 'de': 'Öffentliche Verkehrsmittel'},
+        'AO04': {'en': 'Bicycle', 'de': 'Fahrrad'},
+        'AO05': {'en': 'Carpooled', 'de': 'Fahrgemeinschaft'}
     },
     type=QuestionType.RANKING,
     ranking_slots=3
@@ -121,13 +122,13 @@ G04Q01 = Question(
 # Frequency of using public transportation to get to university (Never to Always; 5 Options)
 G04Q02 = Question(
     'G04Q02',
-    'Use of public transportation to get to university',
+    {'en': 'Use of public transportation to get to university', 'de': 'Nutzung öffentlicher Verkehrsmittel für den Weg zur Hochschule'},
     {
-        'AO01': 'Never',
-        'AO02': 'Fewer than once a week',
-        'AO03': 'Once a week',
-        'AO04': 'Several times a week',
-        'AO05': 'Daily'
+        'AO01': {'en': 'Never', 'de': 'Nie'},
+        'AO02': {'en': 'Fewer than once a week', 'de': 'Seltener als einmal pro Woche'},
+        'AO03': {'en': 'Once a week', 'de': 'Einmal pro Woche'},
+        'AO04': {'en': 'Several times a week', 'de': 'Mehrmals pro Woche'},
+        'AO05': {'en': 'Daily', 'de': 'Täglich'}
     },
     QuestionType.OPTIONS
 )
@@ -135,13 +136,13 @@ G04Q02 = Question(
 # Frequency of using public transportation otherwise (Never to Always; 5 Options)
 G04Q03 = Question(
     'G04Q03',
-    'How often do you use public transportation otherwise',
+    {'en': 'How often do you use public transportation otherwise', 'de': 'Wie oft nutzt du öffentliche Verkehrsmittel sonst'},
     {
-        'AO01': 'Never',
-        'AO02': 'Fewer than once a week',
-        'AO03': 'Once a week',
-        'AO04': 'Several times a week',
-        'AO05': 'Daily'
+        'AO01': {'en': 'Never', 'de': 'Nie'},
+        'AO02': {'en': 'Fewer than once a week', 'de': 'Seltener als einmal pro Woche'},
+        'AO03': {'en': 'Once a week', 'de': 'Einmal pro Woche'},
+        'AO04': {'en': 'Several times a week', 'de': 'Mehrmals pro Woche'},
+        'AO05': {'en': 'Daily', 'de': 'Täglich'}
     },
     QuestionType.OPTIONS
 )
@@ -149,7 +150,7 @@ G04Q03 = Question(
 # Amount of money spent on transportation per month (0 to 100+; 5 Options)
 G04Q04 = Question(
     'G04Q04[SQ001]',
-    'Money spent on transportation per month (in €)',
+    {'en': 'Money spent on transportation per month (in €)', 'de': 'Monatliche Ausgaben für Mobilität (in €)'},
     {},
     QuestionType.NUMBER
 )
@@ -157,7 +158,7 @@ G04Q04 = Question(
 # Distance between home and university (0 to 100+; 5 Options)
 G04Q05 = Question(
     'G04Q05[SQ001]',
-    'Distance to university (in km)',
+    {'en': 'Distance to university (in km)', 'de': 'Entfernung zur Hochschule (in km)'},
     {},
     QuestionType.NUMBER
 )
@@ -165,7 +166,7 @@ G04Q05 = Question(
 # Time from home to university (0 to 360+; 5 Options)
 G04Q06 = Question(
     'G04Q06[SQ001]',
-    'Time to university (in min)',
+    {'en': 'Time to university (in min)', 'de': 'Zeit zur Hochschule (in min)'},
     {},
     QuestionType.NUMBER
 )
@@ -173,13 +174,13 @@ G04Q06 = Question(
 # Current ticket (Deutschlandticket, JugendBW-Ticket, Naldo Semesterticket, Kein vergleichbares Ticket, Sonstiges)
 G04Q07 = Question(
     'G04Q07',
-    'Do you currently have one of the following tickets?',
+    {'en': 'Do you currently have one of the following tickets?', 'de': 'Hast du aktuell eines der folgenden Tickets?'},
     {
         'AO01': 'Deutschlandticket',
         'AO02': 'JugendBW-Ticket',
-        'AO03': 'Naldo Semester Ticket',
-        'AO04': 'No comparable ticket',
-        '-oth-': 'Other'
+        'AO03': {'en': 'Naldo Semester Ticket', 'de': 'Naldo Semesterticket'},
+        'AO04': {'en': 'No comparable ticket', 'de': 'Kein vergleichbares Ticket'},
+        '-oth-': {'en': 'Other', 'de': 'Sonstige'}
     },
     QuestionType.OPTIONS
 )
@@ -189,12 +190,12 @@ G05 = Page('G05', 'Climate Friendliness', [])
 # How important is the climate friendliness of your mode of transportation to you? (Not important to Very important; 4 Options)
 G05Q01 = Question(
     'G05Q01',
-    'How important is the climate friendliness of your mode of transportation to you?',
+    {'en': 'How important is the climate friendliness of your mode of transportation to you?', 'de': 'Wie wichtig ist dir die Klimafreundlichkeit deines Verkehrsmittels?'},
     {
-        'AO01': 'Not important',
-        'AO02': 'Less important',
-        'AO03': 'Important',
-        'AO04': 'Very important'
+        'AO01': {'en': 'Not important', 'de': 'Nicht wichtig'},
+        'AO02': {'en': 'Less important', 'de': 'Weniger wichtig'},
+        'AO03': {'en': 'Important', 'de': 'Wichtig'},
+        'AO04': {'en': 'Very important', 'de': 'Sehr wichtig'}
     },
     QuestionType.OPTIONS
 )
@@ -204,10 +205,10 @@ G06 = Page('G06', 'Opinion Reasonable/Fairness', [])
 # Stance on the named conditions for the full solidarity model: Amount justified?
 G06Q01 = Question(
     'G06Q01',
-    'Do you think the amount is reasonable?',
+    {'en': 'Do you think the amount is reasonable?', 'de': 'Hältst du den Betrag für angemessen?'},
     {
-        'Y': 'Yes',
-        'N': 'No'
+        'Y': {'en': 'Yes', 'de': 'Ja'},
+        'N': {'en': 'No', 'de': 'Nein'}
     },
     QuestionType.OPTIONS
 )
@@ -215,7 +216,7 @@ G06Q01 = Question(
 # Stance on the named conditions for the full solidarity model: What amount is justified?
 G06Q02 = Question(
     'G06Q02[SQ001]',
-    'What amount is justified for the FSM? (in €)',
+    {'en': 'What amount is justified for the FSM? (in €)', 'de': 'Welcher Betrag ist für das VSM gerechtfertigt? (in €)'},
     {},
     QuestionType.NUMBER
 )
@@ -223,12 +224,12 @@ G06Q02 = Question(
 # Stance on the named conditions for the full solidarity model: Fairness (Very unfair to Very fair; 4 Options)
 G06Q03 = Question(
     'G06Q03',
-    'Stance on the fairness of the FSM',
+    {'en': 'Stance on the fairness of the FSM', 'de': 'Haltung zur Fairness des VSM'},
     {
-        'AO01': 'Very unfair',
+        'AO01': {'en': 'Very unfair', 'de': 'Sehr unfair'},
         'AO02': 'Unfair',
         'AO03': 'Fair',
-        'AO04': 'Very fair'
+        'AO04': {'en': 'Very fair', 'de': 'Sehr fair'}
     },
     QuestionType.OPTIONS
 )
@@ -238,11 +239,11 @@ G07 = Page('G07', 'Expected Impact', [])
 # Expected impact of having a Deutschlandticket on your mode of transportation (Not at all, A little, Very much; 3 Options)
 G07Q01 = Question(
     'G07Q01',
-    'Impact of having a D-Ticket on you',
+    {'en': 'Impact of having a D-Ticket on you', 'de': 'Auswirkung eines D-Tickets auf dich'},
     {
-        'AO01': 'Not at all',
-        'AO04': 'A little',
-        'AO05': 'Very much'
+        'AO01': {'en': 'Not at all', 'de': 'Gar nicht'},
+        'AO04': {'en': 'A little', 'de': 'Ein wenig'},
+        'AO05': {'en': 'Very much', 'de': 'Sehr stark'}
     },
     QuestionType.OPTIONS
 )
@@ -252,7 +253,7 @@ G08 = Page('G08', 'Alternative', [])
 # Your idea for an alternative
 G08Q01 = Question(
     'G08Q01',
-    'What is your idea for an alternative',
+    {'en': 'What is your idea for an alternative', 'de': 'Was ist deine Idee für eine Alternative'},
     {},
     QuestionType.TEXT
 )
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Weighted 2D histograms of many groups at once and the levels of their highest-density regions.
+"""
+
+from typing import Sequence, Tuple
+
+import numpy as np
+
+def edges(values: np.ndarray, bins: int, log: bool=False) -> np.ndarray:
+    """
+    Get `bins` + 1 evenly spaced bin edges over the range of the values (in log space with `log`), in data space.
+    """
+
+    values = np.log(values) if log else values
+
+    if not len(values):
+        return np.linspace(0, 1, bins + 1)
+
+    low, high = values.min(), values.max()
+
+    # A single value gets a bin of its own
+    if high <= low:
+        low, high = low - 0.5, high + 0.5
+
+    grid = np.linspace(low, high, bins + 1)
+
+    return np.exp(grid) if log else grid
+
+def centers(bin_edges: np.ndarray, log: bool=False) -> np.ndarray:
+    """
+    Get the centers of the bins; Geometric centers of bins in log space.
+    """
+
+    return np.sqrt(bin_edges[:-1] * bin_edges[1:]) if log else (bin_edges[:-1] + bin_edges[1:]) / 2
+
+def group_histogram(
+        x: np.ndarray,
+        y: np.ndarray,
+        groups: np.ndarray,
+        n_groups: int,
+        weights: np.ndarray | None=None,
+        bins: int=50,
+        log_x: bool=False,
+        log_y: bool=False
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Get the weighted 2D histograms of all groups on shared bins in one bincount; Shape (n_groups, bins, bins), indexed [group, x, y].
+
+    Rows without a group or value (and non-positive values on a log axis) are dropped. Returns the histograms and the x and y edges.
+    """
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    groups = np.asarray(groups, dtype=np.int64)
+    weights = np.ones(len(x)) if weights is None else np.asarray(weights, dtype=float)
+
+    valid = (groups >= 0) & np.isfinite(x) & np.isfinite(y) & np.isfinite(weights)
+
+    if log_x:
+        valid &= x > 0
+    if log_y:
+        valid &= y > 0
+
+    x, y, groups, weights = x[valid], y[valid], groups[valid], weights[valid]
+
+    x_edges = edges(x, bins, log_x)
+    y_edges = edges(y, bins, log_y)
+
+    # Bins of the rows; The maximum falls into the last bin
+    x_bins = np.clip(np.searchsorted(x_edges, x, side='right') - 1, 0, bins - 1)
+    y_bins = np.clip(np.searchsorted(y_edges, y, side='right') - 1, 0, bins - 1)
+
+    counts = np.bincount(
+        (groups * bins + x_bins) * bins + y_bins,
+        weights=weights,
+        minlength=n_groups * bins * bins
+    ).reshape(n_groups, bins, bins)
+
+    return counts, x_edges, y_edges
+
+def smooth(counts: np.ndarray, passes: int=1) -> np.ndarray:
+    """
+    Smooth the histograms (..., x, y) with the binomial kernel [1, 2, 1] / 4 along both axes, `passes` times; The total weight is kept.
+    """
+
+    for _ in range(passes):
+        for axis in (-2, -1):
+            padded = np.concatenate([np.take(counts, [0], axis=axis), counts, np.take(counts, [-1], axis=axis)], axis=axis)
+
+            size = padded.shape[axis]
+            counts = (
+                np.take(padded, range(0, size - 2), axis=axis)
+                + 2 * np.take(padded, range(1, size - 1), axis=axis)
+                + np.take(padded, range(2, size), axis=axis)
+            ) / 4
+
+    return counts
+
+def density_levels(counts: np.ndarray, masses: Sequence[float]=(0.95, 0.8, 0.5)) -> np.ndarray:
+    """
+    Get the density levels whose regions above them hold the `masses` of the total weight of a histogram; Ascending and distinct.
+    """
+
+    values = np.sort(counts.ravel())[::-1]
+    cumulative = np.cumsum(values)
+
+    if not len(values) or cumulative[-1] <= 0:
+        return np.array([])
+
+    levels = values[np.minimum(np.searchsorted(cumulative, np.asarray(masses) * cumulative[-1]), len(values) - 1)]
+
+    return np.unique(levels[levels > 0])
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Estimates of shares, means and medians of the respondents with bootstrap confidence intervals.
+"""
+
+from typing import Iterator, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from .question import weights_of
+
+# Most resample weights (resamples x rows) held in memory at once
+BOOTSTRAP_BUDGET = 4_000_000
+
+class Estimate:
+    """
+    Point estimate with its confidence interval.
+
+    Formats like a number with its interval: `f'{estimate:.0%}'` gives '27% [23%, 32%]'.
+    """
+
+    __value: float
+    __lower: float
+    __upper: float
+    __level: float
+
+    def __init__(self, value: float, lower: float, upper: float, level: float=0.95):
+        self.__value = value
+        self.__lower = lower
+        self.__upper = upper
+        self.__level = level
+
+    def __repr__(self) -> str:
+        return f'Estimate({self.__value:.4g}, [{self.__lower:.4g}, {self.__upper:.4g}], level={self.__level})'
+
+    def __format__(self, spec: str) -> str:
+        return f'{self.__value:{spec}} [{self.__lower:{spec}}, {self.__upper:{spec}}]'
+
+    def __float__(self) -> float:
+        return self.__value
+
+    @property
+    def value(self) -> float:
+        return self.__value
+
+    @property
+    def lower(self) -> float:
+        return self.__lower
+
+    @property
+    def upper(self) -> float:
+        return self.__upper
+
+    @property
+    def level(self) -> float:
+        return self.__level
+
+class Bootstrap:
+    """
+    Poisson bootstrap of the rows of a frame (weighted by `WEIGHT_COLUMN`, if present).
+
+    Every statistic is computed for all resamples in one batched pass. Rows with the same values and weight are pooled,
+    as the sum of m Poisson(1) counts is Poisson(m): Shares only have a handful of distinct rows, whatever the size of the frame.
+
+    With a `population`, the deviations of the resampled statistics are shrunk by the finite-population correction
+    sqrt((N - n) / (N - 1)), as the respondents are a sizeable part of the N students.
+    """
+
+    __weights: np.ndarray
+    __resamples: int
+    __level: float
+    __population: int | None
+    __seed: int
+
+    def __init__(self, df: DataFrame, resamples: int=2000, level: float=0.95, population: int | None=None, seed: int=0):
+        self.__weights = weights_of(df).to_numpy(dtype=float)
+        self.__resamples = resamples
+        self.__level = level
+        self.__population = population
+        self.__seed = seed
+
+    def __repr__(self) -> str:
+        return f'Bootstrap(rows={len(self.__weights)}, resamples={self.__resamples}, level={self.__level}, population={self.__population})'
+
+    @property
+    def resamples(self) -> int:
+        return self.__resamples
+
+    @property
+    def level(self) -> float:
+        return self.__level
+
+    @property
+    def correction(self) -> float:
+        """
+        The finite-population correction of the standard errors; 1 without a population.
+        """
+
+        n, population = len(self.__weights), self.__population
+
+        if population is None or population <= 1:
+            return 1.0
+
+        return float(np.sqrt(max(population - n, 0) / (population - 1)))
+
+    def pool(self, *columns: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the distinct rows of (columns, weight), ordered by the first column, and the number of rows of each.
+        """
+
+        return np.unique(np.stack([*columns, self.__weights], axis=1), axis=0, return_counts=True)
+
+    def chunks(self, counts: np.ndarray, weights: np.ndarray) -> Iterator[np.ndarray]:
+        """
+        The resampled total weights of pooled rows (their weight times Poisson(count) draws), in chunks of resamples.
+
+        Every call draws new counts from a generator seeded with `seed`: Statistics pool the rows differently, so they do not share resamples.
+        """
+
+        rng = np.random.default_rng(self.__seed)
+        chunk = max(1, min(self.__resamples, BOOTSTRAP_BUDGET // max(len(counts), 1)))
+
+        for start in range(0, self.__resamples, chunk):
+            yield rng.poisson(counts, size=(min(chunk, self.__resamples - start), len(counts))) * weights
+
+    def estimate(self, value: float, resampled: np.ndarray) -> Estimate:
+        # Percentile interval of the resampled statistics, shrunk towards the estimate
+        resampled = value + self.correction * (resampled[np.isfinite(resampled)] - value)
+
+        if not len(resampled):
+            return Estimate(value, np.nan, np.nan, self.__level)
+
+        alpha = (1 - self.__level) / 2
+        lower, upper = np.quantile(resampled, [alpha, 1 - alpha])
+
+        return Estimate(value, float(lower), float(upper), self.__level)
+
+    def ratio(self, numerator: np.ndarray, denominator: np.ndarray) -> Estimate:
+        """
+        Estimate sum(w * numerator) / sum(w * denominator) over the rows.
+        """
+
+        rows, counts = self.pool(np.nan_to_num(np.asarray(numerator, dtype=float)), np.asarray(denominator, dtype=float))
+
+        values, weights = rows[:, :2], rows[:, 2]
+
+        resampled = np.concatenate([chunk @ values for chunk in self.chunks(counts, weights)])
+        total = (counts * weights) @ values
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.estimate(total[0] / total[1], resampled[:, 0] / resampled[:, 1])
+
+    def share(self, mask: np.ndarray | pd.Series, among: np.ndarray | pd.Series | None=None) -> Estimate:
+        """
+        Estimate the share of the rows matching `mask` among the rows matching `among` (all rows by default).
+        """
+
+        among = np.ones(len(self.__weights), dtype=bool) if among is None else np.asarray(among, dtype=bool)
+
+        return self.ratio(np.asarray(mask, dtype=bool) & among, among)
+
+    def mean(self, values: np.ndarray | pd.Series) -> Estimate:
+        """
+        Estimate the mean of the values; Missing values are left out.
+        """
+
+        values = np.asarray(values, dtype=float)
+        answered = ~np.isnan(values)
+
+        return self.ratio(np.where(answered, values, 0.0), answered)
+
+    def median(self, values: np.ndarray | pd.Series) -> Estimate:
+        """
+        Estimate the median of the values; Missing values are left out.
+
+        Per resample, the median is the first of the sorted values where half of the resampled weight is reached.
+        """
+
+        values = np.asarray(values, dtype=float)
+        answered = ~np.isnan(values)
+
+        if not answered.any():
+            return Estimate(np.nan, np.nan, np.nan, self.__level)
+
+        # Pool the answered rows only; Unanswered rows weigh 0
+        rows, counts = self.pool(np.where(answered, values, np.inf), answered.astype(float))
+        rows, counts = rows[rows[:, 1] > 0], counts[rows[:, 1] > 0]
+
+        sorted_values, weights = rows[:, 0], rows[:, 2]
+
+        def medians(totals: np.ndarray) -> np.ndarray:
+            cumulative = np.cumsum(totals, axis=-1)
+            reached = cumulative >= cumulative[..., -1:] / 2
+
+            return np.where(cumulative[..., -1] > 0, sorted_values[np.argmax(reached, axis=-1)], np.nan)
+
+        resampled = np.concatenate([medians(chunk) for chunk in self.chunks(counts, weights)])
+
+        # Unweighted, the median of an even number of values is the mean of the middle two
+        if np.all(weights == 1):
+            value = float(np.median(values[answered]))
+        else:
+            value = float(medians(counts * weights))
+
+        return self.estimate(value, resampled)
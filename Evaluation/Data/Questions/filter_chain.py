@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Chain of filters over the survey results; Composes boolean masks and materializes a stage only on access.
+"""
+
+from collections.abc import Mapping
+from typing import Callable, Dict, Iterator, List
+
+import numpy as np
+from pandas import DataFrame
+
+from .instrumentation import RECORDER
+from .question import Question
+
+class FilterStage:
+    """
+    One named stage of a filter chain: The rows of the previous stage the predicate keeps.
+    """
+
+    __name: str
+    __caption: str
+    __predicate: Callable[[DataFrame], np.ndarray] | None
+
+    def __init__(self, name: str, caption: str, predicate: Callable[[DataFrame], np.ndarray] | None):
+        self.__name = name
+        self.__caption = caption
+        self.__predicate = predicate
+
+    def __repr__(self) -> str:
+        return f'FilterStage("{self.__name}", "{self.__caption}")'
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def caption(self) -> str:
+        return self.__caption
+
+    @property
+    def predicate(self) -> Callable[[DataFrame], np.ndarray] | None:
+        return self.__predicate
+
+class FilterChain(Mapping):
+    """
+    Filters applied one after another to the survey results, as a lazy mapping of stage names to frames.
+
+    Every predicate is evaluated once on the unfiltered frame, so the stages only differ by their mask;
+    A stage is copied out of the frame when it is accessed, its survivor count needs no copy at all.
+    """
+
+    __load: Callable[[], DataFrame]
+    __stages: List[FilterStage]
+
+    __df: DataFrame = None
+    __masks: Dict[str, np.ndarray]
+    __frames: Dict[str, DataFrame]
+
+    def __init__(self, load: Callable[[], DataFrame], name: str='DF', caption: str='Started surveys'):
+        self.__load = load
+        self.__stages = [FilterStage(name, caption, None)]
+        self.__masks = {}
+        self.__frames = {}
+
+    def __repr__(self) -> str:
+        return f'FilterChain({self.__stages})'
+
+    def __getitem__(self, name: str) -> DataFrame:
+        if name not in self.__frames:
+            self.stage(name)
+
+            # The unfiltered frame is not copied
+            if name == self.__stages[0].name:
+                self.__frames[name] = self.df
+            else:
+                mask = self.mask(name)
+
+                with RECORDER.stage(f'select:{name}', 'filter'):
+                    self.__frames[name] = self.df[mask]
+
+        return self.__frames[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(stage.name for stage in self.__stages)
+
+    def __len__(self) -> int:
+        return len(self.__stages)
+
+    @property
+    def df(self) -> DataFrame:
+        if self.__df is None:
+            self.__df = self.__load()
+
+        return self.__df
+
+    @property
+    def stages(self) -> List[FilterStage]:
+        return self.__stages
+
+    def stage(self, name: str) -> FilterStage:
+        for stage in self.__stages:
+            if stage.name == name:
+                return stage
+
+        raise KeyError(f"Stage '{name}' not found in {self}")
+
+    def where(self, name: str, caption: str, predicate: Callable[[DataFrame], np.ndarray]) -> 'FilterChain':
+        """
+        Add a stage keeping the rows for which `predicate(df)` is true.
+        """
+
+        assert name not in self, f"Stage '{name}' is added twice"
+
+        self.__stages.append(FilterStage(name, caption, predicate))
+
+        return self
+
+    def exclude(self, name: str, caption: str, predicate: Callable[[DataFrame], np.ndarray]) -> 'FilterChain':
+        """
+        Add a stage dropping the rows for which `predicate(df)` is true.
+        """
+
+        return self.where(name, caption, lambda df: ~np.asarray(predicate(df), dtype=bool))
+
+    def answered(self, name: str, caption: str, question: Question) -> 'FilterChain':
+        return self.where(name, caption, question.answered_mask)
+
+    def of_answer(self, name: str, caption: str, question: Question, answer: str | int | List[str | int]) -> 'FilterChain':
+        return self.where(name, caption, lambda df: question.of_answer_mask(df, answer))
+
+    def numeric(self, name: str, caption: str, question: Question, filter: Callable[..., bool]) -> 'FilterChain':
+        return self.where(name, caption, lambda df: question.numeric_mask(df, filter))
+
+    def mask(self, name: str) -> np.ndarray:
+        """
+        Get the rows of the unfiltered frame that survive all stages up to `name`.
+        """
+
+        if name not in self.__masks:
+            mask = np.ones(len(self.df), dtype=bool)
+
+            for stage in self.__stages:
+                if stage.name in self.__masks:
+                    mask = self.__masks[stage.name]
+                elif stage.predicate is not None:
+                    with RECORDER.stage(f'filter:{stage.name}', 'filter'):
+                        mask = mask & np.asarray(stage.predicate(self.df), dtype=bool)
+
+                self.__masks[stage.name] = mask
+
+                if stage.name == name:
+                    break
+            else:
+                raise KeyError(f"Stage '{name}' not found in {self}")
+
+        return self.__masks[name]
+
+    def count(self, name: str) -> int:
+        return int(self.mask(name).sum())
+
+    def funnel(self) -> DataFrame:
+        """
+        Get the number of rows surviving each stage, the number it excluded and the share of the unfiltered rows it kept.
+        """
+
+        counts = np.array([self.count(stage.name) for stage in self.__stages])
+
+        return DataFrame({
+            'caption': [stage.caption for stage in self.__stages],
+            'count': counts,
+            'excluded': np.concatenate([[0], counts[:-1] - counts[1:]]),
+            'share': counts / max(counts[0], 1),
+        }, index=[stage.name for stage in self.__stages])
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Instrumentation of the stages of the evaluation: Wall and CPU time, peak of the traced memory and cache hits.
+"""
+
+from contextlib import contextmanager
+import cProfile
+from datetime import datetime
+import io
+import json
+import os
+import pstats
+import time
+import tracemalloc
+from typing import Any, Dict, Iterator, List
+
+class Frame:
+    """
+    A running stage; The peak is the highest traced memory seen so far, in absolute bytes.
+    """
+
+    __slots__ = ('name', 'category', 'path', 'attributes', 'children', 'wall', 'cpu', 'memory', 'peak', 'lap_wall', 'lap_cpu', 'lap_memory', 'lap_peak')
+
+    def __init__(self, name: str, category: str, path: List[str], attributes: Dict[str, Any], memory: int):
+        self.name = name
+        self.category = category
+        self.path = path
+        self.attributes = attributes
+        self.children: Dict[str, float] = {}
+
+        self.wall = self.lap_wall = time.perf_counter()
+        self.cpu = self.lap_cpu = time.process_time()
+        self.memory = self.lap_memory = memory
+        self.peak = self.lap_peak = memory
+
+class Recorder:
+    """
+    Records the stages of a run as spans: Name, category, path of the enclosing stages, wall and CPU time, the peak of
+    the traced memory above the start of the stage (with `memory`) and attributes like the cache of a transform.
+
+    Disabled by default, where a stage only costs the check. Nested stages report their own peak: The peak of tracemalloc
+    is reset on entering and leaving a stage and folded into the enclosing ones.
+    """
+
+    __enabled: bool = False
+    __memory: bool = False
+    __started: float = 0.0
+
+    __spans: List[Dict[str, Any]]
+    __stack: List[Frame]
+
+    def __init__(self):
+        self.__spans = []
+        self.__stack = []
+
+    @property
+    def enabled(self) -> bool:
+        return self.__enabled
+
+    @property
+    def memory(self) -> bool:
+        return self.__memory
+
+    @property
+    def spans(self) -> List[Dict[str, Any]]:
+        return self.__spans
+
+    def enable(self, memory: bool=False) -> None:
+        self.__enabled = True
+        self.__memory = memory
+        self.__started = time.perf_counter()
+
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def disable(self) -> None:
+        if self.__memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+        self.__enabled = False
+        self.__memory = False
+
+    def traced(self) -> int:
+        """
+        Get the current traced memory after folding the peak since the last reset into the running stages.
+        """
+
+        if not self.__memory:
+            return 0
+
+        current, peak = tracemalloc.get_traced_memory()
+
+        for frame in self.__stack:
+            frame.peak = max(frame.peak, peak)
+            frame.lap_peak = max(frame.lap_peak, peak)
+
+        tracemalloc.reset_peak()
+
+        return current
+
+    def record(self, name: str, category: str, path: List[str], wall: float, cpu: float, peak: int | None, attributes: Dict[str, Any], children: Dict[str, float]) -> None:
+        self.__spans.append({
+            'name': name,
+            'category': category,
+            'path': path,
+            'wall': wall,
+            'cpu': cpu,
+            'peak_bytes': peak,
+            'process': os.getpid(),
+            **({'children': children} if children else {}),
+            **attributes,
+        })
+
+        # Time of the direct children by category, e.g. the transforms of a figure
+        if self.__stack:
+            parent = self.__stack[-1].children
+            parent[category] = parent.get(category, 0.0) + wall
+
+    @contextmanager
+    def stage(self, name: str, category: str, **attributes: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Record the block as a stage; The yielded attributes can still be set in the block (e.g. the cache of a transform).
+        """
+
+        if not self.__enabled:
+            yield attributes
+            return
+
+        path = [*(self.__stack[-1].path if self.__stack else []), name]
+        frame = Frame(name, category, path, attributes, self.traced())
+
+        self.__stack.append(frame)
+
+        try:
+            yield frame.attributes
+        finally:
+            self.traced()
+
+            self.__stack.remove(frame)
+
+            self.record(
+                name, category, path,
+                time.perf_counter() - frame.wall,
+                time.process_time() - frame.cpu,
+                frame.peak - frame.memory if self.__memory else None,
+                frame.attributes,
+                frame.children
+            )
+
+    def lap(self, name: str, category: str, **attributes: Any) -> None:
+        """
+        Record the time since the last lap (or the start) of the innermost stage as a stage of its own.
+        """
+
+        if not self.__enabled or not self.__stack:
+            return
+
+        self.traced()
+
+        frame = self.__stack[-1]
+
+        wall, cpu = time.perf_counter(), time.process_time()
+
+        self.record(
+            name, category, [*frame.path, name],
+            wall - frame.lap_wall,
+            cpu - frame.lap_cpu,
+            frame.lap_peak - frame.lap_memory if self.__memory else None,
+            attributes,
+            {}
+        )
+
+        frame.lap_wall, frame.lap_cpu = wall, cpu
+        frame.lap_memory = frame.lap_peak = tracemalloc.get_traced_memory()[0] if self.__memory else 0
+
+    def take(self, start: int=0) -> List[Dict[str, Any]]:
+        """
+        Get and forget the spans recorded since the `start`-th one, e.g. to send the spans of a worker to the main process.
+        """
+
+        spans = self.__spans[start:]
+        del self.__spans[start:]
+
+        return spans
+
+    def extend(self, spans: List[Dict[str, Any]]) -> None:
+        self.__spans.extend(spans)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get the number, wall and CPU time of the spans by category; Nested spans of the same category are counted once.
+        """
+
+        summary: Dict[str, Dict[str, float]] = {}
+
+        # Outermost spans of a category (by path and process), so nested transforms are not counted twice
+        outer = {(span['process'], tuple(span['path'])): span['category'] for span in self.__spans}
+
+        for span in self.__spans:
+            nested = any(outer.get((span['process'], tuple(span['path'][:depth]))) == span['category'] for depth in range(1, len(span['path'])))
+
+            entry = summary.setdefault(span['category'], {'count': 0, 'wall': 0.0, 'cpu': 0.0})
+            entry['count'] += 1
+
+            if not nested:
+                entry['wall'] += span['wall']
+                entry['cpu'] += span['cpu']
+
+        return summary
+
+    def caches(self) -> Dict[str, int]:
+        """
+        Get how many transforms were served by the memory cache, the on-disk store or computed.
+        """
+
+        caches: Dict[str, int] = {}
+
+        for span in self.__spans:
+            if span['category'] == 'transform' and 'cache' in span:
+                caches[span['cache']] = caches.get(span['cache'], 0) + 1
+
+        return caches
+
+    def figures(self) -> List[Dict[str, Any]]:
+        """
+        Get the time of every rendered figure split into its aggregation (transforms), drawing and writing.
+        """
+
+        figures = []
+
+        for figure in (span for span in self.__spans if span['category'] == 'figure'):
+            inner = [
+                span for span in self.__spans
+                if span['process'] == figure['process'] and span['path'][:len(figure['path'])] == figure['path'] and span is not figure
+            ]
+
+            draw = sum(span['wall'] for span in inner if span['category'] == 'draw')
+            aggregate = sum(span.get('children', {}).get('transform', 0.0) for span in inner if span['category'] == 'draw')
+            caches = [span['cache'] for span in inner if 'cache' in span]
+
+            figures.append({
+                'name': figure['name'],
+                'wall': figure['wall'],
+                'aggregate': aggregate,
+                'draw': draw - aggregate,
+                'write': sum(span['wall'] for span in inner if span['category'] == 'write'),
+                'peak_bytes': figure['peak_bytes'],
+                'hits': sum(cache != 'miss' for cache in caches),
+                'misses': caches.count('miss'),
+            })
+
+        return figures
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'wall': time.perf_counter() - self.__started,
+            'memory': self.__memory,
+            'summary': self.summary(),
+            'caches': self.caches(),
+            'figures': self.figures(),
+            'spans': self.__spans,
+        }
+
+    def write(self, filename: str) -> None:
+        os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+
+        with open(filename, 'w') as f:
+            json.dump(self.report(), f, indent=1)
+
+    def format(self, top: int=15) -> str:
+        """
+        Human-readable report: Time by category, cache hits, the slowest figures and the slowest stages.
+        """
+
+        def peak(span: Dict[str, Any]) -> str:
+            return f'{span["peak_bytes"] / 2 ** 20:8.1f} MiB' if span.get('peak_bytes') is not None else ''
+
+        lines = [f'Run of {time.perf_counter() - self.__started:.2f} s', '', f'{"Category":<12} {"Stages":>7} {"Wall":>10} {"CPU":>10}']
+
+        for category, entry in sorted(self.summary().items(), key=lambda item: -item[1]['wall']):
+            lines.append(f'{category:<12} {entry["count"]:>7} {entry["wall"]:>8.3f} s {entry["cpu"]:>8.3f} s')
+
+        caches = self.caches()
+        lines += ['', 'Transforms: ' + ', '.join(f'{count} {cache}' for cache, count in sorted(caches.items())) if caches else 'Transforms: none']
+
+        figures = sorted(self.figures(), key=lambda figure: -figure['wall'])[:top]
+
+        if figures:
+            lines += ['', f'{"Figure":<50} {"Total":>9} {"Aggregate":>11} {"Draw":>9} {"Write":>9} {"Hits":>5} {"Misses":>6} {"Peak":>12}']
+
+            for figure in figures:
+                lines.append(
+                    f'{figure["name"]:<50} {figure["wall"]:>7.3f} s {figure["aggregate"]:>9.3f} s {figure["draw"]:>7.3f} s '
+                    f'{figure["write"]:>7.3f} s {figure["hits"]:>5} {figure["misses"]:>6} {peak(figure):>12}'
+                )
+
+        lines += ['', f'{"Stage":<70} {"Category":<10} {"Wall":>9} {"CPU":>9} {"Peak":>12}']
+
+        for span in sorted(self.__spans, key=lambda span: -span['wall'])[:top]:
+            lines.append(f'{" / ".join(span["path"])[-70:]:<70} {span["category"]:<10} {span["wall"]:>7.3f} s {span["cpu"]:>7.3f} s {peak(span):>12}')
+
+        return '\n'.join(lines)
+
+# Recorder of this process; Forked workers inherit it and send their spans back
+RECORDER = Recorder()
+
+@contextmanager
+def profiled(filename: str | None, top: int=30) -> Iterator[None]:
+    """
+    Profile the block with cProfile into `filename` (.prof), with the `top` functions by cumulative time next to it (.txt).
+    """
+
+    if filename is None:
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+
+    try:
+        yield
+    finally:
+        profiler.disable()
+
+        os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+        profiler.dump_stats(filename)
+
+        text = io.StringIO()
+        pstats.Stats(profiler, stream=text).sort_stats('cumulative').print_stats(top)
+
+        with open(os.path.splitext(filename)[0] + '.txt', 'w') as f:
+            f.write(text.getvalue())
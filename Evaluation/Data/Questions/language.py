@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Languages of the evaluation; Texts are either English strings or label tables with a text per language.
+"""
+
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator
+
+# Languages of the report, matching \langType on the LaTeX side
+LANGUAGES = ['en', 'de']
+DEFAULT_LANGUAGE = 'en'
+
+# A text in the default language or a label table {language: text}
+Text = str | Dict[str, str]
+
+# Translations of the fixed phrases of figures and captions, keyed by the English text
+PHRASES: Dict[str, Dict[str, str]] = {
+    # Plots
+    'against': {'de': 'gegen'},
+    'by': {'de': 'nach'},
+    'Count': {'de': 'Anzahl'},
+    'Shares per group': {'de': 'Anteile pro Gruppe'},
+    'Share': {'de': 'Anteil'},
+    'Mean': {'de': 'Mittelwert'},
+    'Median': {'de': 'Median'},
+    'Time': {'de': 'Zeit'},
+    'Merged': {'de': 'Zusammengefasst'},
+    'Binned': {'de': 'Gruppiert'},
+    'Ranking Slot': {'de': 'Rang'},
+
+    # Figures
+    'Actual Distribution of Roles in our Survey': {'de': 'Tatsächliche Verteilung der Rollen in unserer Umfrage'},
+    'Actual Distribution to Faculties in our Survey': {'de': 'Tatsächliche Verteilung auf die Fakultäten in unserer Umfrage'},
+    'Optimal Distribution': {'de': 'Optimale Verteilung'},
+    'Optimal Faculty Distribution': {'de': 'Optimale Verteilung auf die Fakultäten'},
+    'Age Distribution': {'de': 'Altersverteilung'},
+    'Modes of Transport (merged)': {'de': 'Verkehrsmittel (zusammengefasst)'},
+    'Distance against Time by Modes of Transportation': {'de': 'Entfernung gegen Zeit nach Verkehrsmittel'},
+    'Support of the D-Ticket in the FSM': {'de': 'Unterstützung des D-Tickets im VSM'},
+    'Is the proposed amount reasonable?': {'de': 'Ist der vorgeschlagene Betrag angemessen?'},
+    'Amounts considered reasonable by the students': {'de': 'Von den Studierenden als angemessen erachtete Beträge'},
+    'Is the proposed model fair?': {'de': 'Ist das vorgeschlagene Modell fair?'},
+    'Modes of Transport by Faculty': {'de': 'Verkehrsmittel nach Fakultät'},
+    'Faculty': {'de': 'Fakultät'},
+    'Modes of Transport against Distance': {'de': 'Verkehrsmittel gegen Entfernung'},
+    'Modes of Transport against Distance (Merged)': {'de': 'Verkehrsmittel gegen Entfernung (zusammengefasst)'},
+    'Distance (in km)': {'de': 'Entfernung (in km)'},
+    'Importance of climate friendliness in transport decisions vs. modes of transport': {'de': 'Bedeutung der Klimafreundlichkeit bei der Verkehrsmittelwahl gegen Verkehrsmittel'},
+    'Importance of climate friendliness in transport decisions': {'de': 'Bedeutung der Klimafreundlichkeit bei der Verkehrsmittelwahl'},
+    'Share of modes of transport': {'de': 'Anteil der Verkehrsmittel'},
+    'Would you expect an impact on your usage of\npublic transportation if you got a D-Ticket?': {'de': 'Würde ein D-Ticket deine Nutzung\ndes öffentlichen Nahverkehrs verändern?'},
+    'Perception on fairness against modes of transport': {'de': 'Wahrnehmung der Fairness gegen Verkehrsmittel'},
+    'Perception on fairness': {'de': 'Wahrnehmung der Fairness'},
+    'Support against modes of transport': {'de': 'Unterstützung gegen Verkehrsmittel'},
+    'Support': {'de': 'Unterstützung'},
+    'Support against Faculty': {'de': 'Unterstützung gegen Fakultät'},
+    'Share of Faculty': {'de': 'Anteil der Fakultät'},
+    'Difference between Actual and Optimal Faculty Distribution': {'de': 'Abweichung der tatsächlichen von der optimalen Verteilung auf die Fakultäten'},
+    'Deviation in % of total students': {'de': 'Abweichung in % aller Studierenden'},
+    'Participation after each filter': {'de': 'Teilnahme nach jedem Filter'},
+    'Surveys': {'de': 'Umfragen'},
+
+    # Tests
+    'Fisher': {'de': 'Fisher'},
+    'Permutation': {'de': 'Permutation'},
+    'Chi-square': {'de': 'Chi-Quadrat'},
+
+    # Filters
+    'Started surveys': {'de': 'Begonnene Umfragen'},
+    'Completed surveys': {'de': 'Vollständige Umfragen'},
+    'Students': {'de': 'Studierende'},
+    'At least 15s on the information page': {'de': 'Mindestens 15s auf der Informationsseite'},
+    'No student ticket above the age of 26': {'de': 'Kein Schülerticket über 26 Jahren'},
+}
+
+_LANGUAGE: str = DEFAULT_LANGUAGE
+
+def current_language() -> str:
+    return _LANGUAGE
+
+def set_language(language: str) -> None:
+    global _LANGUAGE
+
+    assert language in LANGUAGES, f"Language '{language}' not found in {LANGUAGES}"
+    _LANGUAGE = language
+
+@contextmanager
+def use_language(language: str) -> Iterator[str]:
+    """
+    Translate texts to `language` within the block.
+    """
+
+    previous = current_language()
+    set_language(language)
+
+    try:
+        yield language
+    finally:
+        set_language(previous)
+
+def translate(text: Text, language: str=None) -> str:
+    """
+    Get a text in the current (or given) language; Falls back to the English text.
+    """
+
+    language = language or _LANGUAGE
+
+    if isinstance(text, dict):
+        return text.get(language, text[DEFAULT_LANGUAGE])
+
+    if language != DEFAULT_LANGUAGE and text in PHRASES:
+        return PHRASES[text].get(language, text)
+
+    return text
+
+def translations(make: Callable[[], str]) -> Dict[str, str]:
+    """
+    Label table of a composed text, by calling `make` in every language.
+    """
+
+    table = {}
+
+    for language in LANGUAGES:
+        with use_language(language):
+            table[language] = make()
+
+    return table
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Match groups of words in free texts in one pass over the texts.
+"""
+
+import re
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+class WordGroups:
+    """
+    Groups of terms, matched case-insensitively as plain substrings of free texts.
+
+    All terms are compiled into one escaped alternation, wrapped in a lookahead so that matches may overlap;
+    At every position the longest term wins, and the groups of the terms it contains are implied.
+    """
+
+    __groups: Dict[str, List[str]]
+    __terms: List[str]
+    __incidence: np.ndarray
+    __pattern: re.Pattern
+
+    def __init__(self, groups: Dict[str, List[str]]):
+        self.__groups = {group: [term.lower() for term in terms] for group, terms in groups.items()}
+
+        # Longest first, so the alternation prefers the longest term at each position
+        self.__terms = sorted({term for terms in self.__groups.values() for term in terms}, key=lambda term: (-len(term), term))
+
+        # Groups implied by a match of a term: Those of all terms it contains
+        self.__incidence = np.array([
+            [any(other in term for other in terms) for terms in self.__groups.values()]
+            for term in self.__terms
+        ], dtype=bool).reshape(len(self.__terms), len(self.__groups))
+
+        self.__pattern = re.compile(f'(?=({"|".join(map(re.escape, self.__terms))}))')
+
+    def __repr__(self) -> str:
+        return f'WordGroups({self.__groups})'
+
+    @property
+    def groups(self) -> Dict[str, List[str]]:
+        return self.__groups
+
+    @property
+    def pattern(self) -> re.Pattern:
+        return self.__pattern
+
+    @staticmethod
+    def normalize(texts: pd.Series) -> pd.Series:
+        return texts.fillna('').astype(str).str.lower()
+
+    def membership(self, texts: pd.Series) -> DataFrame:
+        """
+        Get which of the groups each of the texts mentions; One boolean column per group.
+        """
+
+        membership = np.zeros((len(texts), len(self.__groups)), dtype=bool)
+
+        if self.__terms:
+            matches = self.normalize(texts).reset_index(drop=True).str.extractall(self.__pattern)[0]
+
+            # Without any match, the row level is empty and not of an integer type
+            rows = matches.index.get_level_values(0).to_numpy(dtype=np.intp)
+            terms = pd.Categorical(matches.to_numpy(), categories=self.__terms).codes
+
+            np.logical_or.at(membership, rows, self.__incidence[terms])
+
+        return DataFrame(membership, index=texts.index, columns=list(self.__groups.keys()))
+
+    def counts(self, texts: pd.Series, weights: pd.Series | None=None) -> pd.Series:
+        """
+        Get the number (or the total weight) of texts mentioning each of the groups; Texts without any term count 0.
+
+        >>> WordGroups({'Free': ['free']}).counts(pd.Series(['', None, 'hallo'])).tolist()
+        [0]
+        >>> WordGroups({'Free': ['free']}).counts(pd.Series([], dtype=object)).tolist()
+        [0]
+        >>> WordGroups({'Free': ['free']}).counts(pd.Series(['for free', 'free, free'])).tolist()
+        [2]
+        """
+
+        membership = self.membership(texts)
+
+        if weights is not None:
+            membership = membership.mul(weights, axis=0)
+
+        return membership.sum()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Memoization of Question transforms, keyed by the content of the columns they read.
+"""
+
+from collections import OrderedDict
+import hashlib
+from typing import Any, Dict, Hashable, List, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+def fingerprint(df: DataFrame, columns: List[str]) -> str:
+    """
+    Cheap content hash of the given columns (including the index and the row order) of a frame.
+    """
+
+    row_hashes = pd.util.hash_pandas_object(df[columns], index=True).to_numpy()
+
+    digest = hashlib.blake2b(row_hashes.tobytes(), digest_size=16)
+    digest.update(repr(list(columns)).encode())
+
+    return digest.hexdigest()
+
+def source_digest(*filenames: str) -> str:
+    """
+    Content hash of source files; Results computed by other versions of the code do not match it.
+    """
+
+    digest = hashlib.blake2b(digest_size=16)
+
+    for filename in filenames:
+        with open(filename, 'rb') as f:
+            digest.update(f.read())
+
+    return digest.hexdigest()
+
+class TransformCache:
+    """
+    LRU bounded cache for the results of Question transforms.
+
+    Entries are dictionaries of numpy arrays, keyed by (question code, transform, fingerprint, parameters, version of the code).
+    """
+
+    __entries: 'OrderedDict[Hashable, Dict[str, np.ndarray]]'
+    __maxsize: int
+
+    hits: int = 0
+    misses: int = 0
+
+    def __init__(self, maxsize: int=256):
+        self.__entries = OrderedDict()
+        self.__maxsize = maxsize
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.__entries
+
+    @property
+    def maxsize(self) -> int:
+        return self.__maxsize
+
+    @property
+    def entries(self) -> 'OrderedDict[Hashable, Dict[str, np.ndarray]]':
+        return self.__entries
+
+    @staticmethod
+    def key(code: str, transform: str, df: DataFrame, columns: List[str], version: str='', **params: Any) -> Tuple:
+        return (code, transform, fingerprint(df, columns), tuple(sorted(params.items())), version)
+
+    def get(self, key: Hashable) -> Dict[str, np.ndarray] | None:
+        if key not in self.__entries:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+
+        # Mark as most recently used
+        self.__entries.move_to_end(key)
+
+        return self.__entries[key]
+
+    def put(self, key: Hashable, value: Dict[str, np.ndarray]) -> None:
+        self.__entries[key] = value
+        self.__entries.move_to_end(key)
+
+        # Evict the least recently used entries
+        while len(self.__entries) > self.__maxsize:
+            self.__entries.popitem(last=False)
+
+    def update(self, entries: 'OrderedDict[Hashable, Dict[str, np.ndarray]]') -> None:
+        for key, value in entries.items():
+            self.put(key, value)
+
+    def clear(self) -> None:
+        self.__entries.clear()
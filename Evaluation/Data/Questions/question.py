@@ -4,27 +4,81 @@
 Classes for the evaluation of the questionnaire
 """
 
+from contextlib import contextmanager
 from enum import Enum
-import glob
-import math
-import os
-from typing import Any, Callable, Dict, List, Tuple
+import re
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Tuple
 
 import pandas as pd
 from pandas import DataFrame
-from matplotlib.figure import Figure
 
 import numpy as np
 
-import matplotlib.pyplot as plt
+from . import density, significance
+from .instrumentation import RECORDER
+from .language import Text, translate, translations
+from .memo import TransformCache, source_digest
+from .regression import GroupRegression
+from .significance import Significance
+from .store import ResultStore
 
-import pickle
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+# Version of the transforms (implemented here and in significance.py); Editing them outdates the stored results
+TRANSFORM_VERSION = source_digest(__file__, significance.__file__)
+
+# Column holding the per-row weight of long-format frames (e.g. merged rankings)
+WEIGHT_COLUMN = '_WEIGHT'
+
+# Ways to draw the rows of a scatter plot
+SCATTER_MODES = ['points', 'raster', 'density', 'auto']
+
+# Rows above which 'auto' scatter plots draw densities instead of points, and the bins per axis of the densities
+DENSITY_THRESHOLD = 5_000
+DENSITY_BINS = 40
+
+def weights_of(df: DataFrame) -> pd.Series:
+    """
+    Get the row weights of a frame; Unweighted frames weigh every row with 1.
+    """
+
+    if WEIGHT_COLUMN in df.columns:
+        return df[WEIGHT_COLUMN]
+
+    return pd.Series(1.0, index=df.index)
+
+def weighted_mean_median(values: pd.Series, weights: pd.Series) -> Tuple[float, float]:
+    """
+    Get the weighted mean and median of the values, ignoring missing values; The median is the value where half of the weight is reached.
+    """
+
+    values = values.to_numpy(dtype=float)
+    weights = weights.to_numpy(dtype=float)
+
+    valid = ~np.isnan(values)
+    values, weights = values[valid], weights[valid]
+
+    if not len(values) or weights.sum() <= 0:
+        return np.nan, np.nan
+
+    order = np.argsort(values, kind='stable')
+    cumulative = np.cumsum(weights[order])
+
+    # Average the two middle values when half of the weight is reached exactly, like the unweighted median
+    half = cumulative[-1] / 2
+    lower = np.searchsorted(cumulative, half * (1 - 1e-12))
+    upper = np.searchsorted(cumulative, half * (1 + 1e-12), side='right')
+
+    median = (values[order][lower] + values[order][min(upper, len(values) - 1)]) / 2
+
+    return float(np.average(values, weights=weights)), float(median)
 
 class Option:
-    __text: str = ''
+    __text: Text = ''
     __code: str = ''
 
-    def __init__(self, code: str, text: str):
+    def __init__(self, code: str, text: Text):
         self.__code = code
         self.__text = text
 
@@ -36,6 +90,10 @@ class Option:
     
     @property
     def text(self) -> str:
+        return translate(self.__text)
+
+    @property
+    def texts(self) -> Text:
         return self.__text
     
     @property
@@ -57,12 +115,12 @@ class Correlation:
         self.question_b = question_b
 
     def __str__(self) -> str:
-        return f'{self.question_a.text}\nagainst {self.question_b.text}'
+        return f'{self.question_a.text}\n{translate("against")} {self.question_b.text}'
     
     def __repr__(self) -> str:
         return f'Correlation({self.question_a}, {self.question_b})'
     
-    def scatter_plot(self, df: DataFrame, fig: Figure, **kwargs: Any) -> None:
+    def scatter_plot(self, df: DataFrame, fig: 'Figure', **kwargs: Any) -> None:
         if self.question_a.type != QuestionType.NUMBER or self.question_b.type != QuestionType.NUMBER:
             raise ValueError("Both questions must be of type 'number' for a scatter plot")
 
@@ -71,17 +129,37 @@ class Correlation:
     def scatter_with_category(
             self,
             df: DataFrame,
-            fig: Figure,
+            fig: 'Figure',
             category: 'Question',
             x_log: bool=False,
             y_log: bool=False,
             colors: List[str]=[],
             show_regression: bool=False,
+            regression_log_x: bool | None=None,
+            robust: bool=False,
+            resamples: int=2000,
+            level: float=0.95,
+            mode: str='points',
+            bins: int=DENSITY_BINS,
             **kwargs: Any
         ) -> None:
+        """
+        Scatter question A (x) against question B (y), colored by the answers of `category`.
+
+        With `show_regression`, a line is fitted to every group (in log(x) if `regression_log_x`, which follows `x_log` by default;
+        Huber-robust with `robust`), with a `level` confidence band from `resamples` bootstrap resamples (none if 0).
+
+        `mode` is one of 'points' (a marker per row), 'raster' (the markers as an image inside the vector figure), 'density'
+        (the shaded regions holding 50%, 80% and 95% of the weight of every group, from `bins` x `bins` histograms in the
+        space of the axes) or 'auto' (density above `DENSITY_THRESHOLD` rows, points otherwise). Only points grow the figure with the rows.
+        """
+
         if self.question_a.type != QuestionType.NUMBER or self.question_b.type != QuestionType.NUMBER:
             raise ValueError("Both questions must be of type 'number' for a scatter plot")
 
+        if mode not in SCATTER_MODES:
+            raise ValueError(f"Scatter mode '{mode}' not supported, use one of {SCATTER_MODES}")
+
         ax = fig.gca()
 
         if category.type != QuestionType.OPTIONS:
@@ -95,44 +173,75 @@ class Correlation:
         self.question_a.make_numeric(df)
         self.question_b.make_numeric(df)
 
+        if mode == 'auto':
+            mode = 'density' if len(df) > DENSITY_THRESHOLD else 'points'
+
+        title = f'{str(self)}\n{translate("by")} {category.text}'
+
         labels: List[str] = []
-        ax_plot_params: List[Tuple[List[Any], Dict[str, Any]]] = []
-
-        for i, (key, group) in enumerate(category.group_frame(df)):
-            ax = group.plot.scatter(
-                x=self.question_a.code,
-                y=self.question_b.code,
-                title=f'{str(self)}\nby {category.text}',
-                ax=ax,
-                color=colors[i] if i < len(colors) else None,
-                label=category.text_of_option(key),
-                **kwargs
+        keys: List[Any] = []
+        handles: List[Any] = []
+
+        if mode == 'density':
+            keys = list(category.group_frame(df).size().index)
+            handles = self.density_layers(df, ax, category, keys, x_log, y_log, colors, bins)
+
+            ax.set_title(title)
+        else:
+            for i, (key, group) in enumerate(category.group_frame(df)):
+                ax = group.plot.scatter(
+                    x=self.question_a.code,
+                    y=self.question_b.code,
+                    title=title,
+                    ax=ax,
+                    color=colors[i] if i < len(colors) else None,
+                    label=category.text_of_option(key),
+                    rasterized=mode == 'raster',
+                    **kwargs
+                )
+
+                keys.append(key)
+                handles.append(ax.collections[-1])
+
+        if show_regression:
+            # Fit all groups at once; Groups are numbered in the order they were plotted
+            regression = GroupRegression(
+                df[self.question_a.code].to_numpy(),
+                df[self.question_b.code].to_numpy(),
+                pd.Categorical(df[category.code], categories=keys).codes,
+                len(keys),
+                weights=weights_of(df).to_numpy(),
+                log_x=x_log if regression_log_x is None else regression_log_x,
+                robust=robust
             )
 
-            if show_regression:
-                x = group[self.question_a.code]
-                y = group[self.question_b.code]
+            grid = regression.grid()
+            lines = regression.predict(grid)
 
-                # zip and sort by x
-                x, y = zip(*sorted(zip(x, y), key=lambda t: t[0]))
+            if resamples:
+                lower, upper = regression.bootstrap(grid, resamples=resamples, level=level)
 
-                m, b = np.polyfit(x, y, 1)
+            for i, key in enumerate(keys):
+                m, b = regression.slopes[i], regression.intercepts[i]
 
                 # Modify legend entry to have an m=... and b=... entry
                 labels.append(f'{category.text_of_option(key)} (m={m:.2f}, b={b:.2f})')
 
-                # Add the plot parameters for the regression line
-                ax_plot_params.append((
-                    [x, m * np.array(x) + b],
-                    {
-                        'color': colors[i] if i < len(colors) else None
-                    }
-                ))
+                if not np.isfinite(m):
+                    continue
+
+                color = colors[i] if i < len(colors) else None
+
+                # Add the regression line and its confidence band
+                ax.plot(regression.unscale(grid[i]), lines[i], color=color)
 
-        ax.legend(labels, title=category.text, loc='upper left')
+                if resamples:
+                    ax.fill_between(regression.unscale(grid[i]), lower[i], upper[i], color=color, alpha=0.15, linewidth=0)
+
+        else:
+            labels = [category.text_of_option(key) for key in keys]
 
-        for plot_params in ax_plot_params:
-            ax.plot(*plot_params[0], **plot_params[1])
+        ax.legend(handles, labels, title=category.text, loc='upper left')
 
         if x_log:
             ax.set_xscale('log')
@@ -143,48 +252,205 @@ class Correlation:
         ax.set_xlabel(self.question_a.text)
         ax.set_ylabel(self.question_b.text)
 
-    def bar_options_plot(self, fig: Figure, df: pd.DataFrame, title: str, normalize=False, graph_mode='bars', color_palette=[], counts_text_color='black', color_palette_mapped=[], custom_y_text=None, custom_x_text=None):
+    def density_layers(
+            self,
+            df: DataFrame,
+            ax: Any,
+            category: 'Question',
+            keys: List[Any],
+            x_log: bool,
+            y_log: bool,
+            colors: List[str],
+            bins: int
+        ) -> List[Any]:
+        """
+        Draw the highest-density regions of every group as shaded layers with contour lines; Returns the legend handles.
+
+        The weighted histograms of all groups are counted at once on shared bins, so the figure only depends on `bins`.
+        """
+
+        from matplotlib import colormaps
+        from matplotlib.patches import Patch
+
+        counts, x_edges, y_edges = density.group_histogram(
+            df[self.question_a.code].to_numpy(dtype=float),
+            df[self.question_b.code].to_numpy(dtype=float),
+            pd.Categorical(df[category.code], categories=keys).codes,
+            len(keys),
+            weights=weights_of(df).to_numpy(dtype=float),
+            bins=bins,
+            log_x=x_log,
+            log_y=y_log
+        )
+
+        counts = density.smooth(counts, passes=2)
+        x, y = density.centers(x_edges, x_log), density.centers(y_edges, y_log)
+
+        palette = colormaps['tab10'].colors
+        handles = []
+
+        for i, key in enumerate(keys):
+            color = colors[i] if i < len(colors) else palette[i % len(palette)]
+            levels = density.density_levels(counts[i])
+
+            # Inner regions are shaded darker, as their layers are stacked
+            for level in levels:
+                ax.contourf(x, y, counts[i].T, levels=[level, np.inf], colors=[color], alpha=0.2)
+
+            if len(levels):
+                ax.contour(x, y, counts[i].T, levels=levels, colors=[color], linewidths=0.8)
+
+            handles.append(Patch(facecolor=color, edgecolor=color, alpha=0.6, label=category.text_of_option(key)))
+
+        return handles
+
+    def crosstab(self, df: DataFrame, normalize: str | None=None, observed: bool=True, labels: bool=True) -> DataFrame:
+        """
+        Get the (weighted) counts of the answers of question A (rows) against the answers of question B (columns).
+
+        Ranking questions are merged first, weighing rank n with 1/n. The counts are computed in one pass over the
+        category codes of both columns and memoized per pair of questions and content of the columns.
+
+        `normalize` is one of None, 'index' (shares per row), 'columns' (shares per column) or 'all';
+        With `observed`, answers that nobody gave are dropped, with `labels` the answers are replaced by their texts.
+        """
+
+        if normalize not in (None, 'index', 'columns', 'all'):
+            raise ValueError(f"Invalid normalization: {normalize}")
+
+        question_a = self.question_a.merged if self.question_a.type == QuestionType.RANKING else self.question_a
+        question_b = self.question_b.merged if self.question_b.type == QuestionType.RANKING else self.question_b
+
+        for question in (question_a, question_b):
+            if question.type != QuestionType.OPTIONS:
+                raise ValueError(f"Question type '{question.type}' not supported for a crosstab")
+
+        categories_a = self.categories(df, self.question_a)
+        categories_b = self.categories(df, self.question_b)
+
+        def compute() -> Dict[str, np.ndarray]:
+            df_merged = df
+
+            for question in (self.question_a, self.question_b):
+                if question.type == QuestionType.RANKING:
+                    df_merged, _ = question.merge_ranks(df_merged)
+
+            codes_a = self.codes(df_merged[question_a.code], categories_a)
+            codes_b = self.codes(df_merged[question_b.code], categories_b)
+
+            valid = (codes_a >= 0) & (codes_b >= 0)
+
+            counts = np.bincount(
+                codes_a[valid] * len(categories_b) + codes_b[valid],
+                weights=weights_of(df_merged).to_numpy()[valid],
+                minlength=len(categories_a) * len(categories_b)
+            )
+
+            return {'counts': counts.reshape(len(categories_a), len(categories_b))}
+
+        columns = self.question_a.columns + self.question_b.columns + ([WEIGHT_COLUMN] if WEIGHT_COLUMN in df.columns else [])
+        counts = self.question_a.memoize('crosstab', df, columns, compute, against=self.question_b.code)['counts']
+
+        crosstab = DataFrame(
+            counts,
+            index=pd.CategoricalIndex(categories_a, categories=categories_a, name=question_a.code),
+            columns=pd.CategoricalIndex(categories_b, categories=categories_b, name=question_b.code)
+        )
+
+        if observed:
+            crosstab = crosstab.loc[crosstab.sum(axis=1) > 0, crosstab.sum(axis=0) > 0]
+            crosstab.index = crosstab.index.remove_unused_categories()
+            crosstab.columns = crosstab.columns.remove_unused_categories()
+
+        match normalize:
+            case 'index':
+                crosstab = crosstab.div(crosstab.sum(axis=1), axis=0)
+            case 'columns':
+                crosstab = crosstab.div(crosstab.sum(axis=0), axis=1)
+            case 'all':
+                crosstab = crosstab / crosstab.to_numpy().sum()
+
+        if labels:
+            crosstab.index = question_a.label_index(crosstab.index)
+            crosstab.columns = question_b.label_index(crosstab.columns)
+
+        return crosstab
+
+    def significance(self, df: DataFrame, permutations: int=10_000, seed: int=0, workers: int | None=None) -> Significance:
+        """
+        Test whether the answers to question A and question B are independent, on one answer per respondent.
+
+        Ranking questions are tested on their first slot. The result is memoized per pair of questions, content of the
+        columns and test parameters, so the figures reuse the tests the TeX snippets ran.
+        """
+
+        columns = []
+        codes = []
+
+        for question in (self.question_a, self.question_b):
+            if question.type not in (QuestionType.OPTIONS, QuestionType.RANKING):
+                raise ValueError(f"Question type '{question.type}' not supported for a significance test")
+
+            columns.append(question.ranking_nth(1) if question.type == QuestionType.RANKING else question.code)
+            codes.append(self.codes(df[columns[-1]], self.categories(df, question)))
+
+        def compute() -> Dict[str, np.ndarray]:
+            return Significance.test(*codes, permutations=permutations, seed=seed, workers=workers).arrays
+
+        arrays = self.question_a.memoize('significance', df, columns, compute, against=self.question_b.code, permutations=permutations, seed=seed)
+
+        return Significance.from_arrays(arrays)
+
+    @staticmethod
+    def categories(df: DataFrame, question: 'Question') -> List[str]:
+        """
+        Get the answers a question can take in a frame; The categories of its column or the declared answers.
+        """
+
+        column = df[question.columns[0]]
+
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            return list(column.cat.categories)
+
+        return list(question.answers.keys())
+
+    @staticmethod
+    def codes(column: pd.Series, categories: List[str]) -> np.ndarray:
+        if isinstance(column.dtype, pd.CategoricalDtype) and list(column.cat.categories) == categories:
+            return column.cat.codes.to_numpy(dtype=np.int64)
+
+        return pd.Categorical(column, categories=categories).codes.astype(np.int64)
+
+    def bar_options_plot(self, fig: 'Figure', df: pd.DataFrame, title: str, normalize=False, graph_mode='bars', color_palette=[], counts_text_color='black', color_palette_mapped=[], custom_y_text=None, custom_x_text=None, show_significance=True):
         if self.question_a.type != QuestionType.OPTIONS:
             raise ValueError(f"Question type '{self.question_a.type}' not supported for bar plot")
-            
-        FACTOR = 1
-        
-        if self.question_b.type != QuestionType.OPTIONS:
-            if self.question_b.type == QuestionType.RANKING:
-                FACTOR = sum(range(1, len(self.question_b.ranking_slots)+1))
-                df, self.question_b = self.question_b.merge_ranks(df)
-            else:
-                raise ValueError(f"Question type '{self.question_b.type}' not supported for bar plot")
-        
-        # Create a new DataFrame with the counts of the values
-        counts = df.groupby([self.question_a.code, self.question_b.code]).size().unstack().fillna(0)
 
-        # Rename the feature columns
-        counts.columns = [self.question_b.text_of_option(col) for col in counts.columns]
+        merged = False
+        question_b = self.question_b
 
-        # Remove all columns that are None
-        try:
-            counts = counts.drop(columns=[None])
-        except KeyError:
-            pass
+        if question_b.type != QuestionType.OPTIONS:
+            if question_b.type == QuestionType.RANKING:
+                merged = True
+                question_b = question_b.merged
+            else:
+                raise ValueError(f"Question type '{question_b.type}' not supported for bar plot")
 
-        # Rename the group columns
-        counts.index = [self.question_a.text_of_option(col) for col in counts.index]
+        # The (weighted) counts of the values, labeled with the texts of the answers
+        counts = self.crosstab(df)
 
         # Normalize the values
         if normalize:
             counts_norm = counts.div(counts.sum(axis=1), axis=0)
         else:
-            # Divide by the factor
-            counts_norm = counts / FACTOR
+            counts_norm = counts
 
         # Plot the values
         if graph_mode == 'bars':
-            ax = counts_norm.plot(kind='bar', stacked=True, figsize=(10, 6), title=title, ax=fig.gca(), color=color_palette)
+            ax = counts_norm.plot(kind='bar', stacked=True, figsize=(10, 6), title=translate(title), ax=fig.gca(), color=color_palette)
         else:
             raise ValueError(f"Invalid type: {graph_mode}")
-        ax.set_xlabel(self.question_a.text if custom_x_text is None else custom_x_text)
-        ax.set_ylabel('Shares per group' if normalize else 'Count' if custom_y_text is None else custom_y_text)
+        ax.set_xlabel(self.question_a.text if custom_x_text is None else translate(custom_x_text))
+        ax.set_ylabel(translate('Shares per group' if normalize else 'Count' if custom_y_text is None else custom_y_text))
 
         # Get text size based on length
         max_len = max([len(str(col)) for col in counts_norm.index])
@@ -193,8 +459,8 @@ class Correlation:
         # Adjust x-Axis text-size and orientation to fit the image
         ax.set_xticklabels(ax.get_xticklabels(), rotation=0, ha='center', va='top', fontsize=text_size)
 
-        # Add Counts text of whole group to the top of the bars
-        if normalize and FACTOR == 1:
+        # Add Counts text of whole group to the top of the bars; Merged rankings count rank slots, not respondents
+        if normalize and not merged:
             for group in counts_norm.index:
                 total_height = ax.get_ylim()[1]
                 bars_stacked_height = counts_norm.loc[group].sum()
@@ -206,7 +472,7 @@ class Correlation:
                     x=counts_norm.index.get_loc(group),
                     # At the top of the bar
                     y=center if normalize else (counts_norm.loc[group].max()),
-                    s=f"{counts.loc[group].sum()/FACTOR:.0f}",
+                    s=f"{counts.loc[group].sum():.0f}",
                     ha='center', va='center' if normalize else 'bottom', color=counts_text_color
                 )
 
@@ -216,13 +482,17 @@ class Correlation:
                 label.set_fontweight('bold')
                 label.set_color(foreground)
 
-        # Add the legend
-        ax.legend(title=self.question_b.text)
+        # Add the legend, with the test of independence below its title
+        if show_significance:
+            ax.legend(title=f'{question_b.text}\n{self.significance(df).text()}')
+        else:
+            ax.legend(title=question_b.text)
 
 class Page:
     __questions: List['Question']
     __code: str = ''
     __text: str = ''
+    __time: 'Question' = None
 
     # Static property for all pages
     PAGES: Dict[str, 'Page'] = {}
@@ -260,16 +530,21 @@ class Page:
         return self.__questions
     
     @property
-    def time(self) -> 'Question':
+    def time_code(self) -> str:
         group_number = int(self.code.split('G')[1])
-        code = f'groupTime{group_number}'
+        return f'groupTime{group_number}'
 
-        return Question(
-            code,
-            f'{self.text} Time',
-            {},
-            QuestionType.NUMBER
-        )
+    @property
+    def time(self) -> 'Question':
+        if self.__time is None:
+            self.__time = Question(
+                self.time_code,
+                translations(lambda: f'{translate(self.text)} {translate("Time")}'),
+                {},
+                QuestionType.NUMBER
+            )
+
+        return self.__time
     
     def add_question(self, question: 'Question' | List['Question']) -> None:
         if isinstance(question, list):
@@ -277,20 +552,44 @@ class Page:
         else:
             self.__questions.append(question)
 
+    @staticmethod
+    def schema() -> Dict[str, 'Question']:
+        """
+        Columns of the survey export referenced by the registered questions, with the question declaring them.
+        """
+
+        schema: Dict[str, Question] = {}
+
+        for page in list(Page.PAGES.values()):
+            # Only the survey groups (G01, G02, ...) map to columns of the export
+            if re.fullmatch(r'G\d+', page.code) is None:
+                continue
+
+            for question in page.questions:
+                for column in question.columns:
+                    schema[column] = question
+
+            schema[page.time_code] = page.time
+
+        return schema
+
 # Labels for the groups
 class Question:
     __answers: Dict[str, Option] = {}
-    __text: str = ''
+    __text: Text = ''
     __code: str = ''
     __type: str = ''
     __ranking_slots: int = 0
 
-    __cached_merged: List[Tuple[DataFrame, DataFrame, 'Question']] = []
-    __cached_num2bin: List[Tuple[DataFrame, DataFrame, 'Question']] = []
+    # Memoized transform results shared by all questions
+    __cache: TransformCache = TransformCache()
+    __store: ResultStore = ResultStore()
+
+    __merged: 'Question' = None
 
     __page: Page = None
 
-    def __init__(self, code: str, text: str, answers: Dict[str, str], type: str = QuestionType.OPTIONS, ranking_slots: int = 0):
+    def __init__(self, code: str, text: Text, answers: Dict[str, Text], type: str = QuestionType.OPTIONS, ranking_slots: int = 0, derived: bool = False):
         self.__answers = {key: Option(key, text) for key, text in answers.items()}
         self.__text = text
         self.__code = code
@@ -304,6 +603,11 @@ class Question:
         # Add the question to the respective page
         page_code = self.page_code
 
+        # Derived questions (merged rankings, binned numbers, ranking slots) are no columns of the export; They stay off the pages
+        if derived:
+            self.__page = Page.PAGES.get(page_code)
+            return
+
         if page_code in Page.PAGES:
             Page.PAGES[page_code].add_question(self)
         else:
@@ -325,19 +629,23 @@ class Question:
                 return self.__answers[key]
             else:
                 if int(key[2:]) >= len(self.__answers):
-                    raise KeyError(f"Key '{key}' not found in question '{self.__text}'")
+                    raise KeyError(f"Key '{key}' not found in question '{self.text}'")
                 return list(self.__answers.values())[int(key[2:])]
         else:
-            raise KeyError(f"Key '{key}' not found in question '{self.__text}'")
+            raise KeyError(f"Key '{key}' not found in question '{self.text}'")
         
     def __str__(self) -> str:
-        return self.__text
+        return self.text
     
     def __repr__(self) -> str:
         return f'Question("{self.__code}", "{self.__text}", {self.__answers})'
     
     @property
     def text(self) -> str:
+        return translate(self.__text)
+
+    @property
+    def texts(self) -> Text:
         return self.__text
 
     @property
@@ -358,18 +666,38 @@ class Question:
             self.ranking_nth(i) for i in range(1, self.__ranking_slots + 1)
         ]
     
+    @property
+    def columns(self) -> List[str]:
+        return self.ranking_slots if self.__type == QuestionType.RANKING else [self.code]
+
     @property
     def page_code(self) -> str:
         return self.__code.split('Q')[0]
     
     @property
     def page(self) -> Page:
-        return self.__page if self.__page is not None else Page.pages[self.page_code]
+        return self.__page if self.__page is not None else Page.PAGES[self.page_code]
     
     @property
     def time(self) -> 'Question':
         return self.page.time
 
+    @property
+    def labels(self) -> Dict[str, str]:
+        return {key: option.text for key, option in self.__answers.items()}
+
+    def label_index(self, index: pd.Index) -> pd.Index:
+        """
+        Replace the answer codes of an index by the texts of the options.
+        """
+
+        if isinstance(index, pd.CategoricalIndex):
+            # Rename the categories once instead of every entry
+            labels = self.labels
+            return index.rename_categories(lambda key: labels.get(key, key))
+
+        return index.map(self.text_of_option)
+
     def text_of_option(self, key: str) -> str:
         if key is None or key == '':
             return None
@@ -380,7 +708,7 @@ class Question:
             return key
 
     def group_frame(self, df: DataFrame) -> DataFrame:
-        return df.groupby(self.code)
+        return df.groupby(self.code, observed=True)
     
     def rename_index(self, df: DataFrame) -> None:
         return df.rename(index=self.__answers, inplace=True)
@@ -396,121 +724,144 @@ class Question:
     def ranking_nth_question(self, nth: int) -> str:
         return Question(
             self.ranking_nth(nth),
-            f'{self.text} (Ranking Slot {nth})',
-            {key: option.text for key, option in self.__answers.items()},
-            QuestionType.OPTIONS
+            translations(lambda: f'{self.text} ({translate("Ranking Slot")} {nth})'),
+            {key: option.texts for key, option in self.__answers.items()},
+            QuestionType.OPTIONS,
+            derived=True
         )
     
+    def answered_mask(self, df: DataFrame) -> np.ndarray:
+        return self.memoize(
+            'answered', df, [self.code],
+            lambda: {'mask': (df[self.code].notnull() & (df[self.code] != '')).to_numpy()}
+        )['mask']
+
     def answered(self, df: DataFrame) -> DataFrame:
-        return df[df[self.code].notnull() & (df[self.code] != '')]
-    
-    def of_answer(self, df: DataFrame, answer: str | int | List[str | int]) -> DataFrame:
+        return df[self.answered_mask(df)]
+
+    def of_answer_mask(self, df: DataFrame, answer: str | int | List[str | int]) -> np.ndarray:
         if isinstance(answer, int):
             answer = f'AO{answer:02}'
 
         if isinstance(answer, list):
-            return df[df[self.code].isin(answer)]
+            return df[self.code].isin(answer).to_numpy()
+
+        assert answer in self.__answers, f"Answer '{answer}' not found in question '{self.text}'"
 
-        assert answer in self.__answers, f"Answer '{answer}' not found in question '{self.__text}'"
+        return (df[self.code] == answer).to_numpy()
 
-        return df[df[self.code] == answer]
+    def of_answer(self, df: DataFrame, answer: str | int | List[str | int]) -> DataFrame:
+        return df[self.of_answer_mask(df, answer)]
     
-    def save_cache(self, path: str='Evaluation/cache.pkl') -> None:
-        # Pickle the cache
-        with open(path, 'wb') as f:
-            pickle.dump(self.__cached_merged, f)
+    def memoize(self, transform: str, df: DataFrame, columns: List[str], compute: Callable[[], Dict[str, np.ndarray]], **params: Any) -> Dict[str, np.ndarray]:
+        """
+        Get the arrays of a transform from the memory cache, the on-disk store or compute and cache them.
 
-    def load_cache(self, path: str='Evaluation/cache.pkl') -> None:
-        # Load the cache
-        with open(path, 'rb') as f:
-            self.__cached_merged = pickle.load(f)
+        The key covers the content of the columns read, the call parameters and the version of the code of the transforms.
+        """
 
-    def is_saved_cache_recent(self, path: str='Evaluation/cache.pkl') -> bool:
-        if not os.path.exists(path):
-            return False
+        with RECORDER.stage(transform, 'transform', question=self.code) as attributes:
+            key = TransformCache.key(self.code, transform, df, columns, version=TRANSFORM_VERSION, **params)
 
-        # Get the timestamp the newest .json file was created/modified
-        cache_time = os.path.getmtime(path)
-        source_time = os.path.getmtime(max(glob.iglob('Evaluation/Data/*.json'), key=os.path.getmtime))
+            cached = Question.__cache.get(key)
 
-        return cache_time >= source_time
+            if cached is not None:
+                attributes['cache'] = 'memory'
+                return cached
 
-    def get_cached_merged(self, df: DataFrame) -> Tuple[DataFrame, 'Question']:
-        if self.__cached_merged is None or len(self.__cached_merged) == 0:
-            if self.is_saved_cache_recent():
-                self.load_cache()
+            cached = Question.__store.get(key)
+            attributes['cache'] = 'store'
 
-        for cached in self.__cached_merged:
-            if cached[0].equals(df):
-                return cached[1], cached[2]
+            if cached is None:
+                attributes['cache'] = 'miss'
+                cached = compute()
 
-        return None, None
-    
-    def add_cached_merged(self, df: DataFrame, merged: DataFrame, question: 'Question') -> None:
-        self.__cached_merged.append((df, merged, question))
+                Question.__store.put(key, self.code, key[2], cached)
 
-        self.save_cache()
+            Question.__cache.put(key, cached)
 
-    def get_cached_num2bin(self, df: DataFrame) -> Tuple[DataFrame, 'Question']:
-        if self.__cached_num2bin is None or len(self.__cached_num2bin) == 0:
-            if self.is_saved_cache_recent():
-                self.load_cache('Evaluation/cache_num2bin.pkl')
+            return cached
 
-        for cached in self.__cached_num2bin:
-            if cached[0].equals(df):
-                return cached[1], cached[2]
+    @staticmethod
+    @contextmanager
+    def caches(cache: TransformCache, store: ResultStore) -> Iterator[None]:
+        """
+        Memoize the transforms in the block with other caches, e.g. empty ones to time the transforms.
+        """
 
-        return None, None
-    
-    def add_cached_num2bin(self, df: DataFrame, merged: DataFrame, question: 'Question') -> None:
-        self.__cached_num2bin.append((df, merged, question))
+        previous = Question.__cache, Question.__store
+        Question.__cache, Question.__store = cache, store
 
-        self.save_cache('Evaluation/cache_num2bin.pkl')
+        try:
+            yield
+        finally:
+            Question.__cache, Question.__store = previous
 
     def merge_ranks(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, 'Question']:
         assert self.__type == QuestionType.RANKING, "Question is not a ranking question"
 
-        df_cached, question_cached = self.get_cached_merged(df)
-
-        if df_cached is not None:
-            return df_cached, question_cached
-
         # Options
         options = list(self.__answers.keys())
 
         column_name = f'{self.code}_MERGED'
 
-        # Calculate multipliers for each rank
-        factor = math.lcm(*[math.prod([x for x in range(1, self.__ranking_slots + 1) if x != i]) for i in range(1, self.__ranking_slots + 1)])
-        multipliers = [int(factor / x) for x in range(1, self.__ranking_slots + 1)]
+        def compute() -> Dict[str, np.ndarray]:
+            # Rank n weighs 1/n; One long-format row per (respondent, rank slot)
+            positions = []
+            codes = []
+            rank_weights = []
+
+            for rank in range(1, self.__ranking_slots + 1):
+                column = df[self.ranking_nth(rank)]
+
+                # Rows where one of the options is selected for the current rank
+                matched = np.flatnonzero(column.isin(options).to_numpy())
 
-        print(f'Multipliers: {multipliers}')
+                positions.append(matched)
+                codes.append(pd.Index(options).get_indexer(column.to_numpy()[matched]))
+                rank_weights.append(np.full(len(matched), 1 / rank))
 
-        # Create a DataFrame to store weighted rows
-        expanded_rows = []
+            return {
+                'positions': np.concatenate(positions),
+                'codes': np.concatenate(codes),
+                'weights': np.concatenate(rank_weights)
+            }
 
-        for rank, weight_factor in zip(range(1, self.__ranking_slots + 1), multipliers):
-            column = self.ranking_nth(rank)
-            for option in options:
-                # Filter rows where the option is selected for the current rank
-                matched_rows = df[df[column] == option]
-                # Append each row 'weight_factor' times
-                for row in matched_rows.itertuples(index=False, name=None):
-                    expanded_rows.extend([option] + list(row) for _ in range(weight_factor))
+        columns = [*self.ranking_slots] + ([WEIGHT_COLUMN] if WEIGHT_COLUMN in df.columns else [])
+        merged = self.memoize('merge_ranks', df, columns, compute)
 
-        # Create a new DataFrame from the expanded rows
-        new_df = pd.DataFrame(expanded_rows, columns=[column_name, *df.columns])
+        positions = merged['positions']
 
-        question_merged = Question(column_name, f'{self.text} (Merged)', {key: option.text for key, option in self.__answers.items()}, QuestionType.OPTIONS)
+        # Take the matched rows once and attach the merged option and its weight
+        new_df = df.take(positions).reset_index(drop=True)
+        new_df.insert(0, column_name, pd.Categorical.from_codes(merged['codes'], categories=options))
+        new_df[WEIGHT_COLUMN] = weights_of(df).to_numpy()[positions] * merged['weights']
 
-        self.add_cached_merged(df, new_df, question_merged)
+        return new_df, self.merged
 
-        return new_df, question_merged
+    @property
+    def merged(self) -> 'Question':
+        """
+        The options question of the merged ranking slots.
+        """
+
+        assert self.__type == QuestionType.RANKING, "Question is not a ranking question"
+
+        if self.__merged is None:
+            self.__merged = Question(
+                f'{self.code}_MERGED',
+                translations(lambda: f'{self.text} ({translate("Merged")})'),
+                {key: option.texts for key, option in self.__answers.items()},
+                QuestionType.OPTIONS,
+                derived=True
+            )
+
+        return self.__merged
     
     def against(self, other: 'Question') -> Correlation:
         return Correlation(self, other)
 
-    def pie_plot(self, df: DataFrame, fig: Figure, colors_mapped: str=dict(), **kwargs: Any) -> None:
+    def pie_plot(self, df: DataFrame, fig: 'Figure', colors_mapped: str=dict(), **kwargs: Any) -> None:
         if self.type != QuestionType.OPTIONS:
             match self.type:
                 case QuestionType.RANKING:
@@ -520,8 +871,8 @@ class Question:
                 case _:
                     raise ValueError(f"Question type '{self.type}' not supported for pie plot")
         else:
-            counts = df.groupby(self.code).size()
-            counts.index = [self.text_of_option(index) for index in counts.index]
+            counts = weights_of(df).groupby(df[self.code], observed=True).sum()
+            counts.index = self.label_index(counts.index)
             ax = counts.plot(kind='pie', autopct='%1.1f%%', title=self.text, ax=fig.gca(), **kwargs)
             ax.axis('equal')
 
@@ -543,14 +894,31 @@ class Question:
 
                 previous_label = label_text
 
+    def numeric(self, df: DataFrame) -> np.ndarray:
+        """
+        Get the answers as floats, without changing the frame.
+        """
+
+        # Numeric columns are typed on load already
+        if pd.api.types.is_float_dtype(df[self.code]):
+            return df[self.code].to_numpy()
+
+        return self.memoize(
+            'make_numeric', df, [self.code],
+            lambda: {'values': pd.to_numeric(df[self.code], errors='coerce').to_numpy(dtype=float)}
+        )['values']
+
     def make_numeric(self, df: DataFrame) -> None:
-        df[self.code] = pd.to_numeric(df[self.code], errors='coerce')
+        if not pd.api.types.is_float_dtype(df[self.code]):
+            df[self.code] = self.numeric(df)
+
+    def numeric_mask(self, df: DataFrame, filter: Callable[..., bool]) -> np.ndarray:
+        return np.asarray(filter(pd.Series(self.numeric(df), index=df.index)), dtype=bool)
 
     def filter_numeric(self, df: DataFrame, filter: Callable[..., bool]) -> DataFrame:
-        self.make_numeric(df)
-        return df[filter(df[self.code])]
+        return df[self.numeric_mask(df, filter)]
     
-    def histogram(self, df: DataFrame, fig: Figure, bins: int=10, **kwargs: Any) -> None:
+    def histogram(self, df: DataFrame, fig: 'Figure', bins: int=10, **kwargs: Any) -> None:
         if self.type != QuestionType.NUMBER:
             raise ValueError(f"Question type '{self.type}' not supported for histogram")
 
@@ -559,13 +927,17 @@ class Question:
         ax = fig.gca()
 
         # Add mean and median lines
-        mean = df[self.code].mean()
-        median = df[self.code].median()
+        if WEIGHT_COLUMN in df.columns:
+            mean, median = weighted_mean_median(df[self.code], weights_of(df))
+            kwargs = {'weights': weights_of(df).to_numpy(), **kwargs}
+        else:
+            mean = df[self.code].mean()
+            median = df[self.code].median()
 
         ax.axvline(mean, color='r', linestyle='dashed', linewidth=1)
         ax.axvline(median, color='g', linestyle='dashed', linewidth=1)
 
-        ax.legend([f'Mean: {mean:.2f}', f'Median: {median:.2f}'])
+        ax.legend([f'{translate("Mean")}: {mean:.2f}', f'{translate("Median")}: {median:.2f}'])
 
         df[self.code].plot.hist(bins=bins, title=self.text, ax=ax, **kwargs)
 
@@ -573,24 +945,28 @@ class Question:
         if self.type != QuestionType.NUMBER:
             raise ValueError(f"Question type '{self.type}' not supported for binning")
         
-        if self.is_saved_cache_recent('Evaluation/cache_num2bin.pkl'):
-            cached_df, question_binned = self.get_cached_num2bin(df)
-
-            if cached_df is not None:
-                return cached_df, question_binned
-
         self.make_numeric(df)
 
         column_name = f'{self.code}_BINS'
 
-        # Get the min and max values
-        min_value = df[self.code].min() if min is None else min
+        def compute() -> Dict[str, np.ndarray]:
+            # Get the min and max values
+            min_value = df[self.code].min() if min is None else min
 
-        # Get the max value
-        max_value = (df[self.code].max() if max is None else max) + bin_size
+            # Get the max value
+            max_value = (df[self.code].max() if max is None else max) + bin_size
 
-        # Create the bins
-        bins = np.arange(min_value, max_value, bin_size)
+            # Create the bins
+            bins = np.arange(min_value, max_value, bin_size)
+
+            return {
+                'bins': bins,
+                'codes': pd.cut(df[self.code], bins, labels=False, include_lowest=True).fillna(-1).to_numpy(dtype=int)
+            }
+
+        binned = self.memoize('numeric_to_bins_options', df, [self.code], compute, bin_size=bin_size, min=min, max=max)
+
+        bins = binned['bins']
 
         # Create the labels
         labels = [f'{int(bins[i])}-{int(bins[i+1])}' for i in range(len(bins) - 1)]
@@ -598,10 +974,8 @@ class Question:
         df_binned = df.copy()
 
         # Create the new column
-        df_binned[column_name] = pd.cut(df[self.code], bins, labels=labels, include_lowest=True)
-
-        question_binned = Question(column_name, f'{self.text} (Binned)', {label: f'{label}km' for i, label in enumerate(labels)}, QuestionType.OPTIONS)
+        df_binned[column_name] = pd.Categorical.from_codes(binned['codes'], categories=labels, ordered=True)
 
-        self.add_cached_num2bin(df, df_binned, question_binned)
+        question_binned = Question(column_name, translations(lambda: f'{self.text} ({translate("Binned")})'), {label: f'{label}km' for i, label in enumerate(labels)}, QuestionType.OPTIONS, derived=True)
 
         return df_binned, question_binned
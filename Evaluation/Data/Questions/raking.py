@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Raking (iterative proportional fitting) of respondent weights to known margins of the population.
+"""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+from pandas import DataFrame
+
+from .question import Correlation, Question, QuestionType
+
+class Raking:
+    """
+    Weights of the respondents such that the weighted shares of the answers to each margin question match the known shares.
+
+    Each margin maps the answer codes of an options question to their share of the population; Respondents giving other
+    answers (or none) are left out of that margin. The weights are normalized to a mean of 1 over the respondents in any
+    margin, so weighted counts stay comparable to the unweighted ones.
+    """
+
+    __margins: List[Tuple[Question, Dict[str, float]]]
+    __max_iterations: int
+    __tolerance: float
+
+    def __init__(self, margins: List[Tuple[Question, Dict[str, float]]], max_iterations: int=100, tolerance: float=1e-6):
+        for question, shares in margins:
+            if question.type != QuestionType.OPTIONS:
+                raise ValueError(f"Question type '{question.type}' not supported for raking")
+
+            for answer in shares:
+                assert answer in question.answers, f"Answer '{answer}' not found in question '{question.text}'"
+
+        self.__margins = margins
+        self.__max_iterations = max_iterations
+        self.__tolerance = tolerance
+
+    def __repr__(self) -> str:
+        return f'Raking({[question.code for question, _ in self.__margins]})'
+
+    @property
+    def margins(self) -> List[Tuple[Question, Dict[str, float]]]:
+        return self.__margins
+
+    def rake(self, df: DataFrame) -> 'RakingResult':
+        """
+        Get the weights of the rows of `df`; Every iteration scales the weights once per margin with one bincount each.
+        """
+
+        codes = []
+        targets = []
+
+        for question, shares in self.__margins:
+            answers = list(shares.keys())
+
+            codes.append(Correlation.codes(df[question.code], answers))
+            targets.append(np.array([shares[answer] for answer in answers]) / sum(shares.values()))
+
+        weights = np.ones(len(df))
+        error = 0.0
+        iteration = 0
+
+        for iteration in range(1, self.__max_iterations + 1 if codes else 1):
+            for margin_codes, target in zip(codes, targets):
+                totals = self.totals(margin_codes, weights, len(target))
+
+                # Scale every answer to its share of the weight of the respondents in the margin; Unobserved answers stay empty
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    factors = np.where(totals > 0, target * totals.sum() / totals, 1.0)
+
+                included = margin_codes >= 0
+                weights[included] *= factors[margin_codes[included]]
+
+            # Largest deviation of a weighted share from its target after the sweep
+            error = 0.0
+
+            for margin_codes, target in zip(codes, targets):
+                totals = self.totals(margin_codes, weights, len(target))
+
+                if totals.sum() > 0:
+                    error = max(error, np.abs(totals / totals.sum() - target).max())
+
+            if error < self.__tolerance:
+                break
+
+        # Mean weight 1 over the raked respondents
+        raked = np.logical_or.reduce([margin_codes >= 0 for margin_codes in codes]) if codes else np.zeros(len(df), dtype=bool)
+
+        if raked.any():
+            weights[raked] /= weights[raked].mean()
+
+        return RakingResult(weights, iteration, error < self.__tolerance, error)
+
+    @staticmethod
+    def totals(codes: np.ndarray, weights: np.ndarray, length: int) -> np.ndarray:
+        included = codes >= 0
+
+        return np.bincount(codes[included], weights=weights[included], minlength=length)
+
+class RakingResult:
+    """
+    Weights of a raking with its convergence and Kish's design effect (the variance inflation of weighted estimates).
+    """
+
+    __weights: np.ndarray
+    __iterations: int
+    __converged: bool
+    __error: float
+
+    def __init__(self, weights: np.ndarray, iterations: int, converged: bool, error: float):
+        self.__weights = weights
+        self.__iterations = iterations
+        self.__converged = converged
+        self.__error = error
+
+    def __repr__(self) -> str:
+        return (
+            f'RakingResult(iterations={self.__iterations}, converged={self.__converged}, error={self.__error:.2e}, '
+            f'design_effect={self.design_effect:.3f}, effective_n={self.effective_n:.1f})'
+        )
+
+    @property
+    def weights(self) -> np.ndarray:
+        return self.__weights
+
+    @property
+    def iterations(self) -> int:
+        return self.__iterations
+
+    @property
+    def converged(self) -> bool:
+        return self.__converged
+
+    @property
+    def error(self) -> float:
+        return self.__error
+
+    @property
+    def design_effect(self) -> float:
+        """
+        Kish's design effect n * sum(w^2) / sum(w)^2; 1 for equal weights.
+        """
+
+        total = self.__weights.sum()
+
+        return float(len(self.__weights) * (self.__weights ** 2).sum() / total ** 2) if total > 0 else float('nan')
+
+    @property
+    def effective_n(self) -> float:
+        return len(self.__weights) / self.design_effect
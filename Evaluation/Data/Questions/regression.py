@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Straight-line regressions of many groups at once, with bootstrap confidence bands.
+"""
+
+from typing import Tuple
+import warnings
+
+import numpy as np
+
+# Tuning constant of the Huber loss (95% efficiency for normal residuals)
+HUBER_K = 1.345
+
+# Largest number of Poisson weights (resamples x rows) drawn for an exact bootstrap
+BOOTSTRAP_BUDGET = 20_000_000
+
+def group_sums(x: np.ndarray, y: np.ndarray, groups: np.ndarray, n_groups: int, weights: np.ndarray) -> np.ndarray:
+    """
+    Get the weighted sufficient statistics (w, wx, wy, wxx, wxy) of every group; Shape (5, n_groups).
+    """
+
+    values = np.stack([weights, weights * x, weights * y, weights * x * x, weights * x * y])
+
+    return np.stack([np.bincount(groups, weights=value, minlength=n_groups) for value in values])
+
+def solve_sums(sums: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get the least-squares slopes and intercepts from sufficient statistics of shape (5, ...); NaN for degenerate groups.
+    """
+
+    w, wx, wy, wxx, wxy = sums
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        denominator = w * wxx - wx * wx
+        slopes = np.where(denominator > 0, (w * wxy - wx * wy) / denominator, np.nan)
+        intercepts = (wy - slopes * wx) / w
+
+    return slopes, intercepts
+
+def group_median(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """
+    Get the median of the values of every group, for values ordered by group starting at `offsets`.
+    """
+
+    return np.array([np.median(values[start:stop]) if stop > start else np.nan for start, stop in zip(offsets[:-1], offsets[1:])])
+
+class GroupRegression:
+    """
+    Weighted straight-line fits y = m * x + b of all groups at once; In log(x) with `log_x`, robust to outliers with `robust`.
+
+    The robust fit is a Huber M-estimate (iteratively reweighted least squares, scale from the median absolute residual).
+    """
+
+    __log_x: bool
+    __robust: bool
+    __n_groups: int
+
+    __x: np.ndarray
+    __y: np.ndarray
+    __groups: np.ndarray
+    __weights: np.ndarray
+    __offsets: np.ndarray
+
+    __slopes: np.ndarray
+    __intercepts: np.ndarray
+
+    def __init__(
+            self,
+            x: np.ndarray,
+            y: np.ndarray,
+            groups: np.ndarray,
+            n_groups: int,
+            weights: np.ndarray | None=None,
+            log_x: bool=False,
+            robust: bool=False,
+            iterations: int=50,
+            tolerance: float=1e-8
+        ):
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        groups = np.asarray(groups, dtype=np.int64)
+        weights = np.ones(len(x)) if weights is None else np.asarray(weights, dtype=float)
+
+        # Drop rows without a group or value (and non-positive x for the log fit)
+        valid = (groups >= 0) & np.isfinite(x) & np.isfinite(y) & np.isfinite(weights)
+
+        if log_x:
+            valid &= x > 0
+
+        self.__log_x = log_x
+        self.__robust = robust
+        self.__n_groups = n_groups
+
+        # Rows ordered by group, so each group is a slice
+        order = np.argsort(groups[valid], kind='stable')
+
+        self.__x = (np.log(x[valid]) if log_x else x[valid])[order]
+        self.__y = y[valid][order]
+        self.__groups = groups[valid][order]
+        self.__weights = weights[valid][order]
+        self.__offsets = np.concatenate([[0], np.cumsum(np.bincount(self.__groups, minlength=n_groups))])
+
+        self.__slopes, self.__intercepts = solve_sums(group_sums(self.__x, self.__y, self.__groups, n_groups, self.__weights))
+
+        if robust:
+            self.__irls(iterations, tolerance)
+
+    def __irls(self, iterations: int, tolerance: float) -> None:
+        # Rows are down-weighted by the size of their residual relative to the scale of their group
+        base_weights = self.__weights
+
+        for _ in range(iterations):
+            residuals = self.__y - (self.__slopes[self.__groups] * self.__x + self.__intercepts[self.__groups])
+            scale = group_median(np.abs(residuals), self.__offsets) / 0.6745
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                limit = HUBER_K * scale[self.__groups]
+                huber = np.where(np.abs(residuals) > limit, limit / np.abs(residuals), 1.0)
+
+            self.__weights = base_weights * np.nan_to_num(huber, nan=1.0)
+
+            slopes, intercepts = solve_sums(group_sums(self.__x, self.__y, self.__groups, self.__n_groups, self.__weights))
+            converged = np.allclose(slopes, self.__slopes, rtol=tolerance, atol=tolerance, equal_nan=True)
+
+            self.__slopes, self.__intercepts = slopes, intercepts
+
+            if converged:
+                break
+
+    @property
+    def slopes(self) -> np.ndarray:
+        return self.__slopes
+
+    @property
+    def intercepts(self) -> np.ndarray:
+        return self.__intercepts
+
+    @property
+    def log_x(self) -> bool:
+        return self.__log_x
+
+    @property
+    def robust(self) -> bool:
+        return self.__robust
+
+    def grid(self, points: int=50) -> np.ndarray:
+        """
+        Get `points` evenly spaced x values (in the space of the fit) over the range of every group; Shape (n_groups, points).
+        """
+
+        lower = np.full(self.__n_groups, np.nan)
+        upper = np.full(self.__n_groups, np.nan)
+
+        if len(self.__x):
+            np.fmin.at(lower, self.__groups, self.__x)
+            np.fmax.at(upper, self.__groups, self.__x)
+
+        return lower[:, None] + (upper - lower)[:, None] * np.linspace(0, 1, points)
+
+    def predict(self, grid: np.ndarray) -> np.ndarray:
+        return self.__slopes[:, None] * grid + self.__intercepts[:, None]
+
+    def unscale(self, grid: np.ndarray) -> np.ndarray:
+        """
+        Map x values from the space of the fit back to the data.
+        """
+
+        return np.exp(grid) if self.__log_x else grid
+
+    def bootstrap(self, grid: np.ndarray, resamples: int=2000, level: float=0.95, seed: int=0, chunk: int | None=None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the lower and upper confidence band of the lines of every group on `grid`; Each of shape (n_groups, points).
+
+        Resamples draw a Poisson(1) weight per row (a Poisson bootstrap), so every resample is a matrix product of the weights
+        with the per-row sufficient statistics, computed in chunks of resamples. Above `BOOTSTRAP_BUDGET` weights the
+        sums are drawn from the normal distribution with the same mean and covariance instead, independently of the rows.
+        Robust fits are resampled with their final weights (one IRLS step).
+        """
+
+        rng = np.random.default_rng(seed)
+
+        n_groups = self.__n_groups
+        w = self.__weights
+
+        # Per-row contributions to the sums of their group; Shape (rows, 5)
+        contributions = np.stack([w, w * self.__x, w * self.__y, w * self.__x * self.__x, w * self.__x * self.__y], axis=1)
+
+        if len(w) * resamples <= BOOTSTRAP_BUDGET:
+            chunk = chunk or max(1, min(resamples, BOOTSTRAP_BUDGET // (8 * max(len(w), 1))))
+
+            # Scatter the contributions into the columns of their group; Shape (rows, n_groups * 5)
+            design = np.zeros((len(w), n_groups * 5))
+
+            for statistic in range(5):
+                design[np.arange(len(w)), self.__groups * 5 + statistic] = contributions[:, statistic]
+
+            sums = np.empty((resamples, n_groups * 5))
+
+            for start in range(0, resamples, chunk):
+                stop = min(start + chunk, resamples)
+                sums[start:stop] = rng.poisson(1.0, size=(stop - start, len(w))) @ design
+        else:
+            # Poisson(1) weights have mean and variance 1: The sums have mean sum(v) and covariance sum(v v^T)
+            mean = np.zeros((n_groups, 5))
+            covariance = np.zeros((n_groups, 5, 5))
+
+            np.add.at(mean, self.__groups, contributions)
+            np.add.at(covariance, self.__groups, contributions[:, :, None] * contributions[:, None, :])
+
+            # Jitter the diagonal, as the covariance of a single row is singular
+            factors = np.linalg.cholesky(covariance + 1e-12 * np.eye(5) * (1 + np.trace(covariance, axis1=1, axis2=2))[:, None, None])
+
+            sums = mean[None] + np.einsum('gij,bgj->bgi', factors, rng.standard_normal((resamples, n_groups, 5)))
+
+        slopes, intercepts = solve_sums(np.moveaxis(sums.reshape(resamples, n_groups, 5), 2, 0))
+
+        # Lines of all resamples on the grid; Shape (resamples, n_groups, points)
+        lines = slopes[:, :, None] * grid[None] + intercepts[:, :, None]
+
+        alpha = (1 - level) / 2
+
+        # Degenerate groups have no line in any resample
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            lower, upper = np.nanquantile(lines, [alpha, 1 - alpha], axis=0)
+
+        return lower, upper
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Significance of the association between the answers to two questions: Chi-square, Cramér's V and exact or permutation tests.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import math
+import multiprocessing
+import os
+from typing import Dict, Tuple
+
+import numpy as np
+
+# Most permuted codes (permutations x respondents) held in memory at once per worker
+PERMUTATION_BUDGET = 4_000_000
+
+# Permutations per block; Every block draws from its own stream, so the blocks can run on any number of workers
+PERMUTATION_BLOCK = 1000
+
+def chi2_sf(statistic: float, dof: int) -> float:
+    """
+    Survival function of the chi-square distribution; The regularized upper incomplete gamma function Q(dof / 2, statistic / 2).
+    """
+
+    if not np.isfinite(statistic) or dof <= 0:
+        return float('nan')
+    if statistic <= 0:
+        return 1.0
+
+    a, x = dof / 2, statistic / 2
+    prefactor = math.exp(-x + a * math.log(x) - math.lgamma(a))
+
+    if x < a + 1:
+        # Series of the lower function P(a, x)
+        term = total = 1 / a
+
+        for n in range(1, 1000):
+            term *= x / (a + n)
+            total += term
+
+            if abs(term) < abs(total) * 1e-15:
+                break
+
+        return max(0.0, 1 - total * prefactor)
+
+    # Continued fraction of Q(a, x) (modified Lentz)
+    tiny = 1e-300
+
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+
+    for n in range(1, 1000):
+        an = -n * (n - a)
+        b += 2
+
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+
+        d = 1 / d
+        h *= d * c
+
+        if abs(d * c - 1) < 1e-15:
+            break
+
+    return prefactor * h
+
+def chi_square_statistics(tables: np.ndarray, expected: np.ndarray) -> np.ndarray:
+    """
+    Get the Pearson statistic of contingency tables (..., rows, columns) with the same margins, thus the same expected counts.
+    """
+
+    n = expected.sum()
+
+    return (tables * tables / expected).sum(axis=(-2, -1)) - n
+
+def fisher_exact(table: np.ndarray) -> float:
+    """
+    Get the two-sided p-value of Fisher's exact test of a 2x2 table; The tables with the same margins no more likely than it.
+    """
+
+    (a, b), (c, d) = np.asarray(table, dtype=np.int64)
+
+    row, column, n = a + b, a + c, a + b + c + d
+
+    # Hypergeometric probabilities of all possible top-left cells
+    k = np.arange(max(0, row + column - n), min(row, column) + 1)
+    lgamma = np.vectorize(math.lgamma)
+    log_pmf = (
+        lgamma(row + 1) + lgamma(n - row + 1) + lgamma(column + 1) + lgamma(n - column + 1) - lgamma(n + 1)
+        - lgamma(k + 1) - lgamma(row - k + 1) - lgamma(column - k + 1) - lgamma(n - row - column + k + 1)
+    )
+    pmf = np.exp(log_pmf)
+
+    return float(min(1.0, pmf[pmf <= pmf[k == a] * (1 + 1e-7)].sum()))
+
+def permutation_statistics(codes_a: np.ndarray, codes_b: np.ndarray, shape: Tuple[int, int], permutations: int, seed: np.random.SeedSequence) -> np.ndarray:
+    """
+    Get the chi-square statistics of `permutations` random pairings of the answers; Computed in chunks of one bincount each.
+    """
+
+    rng = np.random.default_rng(seed)
+
+    cells = shape[0] * shape[1]
+    expected = np.outer(np.bincount(codes_a, minlength=shape[0]), np.bincount(codes_b, minlength=shape[1])) / len(codes_a)
+
+    chunk = max(1, min(permutations, PERMUTATION_BUDGET // max(len(codes_a), 1)))
+    statistics = np.empty(permutations)
+
+    for start in range(0, permutations, chunk):
+        stop = min(start + chunk, permutations)
+
+        # Shuffle the answers to B in every row, keeping both margins
+        permuted = rng.permuted(np.tile(codes_b, (stop - start, 1)), axis=1)
+
+        tables = np.bincount(
+            (np.arange(stop - start)[:, None] * cells + codes_a * shape[1] + permuted).ravel(),
+            minlength=(stop - start) * cells
+        ).reshape(stop - start, *shape)
+
+        statistics[start:stop] = chi_square_statistics(tables, expected)
+
+    return statistics
+
+def permutation_block(args: Tuple[np.ndarray, np.ndarray, Tuple[int, int], int, np.random.SeedSequence]) -> np.ndarray:
+    return permutation_statistics(*args)
+
+class Significance:
+    """
+    Test of independence of the answers to two questions on their contingency table (respondents, unweighted).
+
+    `p_value` is the asymptotic chi-square p-value, `p_permutation` the share of the permuted pairings with at least the same
+    statistic and `p_exact` Fisher's exact p-value (2x2 tables only, NaN otherwise).
+    """
+
+    __table: np.ndarray
+    __statistic: float
+    __dof: int
+    __p_value: float
+    __p_permutation: float
+    __p_exact: float
+    __permutations: int
+
+    def __init__(self, table: np.ndarray, statistic: float, dof: int, p_value: float, p_permutation: float, p_exact: float, permutations: int):
+        self.__table = table
+        self.__statistic = statistic
+        self.__dof = dof
+        self.__p_value = p_value
+        self.__p_permutation = p_permutation
+        self.__p_exact = p_exact
+        self.__permutations = permutations
+
+    def __repr__(self) -> str:
+        return f'Significance(chi2={self.__statistic:.2f}, dof={self.__dof}, p={self.p:.4f}, V={self.cramers_v:.2f})'
+
+    @property
+    def table(self) -> np.ndarray:
+        return self.__table
+
+    @property
+    def n(self) -> int:
+        return int(self.__table.sum())
+
+    @property
+    def statistic(self) -> float:
+        return self.__statistic
+
+    @property
+    def dof(self) -> int:
+        return self.__dof
+
+    @property
+    def p_value(self) -> float:
+        return self.__p_value
+
+    @property
+    def p_permutation(self) -> float:
+        return self.__p_permutation
+
+    @property
+    def p_exact(self) -> float:
+        return self.__p_exact
+
+    @property
+    def permutations(self) -> int:
+        return self.__permutations
+
+    @property
+    def sparse(self) -> bool:
+        """
+        Whether the chi-square approximation is unreliable: More than 20% of the expected counts below 5 (or any below 1).
+        """
+
+        return Significance.is_sparse(np.outer(self.__table.sum(axis=1), self.__table.sum(axis=0)) / max(self.n, 1))
+
+    @staticmethod
+    def is_sparse(expected: np.ndarray) -> bool:
+        return bool((expected < 5).mean() > 0.2 or (expected < 1).any())
+
+    @property
+    def p(self) -> float:
+        """
+        The p-value to report: Exact for 2x2 tables, from the permutations for sparse tables, asymptotic otherwise.
+        """
+
+        if not np.isnan(self.__p_exact):
+            return self.__p_exact
+        if self.sparse and self.__permutations:
+            return self.__p_permutation
+
+        return self.__p_value
+
+    @property
+    def method(self) -> str:
+        if not np.isnan(self.__p_exact):
+            return 'Fisher'
+        if self.sparse and self.__permutations:
+            return 'Permutation'
+
+        return 'Chi-square'
+
+    @property
+    def cramers_v(self) -> float:
+        k = min(self.__table.shape) - 1
+
+        return math.sqrt(self.__statistic / (self.n * k)) if k > 0 and self.n else float('nan')
+
+    @property
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            'table': self.__table,
+            'scalars': np.array([self.__statistic, self.__dof, self.__p_value, self.__p_permutation, self.__p_exact, self.__permutations]),
+        }
+
+    @staticmethod
+    def from_arrays(arrays: Dict[str, np.ndarray]) -> 'Significance':
+        statistic, dof, p_value, p_permutation, p_exact, permutations = arrays['scalars']
+
+        return Significance(arrays['table'], float(statistic), int(dof), float(p_value), float(p_permutation), float(p_exact), int(permutations))
+
+    @staticmethod
+    def test(codes_a: np.ndarray, codes_b: np.ndarray, permutations: int=10_000, seed: int=0, workers: int | None=None) -> 'Significance':
+        """
+        Test the pairs of answer codes (negative codes are unanswered) for independence.
+
+        The `permutations` only run for sparse tables larger than 2x2, the only ones whose p-value they give; Others skip them.
+        The permutations are split into blocks, each with its own stream spawned from `seed`, so the result only depends
+        on `seed`; Forked workers run the blocks concurrently (not from within a worker process).
+        """
+
+        valid = (codes_a >= 0) & (codes_b >= 0)
+
+        # Answers nobody gave neither count as rows / columns nor as degrees of freedom
+        _, codes_a = np.unique(codes_a[valid], return_inverse=True)
+        _, codes_b = np.unique(codes_b[valid], return_inverse=True)
+
+        shape = (int(codes_a.max(initial=-1)) + 1, int(codes_b.max(initial=-1)) + 1)
+        table = np.bincount(codes_a * shape[1] + codes_b, minlength=shape[0] * shape[1]).reshape(shape)
+
+        if min(shape) < 2:
+            return Significance(table, float('nan'), 0, float('nan'), float('nan'), float('nan'), 0)
+
+        expected = np.outer(table.sum(axis=1), table.sum(axis=0)) / table.sum()
+        statistic = float(chi_square_statistics(table, expected))
+        dof = (shape[0] - 1) * (shape[1] - 1)
+
+        p_exact = fisher_exact(table) if shape == (2, 2) else float('nan')
+
+        p_permutation = float('nan')
+
+        # Fisher covers 2x2 tables, the chi-square approximation dense ones
+        if not np.isnan(p_exact) or not Significance.is_sparse(expected):
+            permutations = 0
+
+        if permutations:
+            workers = workers or os.cpu_count() or 1
+
+            # Nested pools would oversubscribe the cores the figures are rendered on
+            if multiprocessing.parent_process() is not None:
+                workers = 1
+
+            blocks = np.array_split(np.arange(permutations), math.ceil(permutations / PERMUTATION_BLOCK))
+            jobs = [
+                (codes_a, codes_b, shape, len(block), seed_sequence)
+                for block, seed_sequence in zip(blocks, np.random.SeedSequence(seed).spawn(len(blocks)))
+            ]
+
+            if min(workers, len(blocks)) > 1 and 'fork' in multiprocessing.get_all_start_methods():
+                with ProcessPoolExecutor(min(workers, len(blocks)), mp_context=multiprocessing.get_context('fork')) as executor:
+                    statistics = np.concatenate(list(executor.map(permutation_block, jobs)))
+            else:
+                statistics = np.concatenate([permutation_block(job) for job in jobs])
+
+            # Counting the observed pairing as one of the permutations keeps the p-value valid
+            p_permutation = float((1 + np.sum(statistics >= statistic * (1 - 1e-12))) / (1 + permutations))
+
+        return Significance(table, statistic, dof, chi2_sf(statistic, dof), p_permutation, p_exact, permutations)
+
+    def text(self) -> str:
+        """
+        Short summary for plots, like 'χ²(4) = 12.30, p = 0.015, V = 0.12'.
+        """
+
+        p = 'p < 0.001' if self.p < 0.001 else f'p = {self.p:.3f}'
+
+        return f'χ²({self.__dof}) = {self.__statistic:.2f}, {p}, V = {self.cramers_v:.2f}'
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+On-disk store for the results of Question transforms; One .npz file per entry.
+"""
+
+from contextlib import contextmanager
+import hashlib
+import io
+import json
+import os
+import tempfile
+from typing import Any, Dict, Hashable, Iterator
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory locking available (e.g. on Windows)
+    fcntl = None
+
+# Evaluation/.cache
+CACHE_FOLDER = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    '.cache'
+)
+
+class ResultStore:
+    """
+    Evictable store of transform results.
+
+    The index maps the digest of each key to the question code, the input fingerprint and the
+    entry file. The modification time of an entry file is its last use; Entries are evicted in
+    LRU order once the store grows beyond `max_bytes`.
+    """
+
+    __folder: str
+    __max_bytes: int
+
+    __index: Dict[str, Dict[str, Any]] = None
+
+    def __init__(self, folder: str=CACHE_FOLDER, max_bytes: int=64 * 1024 * 1024):
+        self.__folder = folder
+        self.__max_bytes = max_bytes
+
+    @property
+    def folder(self) -> str:
+        return self.__folder
+
+    @property
+    def folder_entries(self) -> str:
+        return os.path.join(self.__folder, 'entries')
+
+    @property
+    def filename_index(self) -> str:
+        return os.path.join(self.__folder, 'index.json')
+
+    @property
+    def filename_lock(self) -> str:
+        return os.path.join(self.__folder, '.lock')
+
+    @property
+    def max_bytes(self) -> int:
+        return self.__max_bytes
+
+    @property
+    def index(self) -> Dict[str, Dict[str, Any]]:
+        if self.__index is None:
+            self.__index = self.read_index()
+
+        return self.__index
+
+    @staticmethod
+    def digest(key: Hashable) -> str:
+        return hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """
+        Hold an exclusive lock on the store across processes.
+        """
+
+        os.makedirs(self.__folder, exist_ok=True)
+
+        with open(self.filename_lock, 'a') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def read_index(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(self.filename_index):
+            return {}
+
+        try:
+            with open(self.filename_index, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            # A broken index only costs recomputation
+            return {}
+
+    def write_index(self, index: Dict[str, Dict[str, Any]]) -> None:
+        self.write_atomic(self.filename_index, json.dumps(index, indent=1).encode())
+
+    def write_atomic(self, filename: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(filename), suffix='.tmp')
+
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+
+            os.replace(tmp, filename)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def get(self, key: Hashable) -> Dict[str, np.ndarray] | None:
+        digest = self.digest(key)
+
+        if digest not in self.index:
+            return None
+
+        filename = os.path.join(self.folder_entries, self.index[digest]['file'])
+
+        try:
+            with np.load(filename, allow_pickle=False) as entry:
+                arrays = {name: entry[name] for name in entry.files}
+        except (OSError, ValueError):
+            # Entry evicted by another process or unreadable
+            del self.index[digest]
+            return None
+
+        # Mark as recently used; The arrays are read, even if another process evicted the entry meanwhile
+        try:
+            os.utime(filename)
+        except OSError:
+            pass
+
+        return arrays
+
+    def put(self, key: Hashable, code: str, fingerprint: str, arrays: Dict[str, np.ndarray]) -> None:
+        digest = self.digest(key)
+        filename = f'{digest}.npz'
+
+        buffer = io.BytesIO()
+        np.savez(buffer, **arrays)
+
+        self.write_atomic(os.path.join(self.folder_entries, filename), buffer.getvalue())
+
+        with self.lock():
+            # Merge with the entries other processes added meanwhile
+            index = self.read_index()
+
+            index[digest] = {
+                'code': code,
+                'fingerprint': fingerprint,
+                'file': filename,
+                'size': os.path.getsize(os.path.join(self.folder_entries, filename))
+            }
+
+            self.evict(index)
+            self.write_index(index)
+
+        self.__index = index
+
+    def evict(self, index: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Remove the least recently used entries until the store fits into `max_bytes`.
+        """
+
+        def last_used(digest: str) -> float:
+            try:
+                return os.path.getmtime(os.path.join(self.folder_entries, index[digest]['file']))
+            except OSError:
+                return 0.0
+
+        total = sum(entry['size'] for entry in index.values())
+
+        for digest in sorted(index, key=last_used):
+            if total <= self.__max_bytes:
+                break
+
+            total -= index[digest]['size']
+
+            try:
+                os.unlink(os.path.join(self.folder_entries, index.pop(digest)['file']))
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        with self.lock():
+            for entry in self.read_index().values():
+                try:
+                    os.unlink(os.path.join(self.folder_entries, entry['file']))
+                except OSError:
+                    pass
+
+            self.write_index({})
+
+        self.__index = {}
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Inverted index of the answers to text questions, with term and n-gram frequencies.
+"""
+
+import heapq
+import re
+from typing import Dict, Iterable, List, Set, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from .question import Question, QuestionType
+
+# Words (including umlauts and ß), numbers and amounts like 0€
+TOKEN_PATTERN = re.compile(r'\w+€?|€')
+
+# Frequent German and English words that carry no meaning on their own
+STOPWORDS: Set[str] = {
+    # German
+    'aber', 'alle', 'als', 'also', 'am', 'an', 'auch', 'auf', 'aus', 'bei', 'bin', 'bis', 'da', 'damit', 'dann',
+    'das', 'dass', 'dem', 'den', 'denen', 'der', 'des', 'die', 'dies', 'diese', 'dieser', 'doch', 'du', 'durch',
+    'ein', 'eine', 'einem', 'einen', 'einer', 'es', 'für', 'hat', 'haben', 'ich', 'ihr', 'im', 'in', 'ist', 'ja',
+    'jeder', 'kann', 'man', 'mehr', 'mit', 'muss', 'nach', 'nicht', 'noch', 'nur', 'ob', 'oder', 'sich', 'sie',
+    'sind', 'so', 'soll', 'sollte', 'um', 'und', 'uns', 'von', 'vor', 'wann', 'was', 'weil', 'wenn', 'wer', 'werden',
+    'wie', 'wir', 'wird', 'wo', 'zu', 'zum', 'zur', 'können', 'könnte', 'würde', 'würden', 'wäre', 'über', 'sein',
+    'gibt', 'schon', 'jetzt', 'sehr', 'mal', 'dafür', 'hier', 'mich', 'mir',
+    # English
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'but', 'by', 'for', 'from', 'i', 'if', 'in', 'is', 'it', 'of', 'on',
+    'or', 'so', 'that', 'the', 'this', 'to', 'was', 'we', 'who', 'with', 'you',
+}
+
+def tokenize(text: str | None) -> List[str]:
+    """
+    Split a text into lower-cased tokens.
+    """
+
+    if not isinstance(text, str):
+        return []
+
+    return TOKEN_PATTERN.findall(text.lower())
+
+class HeavyHitters:
+    """
+    Misra-Gries summary of a stream of terms; Keeps at most `capacity` counters.
+
+    Every term occurring more than 1/(capacity + 1) of the time is kept, its count underestimated by at most that share.
+    """
+
+    __capacity: int
+    __counters: Dict[str, int]
+
+    def __init__(self, capacity: int=1000):
+        self.__capacity = capacity
+        self.__counters = {}
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        return self.__counters
+
+    def update(self, terms: Iterable[str]) -> None:
+        counters = self.__counters
+
+        for term in terms:
+            if term in counters:
+                counters[term] += 1
+            elif len(counters) < self.__capacity:
+                counters[term] = 1
+            else:
+                # Decrement all counters; Amortized over the increments they received
+                self.__counters = counters = {key: count - 1 for key, count in counters.items() if count > 1}
+
+    def top(self, k: int) -> List[Tuple[str, int]]:
+        return heapq.nlargest(k, self.__counters.items(), key=lambda item: (item[1], item[0]))
+
+class TextIndex:
+    """
+    Inverted index of the answers to a text question; Every answer is tokenized once.
+
+    Terms are the tokens and the n-grams (up to `ngrams` tokens) of the answers, without n-grams starting or ending with a stopword.
+    Postings are stored as flat arrays of (answer, term) pairs, so frequencies per subgroup are single bincounts.
+    """
+
+    __question: Question
+    __df: DataFrame
+    __ngrams: int
+
+    __vocabulary: Dict[str, int]
+    __terms: List[str]
+    __sizes: np.ndarray
+
+    # Postings: Position of the answer and id of the term, one entry per distinct term of an answer
+    __posting_rows: np.ndarray
+    __posting_terms: np.ndarray
+    __posting_counts: np.ndarray
+
+    # Positions into the postings ordered by term
+    __term_order: np.ndarray
+    __term_offsets: np.ndarray
+
+    def __init__(self, question: Question, df: DataFrame, ngrams: int=2, stopwords: Set[str]=STOPWORDS):
+        if question.type != QuestionType.TEXT:
+            raise ValueError(f"Question type '{question.type}' not supported for a text index")
+
+        self.__question = question
+        self.__df = df
+        self.__ngrams = ngrams
+
+        self.__vocabulary = {}
+        self.__terms = []
+
+        rows: List[int] = []
+        term_ids: List[int] = []
+        counts: List[int] = []
+
+        for row, text in enumerate(df[question.code].to_numpy()):
+            tokens = tokenize(text)
+            answer_counts: Dict[int, int] = {}
+
+            for n in range(1, ngrams + 1):
+                for i in range(len(tokens) - n + 1):
+                    if tokens[i] in stopwords or tokens[i + n - 1] in stopwords:
+                        continue
+
+                    term_id = self.term_id(' '.join(tokens[i:i + n]), add=True)
+                    answer_counts[term_id] = answer_counts.get(term_id, 0) + 1
+
+            rows.extend([row] * len(answer_counts))
+            term_ids.extend(answer_counts.keys())
+            counts.extend(answer_counts.values())
+
+        self.__posting_rows = np.array(rows, dtype=np.int64)
+        self.__posting_terms = np.array(term_ids, dtype=np.int64)
+        self.__posting_counts = np.array(counts, dtype=np.int64)
+
+        self.__sizes = np.array([term.count(' ') + 1 for term in self.__terms], dtype=np.int8)
+
+        self.__term_order = np.argsort(self.__posting_terms, kind='stable')
+        self.__term_offsets = np.concatenate([[0], np.cumsum(np.bincount(self.__posting_terms, minlength=len(self.__terms)))])
+
+    def __len__(self) -> int:
+        return len(self.__terms)
+
+    def __repr__(self) -> str:
+        return f'TextIndex({self.__question.code}, answers={len(self.__df)}, terms={len(self.__terms)})'
+
+    @property
+    def question(self) -> Question:
+        return self.__question
+
+    @property
+    def terms(self) -> List[str]:
+        return self.__terms
+
+    def term_id(self, term: str, add: bool=False) -> int:
+        if term not in self.__vocabulary:
+            if not add:
+                raise KeyError(f"Term '{term}' not found in {self}")
+
+            self.__vocabulary[term] = len(self.__terms)
+            self.__terms.append(term)
+
+        return self.__vocabulary[term]
+
+    def rows(self, term: str) -> np.ndarray:
+        """
+        Get the positions of the answers containing a term (or n-gram).
+        """
+
+        term = ' '.join(tokenize(term))
+
+        if term not in self.__vocabulary:
+            return np.array([], dtype=np.int64)
+
+        term_id = self.__vocabulary[term]
+        postings = self.__term_order[self.__term_offsets[term_id]:self.__term_offsets[term_id + 1]]
+
+        return self.__posting_rows[postings]
+
+    def search(self, *terms: str) -> DataFrame:
+        """
+        Get the answers containing all of the terms.
+        """
+
+        rows = None
+
+        for term in terms:
+            rows = self.rows(term) if rows is None else np.intersect1d(rows, self.rows(term), assume_unique=True)
+
+        return self.__df.iloc[rows if rows is not None else []]
+
+    def frequencies(self, n: int | None=None) -> DataFrame:
+        """
+        Get the number of occurrences and the number of answers of every term (of `n` tokens, if given).
+        """
+
+        frequencies = DataFrame({
+            'term': self.__terms,
+            'occurrences': np.bincount(self.__posting_terms, weights=self.__posting_counts, minlength=len(self.__terms)).astype(int),
+            'answers': np.bincount(self.__posting_terms, minlength=len(self.__terms)),
+        })
+
+        if n is not None:
+            frequencies = frequencies[self.__sizes == n]
+
+        return frequencies.sort_values(['answers', 'occurrences', 'term'], ascending=[False, False, True], ignore_index=True)
+
+    def top_k(self, k: int=10, by: Question | None=None, n: int | None=None) -> DataFrame:
+        """
+        Get the `k` terms (of `n` tokens, if given) mentioned in the most answers, per answer of `by` if given.
+
+        Returns a frame with the columns group, rank, term and answers.
+        """
+
+        if by is None:
+            groups = pd.Categorical(np.zeros(len(self.__df), dtype=int), categories=[0]).rename_categories([''])
+        else:
+            groups = pd.Categorical(self.__df[by.code])
+            groups = groups.rename_categories(by.label_index(pd.CategoricalIndex(groups.categories)))
+
+        group_codes = np.asarray(groups.codes, dtype=np.int64)[self.__posting_rows]
+        valid = group_codes >= 0
+
+        if n is not None:
+            valid &= self.__sizes[self.__posting_terms] == n
+
+        # Answers per (group, term) in one pass
+        shape = (len(groups.categories), len(self.__terms))
+        answers = np.bincount(
+            group_codes[valid] * shape[1] + self.__posting_terms[valid],
+            minlength=shape[0] * shape[1]
+        ).reshape(shape)
+
+        top = []
+
+        for code, group in enumerate(groups.categories):
+            counts = answers[code]
+            candidates = np.flatnonzero(counts)
+
+            # Keep every term tied with the k-th count, so the cut-off is alphabetical as well
+            if len(candidates) > k:
+                kth = -np.partition(-counts[candidates], k - 1)[k - 1]
+                candidates = candidates[counts[candidates] >= kth]
+
+            # Ties are broken alphabetically
+            candidates = sorted(candidates, key=lambda term_id: (-counts[term_id], self.__terms[term_id]))[:k]
+
+            for rank, term_id in enumerate(candidates, start=1):
+                top.append((group, rank, self.__terms[term_id], int(counts[term_id])))
+
+        return DataFrame(top, columns=['group', 'rank', 'term', 'answers'])
+
+    @staticmethod
+    def heavy_hitters(texts: Iterable[str], k: int=10, capacity: int=1000, stopwords: Set[str]=STOPWORDS) -> List[Tuple[str, int]]:
+        """
+        Approximate the `k` most frequent tokens of a stream of texts in constant memory, without building an index.
+        """
+
+        summary = HeavyHitters(capacity)
+
+        for text in texts:
+            summary.update(token for token in tokenize(text) if token not in stopwords)
+
+        return summary.top(k)
@@ -1,41 +1,76 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-Get latest file in ths folder, that ends with .json, load it and create a DataFrame.
+Load the latest file in this folder, that ends with .json, into a DataFrame on first access of `DF`.
 """
 
 
-import json
 import os
 
-import pandas as pd
-import matplotlib.pyplot as plt
+from pandas import DataFrame
 
 from .Questions import *
+from .Questions.instrumentation import RECORDER
+from .reader import read_responses
+from .snapshot import Snapshot
 
-DF: pd.DataFrame = None
-
-# Load the survey results
+# Folder of the survey results
 EVAL_FOLDER = os.path.dirname(__file__)
 
-# Get the latest survey results file
-files = os.listdir(EVAL_FOLDER)
+_DF: DataFrame = None
+
+def latest_export(folder: str=EVAL_FOLDER) -> str:
+    """
+    Get the latest survey results file in the folder.
+    """
+
+    # Filter the files that end with .json
+    files = [os.path.join(folder, file) for file in os.listdir(folder) if file.endswith('.json')]
+
+    if not files:
+        raise FileNotFoundError(f"No JSON files found in {folder}")
+
+    return max(files, key=os.path.getctime)
+
+def load(filename: str=None) -> DataFrame:
+    """
+    Load the survey results (the latest export by default) into a DataFrame; Loaded once per process.
+    """
+
+    global _DF
+
+    if filename is None:
+        if _DF is None:
+            _DF = load(latest_export())
 
-# Filter the files that end with .json
-files = [os.path.join(EVAL_FOLDER, file) for file in files if file.endswith('.json')]
+        return _DF
 
-if not files:
-    raise FileNotFoundError(f"No JSON files found in {EVAL_FOLDER}")
-else:
-    # Get the latest file
-    latest_file = max(files, key=os.path.getctime)
+    schema = Page.schema()
 
-    with open(latest_file, 'r') as f:
-        survey_results = json.load(f)
+    # Memory-map the snapshot of this export or stream the responses into the columns the questions reference
+    snapshot = Snapshot(filename, schema)
 
-    # Create a DataFrame from the survey results
-    DF = pd.DataFrame(survey_results['responses'])
+    with RECORDER.stage('load', 'load', file=os.path.basename(filename)) as attributes:
+        with RECORDER.stage('snapshot_load', 'load'):
+            df = snapshot.load()
 
+        attributes['cache'] = 'snapshot' if df is not None else 'miss'
+
+        if df is None:
+            with RECORDER.stage('read_responses', 'load'):
+                df = read_responses(filename, schema)
+
+            with RECORDER.stage('snapshot_save', 'load'):
+                snapshot.save(df)
+
+    return df
+
+def __getattr__(name: str):
+    # The responses are loaded on first access of `DF`
+    if name == 'DF':
+        return load()
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Constants
 ## Color Palettes
@@ -64,3 +99,12 @@ COLOR_PALETTE_MAPPED = {
     'TEC': FACULTIES_COLOR_PALETTE[4],
     'TEX': FACULTIES_COLOR_PALETTE[5]
 }
+
+## Actual distribution of the students to the faculties
+OPT_DIST = {
+    'ESB': 0.414,
+    'INF': 0.206,
+    'TEC': 0.170,
+    'LS':  0.096,
+    'TEX': 0.071,
+}
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Stream the responses of a LimeSurvey JSON export into typed column buffers.
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterator, List, TextIO
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from .Questions import Question, QuestionType
+
+class ColumnBuffer:
+    """
+    Growable, typed buffer for the values of one column.
+
+    Options and ranking slots are stored as codes into the declared answers, numbers as floats.
+    """
+
+    __type: QuestionType
+    __values: np.ndarray
+    __size: int = 0
+
+    __categories: List[str] = None
+    __category_codes: Dict[str, int] = None
+
+    def __init__(self, type: QuestionType, categories: List[str] | None=None, capacity: int=1024):
+        self.__type = type
+
+        if self.categorical:
+            self.__categories = list(categories or [])
+            self.__category_codes = {category: code for code, category in enumerate(self.__categories)}
+
+        self.__values = self.allocate(capacity)
+
+    def __len__(self) -> int:
+        return self.__size
+
+    @property
+    def type(self) -> QuestionType:
+        return self.__type
+
+    @property
+    def categorical(self) -> bool:
+        return self.__type in (QuestionType.OPTIONS, QuestionType.RANKING)
+
+    @property
+    def values(self) -> np.ndarray | pd.Categorical:
+        values = self.__values[:self.__size]
+
+        if self.categorical:
+            return pd.Categorical.from_codes(values, categories=self.__categories)
+
+        return values
+
+    def allocate(self, capacity: int) -> np.ndarray:
+        if self.__type == QuestionType.NUMBER:
+            return np.full(capacity, np.nan, dtype=float)
+        elif self.categorical:
+            return np.full(capacity, -1, dtype=np.int16)
+
+        return np.full(capacity, None, dtype=object)
+
+    def reserve(self, capacity: int) -> None:
+        if capacity <= len(self.__values):
+            return
+
+        values = self.allocate(capacity)
+        values[:self.__size] = self.__values[:self.__size]
+
+        self.__values = values
+
+    def convert(self, value: Any) -> Any:
+        if self.categorical:
+            # Undeclared answers (e.g. empty strings) become missing values
+            return self.__category_codes.get(value, -1)
+        elif self.__type != QuestionType.NUMBER:
+            return value
+
+        # Like pd.to_numeric(errors='coerce')
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return np.nan
+
+    def append(self, value: Any) -> None:
+        if self.__size == len(self.__values):
+            self.reserve(2 * len(self.__values))
+
+        self.__values[self.__size] = self.convert(value)
+        self.__size += 1
+
+class ResponseStream:
+    """
+    Incrementally decode the objects of the `responses` array of an export.
+    """
+
+    __file: TextIO
+    __chunk_size: int
+
+    __buffer: str = ''
+    __position: int = 0
+    __exhausted: bool = False
+
+    __decoder: json.JSONDecoder = json.JSONDecoder()
+
+    def __init__(self, file: TextIO, chunk_size: int=1 << 20):
+        self.__file = file
+        self.__chunk_size = chunk_size
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        self.expect('{')
+
+        while True:
+            key = self.decode()
+            self.expect(':')
+
+            if key == 'responses':
+                yield from self.array()
+            else:
+                self.decode()
+
+            if self.expect(',', '}') == '}':
+                return
+
+    def read(self) -> bool:
+        if self.__exhausted:
+            return False
+
+        chunk = self.__file.read(self.__chunk_size)
+
+        if not chunk:
+            self.__exhausted = True
+            return False
+
+        # Drop what has been consumed already
+        self.__buffer = self.__buffer[self.__position:] + chunk
+        self.__position = 0
+
+        return True
+
+    def skip_whitespace(self) -> None:
+        while True:
+            while self.__position < len(self.__buffer) and self.__buffer[self.__position] in ' \t\n\r':
+                self.__position += 1
+
+            if self.__position < len(self.__buffer) or not self.read():
+                return
+
+    def expect(self, *tokens: str) -> str:
+        self.skip_whitespace()
+
+        if self.__position >= len(self.__buffer) or self.__buffer[self.__position] not in tokens:
+            raise ValueError(f"Invalid export: expected one of {tokens} at offset {self.__position}")
+
+        self.__position += 1
+
+        return self.__buffer[self.__position - 1]
+
+    def decode(self) -> Any:
+        self.skip_whitespace()
+
+        while True:
+            try:
+                value, end = self.__decoder.raw_decode(self.__buffer, self.__position)
+
+                # A value touching the end of the buffer might continue in the next chunk
+                if end < len(self.__buffer) or self.__exhausted:
+                    self.__position = end
+                    return value
+            except json.JSONDecodeError:
+                if self.__exhausted:
+                    raise
+
+            self.read()
+
+    def array(self) -> Iterator[Dict[str, Any]]:
+        self.expect('[')
+        self.skip_whitespace()
+
+        if self.__buffer[self.__position:self.__position + 1] == ']':
+            self.__position += 1
+            return
+
+        while True:
+            yield self.decode()
+
+            if self.expect(',', ']') == ']':
+                return
+
+def read_responses(filename: str, schema: Dict[str, Question], chunk_size: int=1 << 20) -> DataFrame:
+    """
+    Read the responses of an export into a DataFrame with the columns of the schema.
+
+    Columns that no question references are skipped; Options and ranking slots become categoricals
+    of the declared answer codes, numbers become floats.
+    """
+
+    buffers = {
+        column: ColumnBuffer(question.type, list(question.answers.keys()))
+        for column, question in schema.items()
+    }
+    present = set()
+
+    with open(filename, 'r', encoding='utf-8') as f:
+        for i, response in enumerate(ResponseStream(f, chunk_size)):
+            if i == 0:
+                # Estimate the number of responses from the size of the first one
+                capacity = int(1.1 * os.path.getsize(filename) / max(len(json.dumps(response)), 1)) + 1
+
+                for buffer in buffers.values():
+                    buffer.reserve(capacity)
+
+                present = set(response.keys())
+
+            for column, buffer in buffers.items():
+                buffer.append(response.get(column))
+
+    return pd.DataFrame({
+        column: buffer.values for column, buffer in buffers.items() if column in present
+    })
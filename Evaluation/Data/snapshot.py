@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Columnar snapshot of a loaded survey export; One memory-mappable .npy file per column.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from .Questions import Question
+from .Questions.store import CACHE_FOLDER
+
+# Version of the layout of the snapshots; Snapshots of other versions are rebuilt
+SNAPSHOT_VERSION = 2
+
+class Snapshot:
+    """
+    Snapshot of the DataFrame read from an export, keyed by the content hash of the export and the schema.
+
+    Numbers are stored as float columns, options and ranking slots as their category codes and
+    texts as one UTF-8 blob with the offsets of the rows and a mask of missing values.
+    """
+
+    __filename: str
+    __schema: Dict[str, Question]
+    __folder: str
+
+    __key: str = None
+
+    def __init__(self, filename: str, schema: Dict[str, Question], folder: str=os.path.join(CACHE_FOLDER, 'snapshots')):
+        self.__filename = filename
+        self.__schema = schema
+        self.__folder = folder
+
+    @property
+    def filename(self) -> str:
+        return self.__filename
+
+    @property
+    def folder(self) -> str:
+        return os.path.join(self.__folder, self.key)
+
+    @property
+    def filename_sources(self) -> str:
+        return os.path.join(self.__folder, 'sources.json')
+
+    @property
+    def key(self) -> str:
+        if self.__key is None:
+            digest = hashlib.blake2b(f'{SNAPSHOT_VERSION}:{self.source_hash()}'.encode(), digest_size=16)
+
+            # Changed questions (columns, types, answers) invalidate the snapshot as well
+            digest.update(repr([
+                (column, question.type.value, list(question.answers.keys()))
+                for column, question in self.__schema.items()
+            ]).encode())
+
+            self.__key = digest.hexdigest()
+
+        return self.__key
+
+    def source_hash(self) -> str:
+        """
+        Content hash of the export; Reused as long as size and modification time are unchanged.
+        """
+
+        stat = os.stat(self.__filename)
+        path = os.path.abspath(self.__filename)
+
+        sources = self.read_json(self.filename_sources) or {}
+        known = sources.get(path)
+
+        if known is not None and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+            return known['hash']
+
+        digest = hashlib.blake2b(digest_size=16)
+
+        with open(self.__filename, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+
+        sources[path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': digest.hexdigest()}
+
+        os.makedirs(self.__folder, exist_ok=True)
+
+        # Replace the hashes in one step, like the snapshots; Concurrent runs never read a partial file
+        fd, tmp = tempfile.mkstemp(dir=self.__folder, suffix='.tmp')
+
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(sources, f, indent=1)
+
+            os.replace(tmp, self.filename_sources)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+        return sources[path]['hash']
+
+    @staticmethod
+    def read_json(filename: str) -> Any:
+        try:
+            with open(filename, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def load(self) -> DataFrame | None:
+        """
+        Memory-map the snapshot of the export; None if there is no (valid) snapshot.
+        """
+
+        meta = self.read_json(os.path.join(self.folder, 'meta.json'))
+
+        if meta is None:
+            return None
+
+        try:
+            columns = self.load_columns(meta)
+        except (OSError, ValueError):
+            # Removed by a concurrent run after publishing a newer snapshot, or unreadable
+            return None
+
+        # Do not copy the mapped columns
+        return pd.DataFrame(columns, index=pd.RangeIndex(meta['rows']), copy=False)
+
+    def load_columns(self, meta: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Map the columns listed in `meta`; Raises OSError if a file of the snapshot is missing.
+        """
+
+        columns = {}
+
+        for i, column in enumerate(meta['columns']):
+            values = np.load(os.path.join(self.folder, f'{i}.npy'), mmap_mode='r')
+
+            match column['kind']:
+                case 'category':
+                    columns[column['name']] = pd.Categorical.from_codes(values, categories=column['categories'])
+                case 'text':
+                    missing = np.load(os.path.join(self.folder, f'{i}.mask.npy'), mmap_mode='r')
+                    offsets = np.load(os.path.join(self.folder, f'{i}.offsets.npy'), mmap_mode='r').tolist()
+
+                    # Decode the rows from the blob; Only the compact blob is read
+                    blob = values.tobytes()
+
+                    text = np.empty(len(offsets) - 1, dtype=object)
+                    text[:] = [blob[start:end].decode('utf-8') for start, end in zip(offsets[:-1], offsets[1:])]
+                    text[missing] = None
+
+                    columns[column['name']] = text
+                case _:
+                    columns[column['name']] = values
+
+        return columns
+
+    def save(self, df: DataFrame) -> None:
+        """
+        Write the snapshot of the export and drop the snapshots of older exports.
+        """
+
+        os.makedirs(self.__folder, exist_ok=True)
+
+        folder = tempfile.mkdtemp(dir=self.__folder, prefix='.tmp-')
+        columns: List[Dict[str, Any]] = []
+
+        for i, name in enumerate(df.columns):
+            values = df[name]
+
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                columns.append({'name': name, 'kind': 'category', 'categories': list(values.cat.categories)})
+                np.save(os.path.join(folder, f'{i}.npy'), values.cat.codes.to_numpy())
+            elif pd.api.types.is_numeric_dtype(values):
+                columns.append({'name': name, 'kind': 'number'})
+                np.save(os.path.join(folder, f'{i}.npy'), values.to_numpy(dtype=float))
+            else:
+                missing = values.isna().to_numpy()
+                encoded = [str(text).encode('utf-8') for text in values.fillna('')]
+
+                offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+                np.cumsum([len(text) for text in encoded], out=offsets[1:])
+
+                columns.append({'name': name, 'kind': 'text'})
+                np.save(os.path.join(folder, f'{i}.npy'), np.frombuffer(b''.join(encoded), dtype=np.uint8))
+                np.save(os.path.join(folder, f'{i}.offsets.npy'), offsets)
+                np.save(os.path.join(folder, f'{i}.mask.npy'), missing)
+
+        with open(os.path.join(folder, 'meta.json'), 'w') as f:
+            json.dump({'source': os.path.abspath(self.__filename), 'rows': len(df), 'columns': columns}, f, indent=1)
+
+        # Publish the snapshot in one step; Another process might have been faster
+        try:
+            os.replace(folder, self.folder)
+        except OSError:
+            shutil.rmtree(folder, ignore_errors=True)
+
+        for entry in os.listdir(self.__folder):
+            path = os.path.join(self.__folder, entry)
+
+            if entry != self.key and os.path.isdir(path) and not entry.startswith('.tmp-'):
+                shutil.rmtree(path, ignore_errors=True)
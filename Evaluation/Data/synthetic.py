@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Generate synthetic LimeSurvey exports in the layout of the registered questions, e.g. to benchmark the evaluation at scale.
+"""
+
+import json
+import re
+from typing import Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from .Questions import Page, Question, QuestionType
+
+# Without a template: Share of the respondents leaving the survey on each page and of the questions left unanswered
+DROPOUT = 0.05
+UNANSWERED = 0.1
+
+# Without a template: Range of the numbers, median and spread of the (log-normal) time spent on a page in s
+NUMBER_RANGE = (0.0, 100.0)
+PAGE_TIME = (30.0, 0.8)
+
+# Without a template: Words of the free texts and their length in words
+VOCABULARY = [
+    'ticket', 'semesterticket', 'deutschlandticket', 'preis', 'teuer', 'zu', 'viel', 'kostenlos', 'umsonst', 'fahrrad',
+    'auto', 'bus', 'bahn', 'studierende', 'hochschule', 'selbst', 'entscheiden', 'kaufen', 'unfair', 'fair', 'solidar',
+    'modell', 'euro', 'monat', 'semester', 'günstiger', 'nicht', 'jeder', 'brauchen', 'freiwillig', 'und', 'der', 'die',
+]
+TEXT_LENGTH = (3, 30)
+
+# Start of the surveys and the time it was open (in s)
+START_DATE = np.datetime64('2024-06-20T07:00:00')
+SURVEY_DURATION = 14 * 24 * 3600
+
+class SyntheticExport:
+    """
+    Generator of LimeSurvey exports with the columns of the registered questions (the schema of the reader).
+
+    Respondents leave the survey after a random page; The columns of the pages they did not reach are null. On every
+    page they reached, each column is drawn independently: Options from the declared answer codes, ranking slots as
+    distinct answer codes (each slot only after the previous one), numbers within their range and free texts as
+    sequences of words. Unanswered questions of reached pages are empty strings, like in the exports.
+
+    With a `template` (the frame of a real export), the shares of the answers, the numbers, the page times and the words
+    and lengths of the texts are resampled from it, so a synthetic export looks like a larger survey of the same kind;
+    Otherwise answers are uniform within `ranges` (by column) and the defaults above.
+    """
+
+    __schema: Dict[str, Question]
+    __pages: List[Tuple[Page, List[Question]]]
+    __template: DataFrame | None
+    __ranges: Dict[str, Tuple[float, float]]
+    __seed: int
+
+    def __init__(self, schema: Dict[str, Question] | None=None, template: DataFrame | None=None, ranges: Dict[str, Tuple[float, float]] | None=None, seed: int=0):
+        schema = Page.schema() if schema is None else schema
+
+        self.__schema = dict(schema)
+        self.__template = template
+        self.__ranges = ranges or {}
+        self.__seed = seed
+
+        # Survey pages in the order of registration, with their questions in the schema
+        self.__pages = [
+            (page, [question for question in page.questions if all(column in self.__schema for column in question.columns)])
+            for page in Page.PAGES.values()
+            if re.fullmatch(r'G\d+', page.code) is not None and page.time_code in self.__schema
+        ]
+
+    def __repr__(self) -> str:
+        return f'SyntheticExport(columns={len(self.__schema)}, template={self.__template is not None}, seed={self.__seed})'
+
+    @property
+    def schema(self) -> Dict[str, Question]:
+        return self.__schema
+
+    @property
+    def template(self) -> DataFrame | None:
+        return self.__template
+
+    @property
+    def seed(self) -> int:
+        return self.__seed
+
+    def reached(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        """
+        Get which of the pages each of the `n` respondents reached; Shape (n, pages).
+        """
+
+        if self.__template is not None:
+            shares = np.array([
+                self.__template[page.time_code].notna().mean() if page.time_code in self.__template else 1.0
+                for page, _ in self.__pages
+            ])
+        else:
+            shares = (1 - DROPOUT) ** np.arange(1, len(self.__pages) + 1)
+
+        # Who reached a page reached all pages before it
+        return rng.random(n)[:, None] < np.minimum.accumulate(shares)[None]
+
+    def template_rows(self, page: Page) -> pd.Series | None:
+        if self.__template is None or page.time_code not in self.__template:
+            return None
+
+        return self.__template[page.time_code].notna()
+
+    def options(self, rng: np.random.Generator, question: Question, column: str, reached: np.ndarray, rows: pd.Series | None) -> np.ndarray:
+        answers = list(question.answers.keys())
+
+        if rows is not None and column in self.__template:
+            # Shares of the answers (and of no answer) among those who reached the page
+            counts = self.__template.loc[rows, column].value_counts(dropna=False)
+            values = np.array([*answers, ''], dtype=object)
+            weights = np.array([counts.get(answer, 0) for answer in answers] + [counts[counts.index.isna()].sum()], dtype=float)
+        else:
+            values = np.array([*answers, ''], dtype=object)
+            weights = np.array([(1 - UNANSWERED) / len(answers)] * len(answers) + [UNANSWERED])
+
+        drawn = values[rng.choice(len(values), size=len(reached), p=weights / weights.sum())]
+
+        return np.where(reached, drawn, None)
+
+    def ranking(self, rng: np.random.Generator, question: Question, reached: np.ndarray, rows: pd.Series | None) -> Dict[str, np.ndarray]:
+        answers = np.array(list(question.answers.keys()), dtype=object)
+
+        chosen = np.zeros((len(reached), len(answers)), dtype=bool)
+        filled = reached.copy()
+        previous = rows
+
+        columns = {}
+
+        for slot in question.ranking_slots:
+            if rows is not None and slot in self.__template:
+                slot_values = self.__template.loc[previous, slot] if previous is not None else self.__template[slot]
+
+                # Slots are filled after the previous one as often as in the template; Every answer stays possible
+                share = slot_values.notna().mean() if len(slot_values) else 0.0
+                weights = slot_values.value_counts().reindex(answers, fill_value=0).to_numpy(dtype=float) + 1
+
+                previous = self.__template[slot].notna() & (previous if previous is not None else True)
+            else:
+                share = 1 - UNANSWERED
+                weights = np.ones(len(answers))
+
+            filled &= rng.random(len(reached)) < share
+
+            # Draw one of the answers not chosen for the previous slots
+            cumulative = np.cumsum(np.where(chosen, 0.0, weights[None]), axis=1)
+            picks = np.minimum((cumulative <= rng.random(len(reached))[:, None] * cumulative[:, -1:]).sum(axis=1), len(answers) - 1)
+
+            filled &= cumulative[:, -1] > 0
+            chosen[np.flatnonzero(filled), picks[filled]] = True
+
+            columns[slot] = np.where(filled, answers[picks], np.where(reached, '', None))
+
+        return columns
+
+    def numbers(self, rng: np.random.Generator, column: str, reached: np.ndarray, rows: pd.Series | None, time: bool=False) -> np.ndarray:
+        n = len(reached)
+
+        if rows is not None and column in self.__template:
+            observed = self.__template.loc[rows, column]
+
+            # Page times are only missing for pages that were not reached
+            share = 1.0 if time else observed.notna().mean()
+            observed = observed.dropna().to_numpy(dtype=float)
+
+            values = rng.choice(observed, size=n) if len(observed) else np.zeros(n)
+        elif time:
+            share = 1.0
+            values = np.round(PAGE_TIME[0] * np.exp(PAGE_TIME[1] * rng.standard_normal(n)), 2)
+        else:
+            share = 1 - UNANSWERED
+            low, high = self.__ranges.get(column, NUMBER_RANGE)
+            values = np.floor(rng.uniform(low, high + 1, size=n))
+
+        if column in self.__ranges:
+            values = np.clip(values, *self.__ranges[column])
+
+        answered = rng.random(n) < share
+        texts = np.char.mod('%.10g', values).astype(object)
+
+        return np.where(reached, np.where(answered, texts, ''), None)
+
+    def texts(self, rng: np.random.Generator, column: str, reached: np.ndarray, rows: pd.Series | None) -> np.ndarray:
+        n = len(reached)
+
+        observed = None
+
+        if rows is not None and column in self.__template:
+            observed = self.__template.loc[rows, column].fillna('').astype(str)
+
+        if observed is not None and len(observed):
+            # Share of non-empty texts, their lengths and the frequencies of their words
+            split = [text.split() for text in observed if text.strip()]
+            share = len(split) / len(observed)
+            lengths = np.array([len(words) for words in split] or [0])
+            words = np.array([word for words in split for word in words] or VOCABULARY, dtype=object)
+
+            drawn_lengths = rng.choice(lengths, size=n)
+        else:
+            share = 1 - UNANSWERED
+            words = np.array(VOCABULARY, dtype=object)
+
+            drawn_lengths = rng.integers(TEXT_LENGTH[0], TEXT_LENGTH[1] + 1, size=n)
+
+        written = reached & (rng.random(n) < share) & (drawn_lengths > 0)
+
+        # Draw the words of all texts at once and split them into the texts
+        drawn_lengths = drawn_lengths[written]
+        drawn_words = words[rng.integers(0, len(words), size=drawn_lengths.sum())]
+
+        values = np.where(reached, '', None)
+        values[written] = [' '.join(text) for text in np.split(drawn_words, np.cumsum(drawn_lengths)[:-1])] if len(drawn_lengths) else []
+
+        return values
+
+    def columns(self, n: int, seed: int | np.random.SeedSequence | None=None) -> Dict[str, np.ndarray]:
+        """
+        Draw the values of `n` responses, by column in the order of an export; Values are strings or None, like in the JSON.
+        """
+
+        rng = np.random.default_rng(self.__seed if seed is None else seed)
+
+        reached = self.reached(rng, n)
+        last_page = reached.sum(axis=1)
+
+        starts = START_DATE + rng.integers(0, SURVEY_DURATION, size=n).astype('timedelta64[s]')
+
+        answers: Dict[str, np.ndarray] = {}
+        times: Dict[str, np.ndarray] = {}
+
+        for index, (page, questions) in enumerate(self.__pages):
+            on_page = reached[:, index]
+            rows = self.template_rows(page)
+
+            for question in questions:
+                if question.type == QuestionType.OPTIONS:
+                    answers[question.code] = self.options(rng, question, question.code, on_page, rows)
+
+                    # Other answers come with a text column
+                    if '-oth-' in question.answers:
+                        other = self.texts(rng, f'{question.code}[other]', on_page, None)
+                        answers[f'{question.code}[other]'] = np.where(answers[question.code] == '-oth-', other, np.where(on_page, '', None))
+                elif question.type == QuestionType.RANKING:
+                    answers.update(self.ranking(rng, question, on_page, rows))
+                elif question.type == QuestionType.NUMBER:
+                    answers[question.code] = self.numbers(rng, question.code, on_page, rows)
+                else:
+                    answers[question.code] = self.texts(rng, question.code, on_page, rows)
+
+            times[page.time_code] = self.numbers(rng, page.time_code, on_page, rows, time=True)
+
+            # Per-question times are not recorded
+            for question in questions:
+                times[f'{question.code.split("[")[0]}Time'] = np.full(n, None, dtype=object)
+
+        durations = sum(
+            pd.to_numeric(pd.Series(values), errors='coerce').fillna(0).to_numpy()
+            for column, values in times.items() if column.startswith('groupTime')
+        )
+        ends = starts + np.round(durations).astype('timedelta64[s]')
+
+        def dates(values: np.ndarray) -> np.ndarray:
+            return np.char.replace(np.datetime_as_string(values, unit='s'), 'T', ' ').astype(object)
+
+        return {
+            'id': np.char.mod('%d', np.arange(1, n + 1)).astype(object),
+            'submitdate': np.where(last_page == len(self.__pages), dates(ends), None),
+            'lastpage': np.char.mod('%d', last_page).astype(object),
+            'startlanguage': np.where(rng.random(n) < 0.8, 'de', 'en').astype(object),
+            'seed': np.char.mod('%d', rng.integers(0, 2 ** 31, size=n)).astype(object),
+            'startdate': dates(starts),
+            'datestamp': dates(ends),
+            'refurl': np.full(n, None, dtype=object),
+            **answers,
+            'interviewtime': np.char.mod('%.10g', np.round(durations, 2)).astype(object),
+            **times,
+        }
+
+    def responses(self, n: int, chunk_size: int=10_000) -> Iterator[Dict[str, Any]]:
+        """
+        Draw `n` responses, in chunks of `chunk_size` drawn at once; Each chunk from its own stream, spawned from the seed.
+        """
+
+        chunks = range(0, n, chunk_size)
+
+        for start, seed in zip(chunks, np.random.SeedSequence(self.__seed).spawn(len(chunks))):
+            columns = self.columns(min(chunk_size, n - start), seed)
+
+            # Ids count on over the chunks
+            columns['id'] = np.char.mod('%d', np.arange(start + 1, start + len(columns['id']) + 1)).astype(object)
+
+            keys = list(columns.keys())
+
+            for values in zip(*columns.values()):
+                yield dict(zip(keys, values))
+
+    def write(self, filename: str, n: int, chunk_size: int=10_000) -> str:
+        """
+        Write an export of `n` responses to `filename`, in the format of the JSON exports of LimeSurvey.
+        """
+
+        encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write('{"responses": [')
+
+            for i, response in enumerate(self.responses(n, chunk_size)):
+                if i:
+                    f.write(',')
+
+                f.write(encoder.encode(response))
+
+            f.write(']}')
+
+        return filename
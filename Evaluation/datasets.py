@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Filtered views of the survey results, which the figures and the TeX snippets name as their inputs.
+"""
+
+from collections.abc import Mapping
+from typing import Callable, Dict, Iterator
+
+from pandas import DataFrame
+
+from . import Data
+from .Data import OPT_DIST
+from .Data.Questions import *
+from .Data.Questions.filter_chain import FilterChain
+from .Data.Questions.instrumentation import RECORDER
+from .Data.Questions.question import WEIGHT_COLUMN
+from .Data.Questions.raking import Raking, RakingResult
+
+def survey_filters(load: Callable[[], DataFrame]=Data.load) -> FilterChain:
+    """
+    Get the filters of the survey results returned by `load` (the latest export by default).
+    """
+
+    return FilterChain(
+        load
+    ).answered(
+        # Filter out all incomplete responses (G03Q01 is not None)
+        'DF_COMPLETED', 'Completed surveys', G03Q01
+    ).of_answer(
+        # Filter out all non-Students (G01Q01==AO01 => Student)
+        'DF_FILTERED_STUDENT', 'Students', G01Q01, 'AO01'
+    ).numeric(
+        # Filter out all participants that didn´t spend at least 15s on the G03 page
+        'DF_FILTERED_TIME', 'At least 15s on the information page', G03.time, lambda x: x >= 15
+    ).exclude(
+        # Filter out all above 26 that claim to have a student ticket G04Q07:(AO02, AO03) x G01Q04:Y (LIARS!)
+        'DF_FILTERED', 'No student ticket above the age of 26',
+        lambda df: G04Q07.of_answer_mask(df, ['AO02', 'AO03']) & G01Q04.of_answer_mask(df, 'Y')
+    )
+
+# Nothing is loaded or filtered before a dataset is accessed
+FILTERS = survey_filters()
+
+# Known margins of the student population, by the answer codes of the faculties
+RAKING = Raking([
+    (G01Q02, {code: OPT_DIST[option.text] for code, option in G01Q02.answers.items() if option.text in OPT_DIST}),
+])
+
+class Datasets(Mapping):
+    """
+    Lazy mapping of the names of the datasets to the frames: The stages of the filters and their funnel (`FUNNEL`).
+
+    With a `raking`, every stage is weighted to the known margins on access (in `WEIGHT_COLUMN`); The funnel stays unweighted.
+    """
+
+    __filters: FilterChain
+    __raking: Raking | None
+    __weighted: Dict[str, DataFrame]
+    __results: Dict[str, RakingResult]
+
+    def __init__(self, filters: FilterChain, raking: Raking | None=None):
+        self.__filters = filters
+        self.__raking = raking
+        self.__weighted = {}
+        self.__results = {}
+
+    def __getitem__(self, name: str) -> DataFrame:
+        if name == 'FUNNEL':
+            return self.__filters.funnel()
+
+        if self.__raking is None:
+            return self.__filters[name]
+
+        if name not in self.__weighted:
+            df = self.__filters[name]
+
+            with RECORDER.stage(f'rake:{name}', 'weights'):
+                result = self.__raking.rake(df)
+
+            self.__weighted[name] = df.assign(**{WEIGHT_COLUMN: result.weights})
+            self.__results[name] = result
+
+            print(
+                f'\x1b[1;{32 if result.converged else 33}m[INFO]\x1b[0m Raked {name} in {result.iterations} iterations '
+                f'(max. error {result.error:.1e}); Design effect {result.design_effect:.3f}, effective n {result.effective_n:.0f} of {len(df)}'
+            )
+
+        return self.__weighted[name]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.__filters
+        yield 'FUNNEL'
+
+    def __len__(self) -> int:
+        return len(self.__filters) + 1
+
+    @property
+    def filters(self) -> FilterChain:
+        return self.__filters
+
+    @property
+    def raking(self) -> Raking | None:
+        return self.__raking
+
+    @property
+    def results(self) -> Dict[str, RakingResult]:
+        """
+        The rakings of the stages accessed so far.
+        """
+
+        return self.__results
+
+_DATASETS: Dict[bool, Datasets] = {}
+
+def load_datasets(weighted: bool=False) -> Datasets:
+    """
+    Load the survey results and report the size of the filtered results; Raked to the known margins if `weighted`.
+    """
+
+    if weighted not in _DATASETS:
+        _DATASETS[weighted] = Datasets(FILTERS, RAKING if weighted else None)
+
+        print(f'Got DF with shape: {FILTERS.df.shape}')
+        print(f'Filtered DF with shape: {(FILTERS.count("DF_FILTERED"), FILTERS.df.shape[1])}')
+
+    return _DATASETS[weighted]
+
+def __getattr__(name: str):
+    # `DATASETS` and the single datasets are loaded on first access
+    if name == 'DATASETS':
+        return load_datasets()
+    elif name in FILTERS or name == 'FUNNEL':
+        return load_datasets()[name]
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+The figures of the evaluation; Registered on import, rendered by `evaluate.py`.
+"""
+
+from typing import TYPE_CHECKING, Dict
+
+import pandas as pd
+from pandas import DataFrame
+
+from .Data import MAIN_COLOR_PALETTE, FACULTIES_COLOR_PALETTE, COLOR_PALETTE_MAPPED, OPT_DIST
+from .Data.Questions import *
+from .Classes import figure
+
+if TYPE_CHECKING:
+    from .Classes import SaveFig
+
+# Role Distribution (Pie)
+@figure('RoleDistribution', 'Actual Distribution of Roles in our Survey', inputs=['DF'])
+def render_role_distribution(fig: 'SaveFig', df: DataFrame) -> None:
+    G01Q01.pie_plot(df, fig=fig, colors=MAIN_COLOR_PALETTE)
+
+# Participation Funnel (Bar; Survivors of each filter)
+@figure('ParticipationFunnel', 'Participation after each filter', inputs=['FUNNEL'])
+def render_participation_funnel(fig: 'SaveFig', funnel: DataFrame) -> None:
+    ax = fig.gca()
+
+    # First stage on top
+    labels = [translate(caption) for caption in funnel['caption']][::-1]
+
+    ax.barh(labels, funnel['count'][::-1], color=MAIN_COLOR_PALETTE[0])
+
+    for i, (count, share) in enumerate(zip(funnel['count'][::-1], funnel['share'][::-1])):
+        ax.text(count, i, f' {count} ({share:.0%})', va='center')
+
+    ax.set_xlabel(translate('Surveys'))
+    ax.set_title(translate('Participation after each filter'))
+
+    # Add horizontal padding for the labels
+    ax.margins(x=0.25)
+
+# Faculty Distribution (Pie)
+@figure('FacultyDistribution', 'Actual Distribution to Faculties in our Survey', inputs=['DF_FILTERED_STUDENT'])
+def render_faculty_distribution(fig: 'SaveFig', df: DataFrame) -> None:
+    DF_KNOWN_FACULTIES = G01Q02.of_answer(df, ['AO01', 'AO02', 'AO03', 'AO04', 'AO05'])
+
+    G01Q02.pie_plot(DF_KNOWN_FACULTIES, fig=fig, colors=FACULTIES_COLOR_PALETTE[1:], colors_mapped=COLOR_PALETTE_MAPPED, startangle=90)
+
+# Optimum Faculty Distribution (Pie; Manually created)
+@figure('OptimumFacultyDistribution', 'Optimal Distribution', distribution=OPT_DIST)
+def render_optimum_faculty_distribution(fig: 'SaveFig', distribution: Dict[str, float]) -> None:
+    PAIRS = [(key, value) for key, value in distribution.items()]
+
+    # Sort like in FACULTIES_COLOR_PALETTE[1:]
+    PAIRS = sorted(PAIRS, key=lambda x: FACULTIES_COLOR_PALETTE[1:].index(COLOR_PALETTE_MAPPED[x[0]]))
+
+    KEYS = [pair[0] for pair in PAIRS]
+    VALUES = [pair[1] for pair in PAIRS]
+
+    ax = fig.gca()
+
+    ax.pie(VALUES, startangle=90, labels=KEYS, autopct='%1.1f%%', colors=FACULTIES_COLOR_PALETTE[1:])
+
+    ax.title.set_text(translate('Optimal Faculty Distribution'))
+
+    labels_groups = [node for node in ax.texts if '%' not in node.get_text()]
+
+    previous_label = None
+
+    for label in ax.texts:
+        label_text: str = label.get_text()
+
+        foreground = 'black'
+        background = 'white'
+
+        if label_text in COLOR_PALETTE_MAPPED:
+            foreground = COLOR_PALETTE_MAPPED[label_text]
+
+        label.set_fontsize(10)
+        label.set_fontweight('bold')
+        label.set_bbox(dict(facecolor=background, alpha=0.5, edgecolor=foreground, boxstyle='round,pad=0.2'))
+        label.set_color(foreground)
+
+        previous_label = label_text
+
+# Age Distribution (Pie)
+@figure('AgeDistribution', 'Age Distribution', inputs=['DF_FILTERED'])
+def render_age_distribution(fig: 'SaveFig', df: DataFrame) -> None:
+    G01Q04.pie_plot(df, fig=fig, colors=MAIN_COLOR_PALETTE)
+
+# Modes of Transport (Pie, Merged)
+@figure('ModesOfTransport', 'Modes of Transport (merged)', inputs=['DF_FILTERED'])
+def render_modes_of_transport(fig: 'SaveFig', df: DataFrame) -> None:
+    G04Q01.pie_plot(df, fig=fig, colors=MAIN_COLOR_PALETTE)
+
+# Distance vs. Time (With Category G04Q01)
+@figure('DistanceVsTime', 'Distance against Time by Modes of Transportation', inputs=['DF_FILTERED'])
+def render_distance_vs_time(fig: 'SaveFig', df: DataFrame) -> None:
+    G04Q05.against(
+        G04Q06
+    ).scatter_with_category(
+        df,
+        fig=fig,
+        category=G04Q01,
+        x_log=True,
+        colors=MAIN_COLOR_PALETTE,
+        show_regression=True,
+        mode='auto'
+    )
+
+# Support Pie Chart
+@figure('SupportDTFSM', 'Support of the D-Ticket in the FSM', inputs=['DF_FILTERED'])
+def render_support_dtfsm(fig: 'SaveFig', df: DataFrame) -> None:
+    G03Q01.pie_plot(G03Q01.answered(df), fig=fig, colors=MAIN_COLOR_PALETTE)
+
+# Amount Reasonable?
+@figure('AmountReasonable', 'Is the proposed amount reasonable?', inputs=['DF_FILTERED'])
+def render_amount_reasonable(fig: 'SaveFig', df: DataFrame) -> None:
+    G06Q01.pie_plot(G06Q01.answered(df), fig=fig, colors=MAIN_COLOR_PALETTE)
+
+# Amounts considered reasonable by the students
+@figure('AmountsConsideredReasonable', 'Amounts considered reasonable by the students', inputs=['DF_FILTERED'])
+def render_amounts_considered_reasonable(fig: 'SaveFig', df: DataFrame) -> None:
+    G06Q02.histogram(G06Q02.answered(df), fig=fig, bins=20, color=MAIN_COLOR_PALETTE[0])
+
+# Fairness (Pie)
+@figure('Fairness', 'Is the proposed model fair?', inputs=['DF_FILTERED'])
+def render_fairness(fig: 'SaveFig', df: DataFrame) -> None:
+    G06Q03.pie_plot(G06Q03.answered(df), fig=fig, colors=MAIN_COLOR_PALETTE)
+
+# Modes of transport by faculty
+@figure('ModesOfTransportByFaculty', 'Modes of Transport by Faculty', inputs=['DF_FILTERED'])
+def render_modes_of_transport_by_faculty(fig: 'SaveFig', df: DataFrame) -> None:
+    G01Q02.against(G04Q01).bar_options_plot(
+        fig,
+        df,
+        title='Modes of Transport by Faculty',
+        color_palette=MAIN_COLOR_PALETTE,
+        custom_x_text='Faculty',
+        custom_y_text='Share',
+        normalize=True,
+        color_palette_mapped=COLOR_PALETTE_MAPPED
+    )
+
+# Modes of Transport against distance - bins of 5km
+@figure('ModesOfTransportAgainstDistance', 'Modes of Transport against Distance', inputs=['DF_FILTERED'])
+def render_modes_of_transport_against_distance(fig: 'SaveFig', df: DataFrame) -> None:
+    DF_BINNED, G04Q05_BINNED = G04Q05.numeric_to_bins_options(df, 10, max=50)
+
+    G04Q05_BINNED.against(G04Q01).bar_options_plot(
+        fig,
+        DF_BINNED,
+        title='Modes of Transport against Distance (Merged)',
+        color_palette=MAIN_COLOR_PALETTE,
+        custom_x_text='Distance (in km)',
+        custom_y_text='Share',
+        normalize=True
+    )
+
+# Importance of climate friendliness in transport decisions vs. modes of transport
+@figure('ClimateFriendlinessImportanceVsTransport', 'Importance of climate friendliness in transport decisions vs. modes of transport', inputs=['DF_FILTERED'])
+def render_climate_friendliness_importance_vs_transport(fig: 'SaveFig', df: DataFrame) -> None:
+    G07Q01.against(G04Q01).bar_options_plot(
+        fig,
+        df,
+        title='Importance of climate friendliness in transport decisions vs. modes of transport',
+        color_palette=MAIN_COLOR_PALETTE,
+        custom_x_text='Importance of climate friendliness in transport decisions',
+        custom_y_text='Share of modes of transport',
+        normalize=True
+    )
+
+# Expected impact of having a Deutschlandticket on your mode of transportation
+@figure('ExpectedImpact', 'Would you expect an impact on your usage of\npublic transportation if you got a D-Ticket?', inputs=['DF_FILTERED'])
+def render_expected_impact(fig: 'SaveFig', df: DataFrame) -> None:
+    G07Q01.pie_plot(G07Q01.answered(df), fig=fig, colors=MAIN_COLOR_PALETTE)
+
+# Perception on fairness against modes of transport
+@figure('FairnessVsTransport', 'Perception on fairness against modes of transport', inputs=['DF_FILTERED'])
+def render_fairness_vs_transport(fig: 'SaveFig', df: DataFrame) -> None:
+    G06Q03.against(G04Q01).bar_options_plot(
+        fig,
+        df,
+        title='Perception on fairness against modes of transport',
+        color_palette=MAIN_COLOR_PALETTE,
+        custom_x_text='Perception on fairness',
+        custom_y_text='Share of modes of transport',
+        normalize=True
+    )
+
+# Support against modes of transport
+@figure('SupportVsTransport', 'Support against modes of transport', inputs=['DF_FILTERED'])
+def render_support_vs_transport(fig: 'SaveFig', df: DataFrame) -> None:
+    G03Q01.against(G04Q01).bar_options_plot(
+        fig,
+        df,
+        title='Support against modes of transport',
+        color_palette=MAIN_COLOR_PALETTE,
+        custom_x_text='Support',
+        custom_y_text='Share of modes of transport',
+        normalize=True
+    )
+
+# Support against Faculty
+@figure('SupportVsFaculty', 'Support against Faculty', inputs=['DF_FILTERED_STUDENT'])
+def render_support_vs_faculty(fig: 'SaveFig', df: DataFrame) -> None:
+    G03Q01.against(G01Q02).bar_options_plot(
+        fig,
+        df,
+        title='Support against Faculty',
+        # Declared order puts "Other" (grey) after the faculties
+        color_palette=FACULTIES_COLOR_PALETTE[1:] + FACULTIES_COLOR_PALETTE[:1],
+        custom_x_text='Support',
+        custom_y_text='Share of Faculty',
+        normalize=True,
+        color_palette_mapped=COLOR_PALETTE_MAPPED
+    )
+
+# Plot as a bar chart
+@figure('FacultyDifference', 'Difference between Actual and Optimal Faculty Distribution', inputs=['DF_FILTERED_STUDENT'], distribution=OPT_DIST)
+def render_faculty_difference(fig: 'SaveFig', df: DataFrame, distribution: Dict[str, float]) -> None:
+    # Get the actual percentages per faculty
+    FACULTY_PERCENTAGES = df[G01Q02.code].value_counts(normalize=True)
+
+    # Remove -oth-
+    FACULTY_PERCENTAGES = FACULTY_PERCENTAGES.drop('-oth-')
+
+    # Map the faculty codes to the actual faculty names from the question
+    FACULTY_PERCENTAGES.index = G01Q02.label_index(FACULTY_PERCENTAGES.index)
+
+    # Subtract the optimal distribution from the actual distribution
+    FACULTY_DIFF = FACULTY_PERCENTAGES - pd.Series(distribution)
+
+    # Sort the series as in:
+    # INF, LS, ESB, TEC, TEX
+    FACULTY_DIFF = FACULTY_DIFF.reindex(['INF', 'LS', 'ESB', 'TEC', 'TEX'])
+
+    ax = fig.gca()
+
+    ax.bar(FACULTY_DIFF.index, FACULTY_DIFF.values, color=FACULTIES_COLOR_PALETTE[1:])
+
+    ax.set_ylabel(translate('Deviation in % of total students'))
+    ax.set_title(translate('Difference between Actual and Optimal Faculty Distribution'))
+
+    for i, v in enumerate(FACULTY_DIFF):
+        label = ax.text(i, v + 0.01, f'{v:.1%}', ha='center', va='bottom')
+
+        foreground = COLOR_PALETTE_MAPPED[FACULTY_DIFF.index[i]]
+        background = 'white'
+
+        label.set_fontsize(10)
+        label.set_fontweight('bold')
+        label.set_bbox(dict(facecolor=background, alpha=0.5, edgecolor=background, boxstyle='round,pad=0.2'))
+        label.set_color(foreground)
+
+    # Y-Axis in percentage
+    ax.yaxis.set_major_formatter('{x:.0%}')
+
+    # Add x-Axis/Line at 0
+    ax.axhline(0, color='black', linewidth=0.8)
+
+    # Add vertical padding for bars
+    ax.margins(y=0.2)
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Auto TeX; Write the numbers of the evaluation into TeX snippets.
+"""
+
+from contextlib import contextmanager
+import os
+import re
+from typing import Dict, Iterator, TextIO
+
+from pandas import DataFrame
+
+from .Classes.artifacts import ARTIFACTS
+from .Data.Questions import *
+from .Data.Questions.estimate import Bootstrap, Estimate
+from .Data.Questions.instrumentation import RECORDER
+from .Data.Questions.language import current_language
+from .Data.Questions.matcher import WordGroups
+from .Data.Questions.question import weights_of
+from .Data.Questions.text_index import TextIndex
+
+STUDENTS_TOTAL = 5_000
+
+# How often do these words appear in the last question (Free Text); Create Table in LaTeX
+WORDS = {
+    'For Free': ['umsonst', 'kostenlos', '0€', '0 €', '0 euro', 'null euro', 'free'],
+    'Expensive': ['teuer', 'zu teuer', 'zu viel', 'expensive'],
+    'Unfair': ['unfair', 'ungerecht', 'unfairness', 'unfairly'],
+    'Partial Solidarity': ['selbst entscheiden', 'selbst kaufen', 'selbst kaufen', 'teil solidar', 'partial solidarity', 'teilsolidar'],
+}
+
+# All groups are matched in one pass over the texts
+WORD_GROUPS = WordGroups(WORDS)
+
+# Label table of the word groups
+WORD_GROUP_TEXTS = {
+    'For Free': {'en': 'For Free', 'de': 'Kostenlos'},
+    'Expensive': {'en': 'Expensive', 'de': 'Zu teuer'},
+    'Unfair': {'en': 'Unfair', 'de': 'Unfair'},
+    'Partial Solidarity': {'en': 'Partial Solidarity', 'de': 'Teilsolidarität'},
+}
+
+# Number of terms in the table of the most frequent terms
+TOP_TERMS_COUNT = 10
+
+# Crosstabs of the figures tested for independence; (Question A, Question B, Dataset)
+SIGNIFICANCE_TESTS = [
+    (G01Q02, G04Q01, 'DF_FILTERED'),
+    (G07Q01, G04Q01, 'DF_FILTERED'),
+    (G03Q01, G04Q01, 'DF_FILTERED'),
+    (G06Q03, G04Q01, 'DF_FILTERED'),
+    (G03Q01, G01Q02, 'DF_FILTERED_STUDENT'),
+]
+
+@contextmanager
+def snippet(folder: str, name: str) -> Iterator[TextIO]:
+    """
+    Open the TeX snippet `name` in `folder` for writing; Recorded as a stage, together with what was computed for it since the previous snippet.
+
+    The snippet is only written if its content changed, so LaTeX does not rebuild for unchanged numbers.
+    """
+
+    with ARTIFACTS.open(os.path.join(folder, name)) as f:
+        yield f
+
+    RECORDER.lap(name, 'tex')
+
+def escape_tex(text: str) -> str:
+    return re.sub(r'([&%$#_{}])', r'\\\1', text).replace('€', '\\texttt{\\{euro\\}}')
+
+def tex_estimate(estimate: Estimate, spec: str='.0%') -> str:
+    """
+    Format an estimate for the text, like '27\\% (95\\% CI: 23--32\\%)'.
+    """
+
+    interval = translate({'en': 'CI', 'de': 'KI'})
+
+    return escape_tex(f'{estimate.value:{spec}} ({estimate.level:.0%} {interval}: {estimate.lower:{spec}}--{estimate.upper:{spec}})')
+
+def estimates(df: DataFrame) -> Dict[str, Estimate]:
+    """
+    Named estimates of the numbers in the TeX snippets, with their confidence intervals (finite-population corrected to the students).
+
+    Every estimate is bootstrapped on its own (reproducible) resamples of the respondents, so their intervals are not
+    jointly resampled; Shares are among those answering the question.
+    """
+
+    bootstrap = Bootstrap(df, population=STUDENTS_TOTAL)
+
+    return {
+        'REASONABLE': bootstrap.share(G06Q01.of_answer_mask(df, 'Y'), among=G06Q01.answered_mask(df)),
+        'NOT_REASONABLE': bootstrap.share(G06Q01.of_answer_mask(df, 'N'), among=G06Q01.answered_mask(df)),
+        'SUPPORT': bootstrap.share(G03Q01.of_answer_mask(df, ['AO03', 'AO04']), among=G03Q01.answered_mask(df)),
+        'UNFAIR': bootstrap.share(G06Q03.of_answer_mask(df, ['AO01', 'AO02']), among=G06Q03.answered_mask(df)),
+        'VERY_UNFAIR': bootstrap.share(G06Q03.of_answer_mask(df, 'AO01'), among=G06Q03.answered_mask(df)),
+        'AMOUNT_MEAN': bootstrap.mean(G06Q02.numeric(df)),
+        'AMOUNT_MEDIAN': bootstrap.median(G06Q02.numeric(df)),
+    }
+
+def write_tex(datasets: Dict[str, DataFrame], folder: str=None) -> None:
+    """
+    Write the TeX snippets for the filtered survey results in the current language; To Build/TeX/<language> by default.
+    """
+
+    folder = folder or os.path.join('Build/TeX', current_language())
+
+    DF_FILTERED = datasets['DF_FILTERED']
+
+    # Survivors of each filter, counted without copying the stages
+    FUNNEL = datasets['FUNNEL']
+    COUNT = FUNNEL['count']
+
+    os.makedirs(folder, exist_ok=True)
+
+    # Write the ParticipationText.tex
+    with snippet(folder, 'ParticipationText.tex') as f:
+        f.write(translate({
+            'en': f"""% TEX root = ../../../Main.tex
+We initiated a total of {COUNT['DF']} surveys, out of which {COUNT['DF_COMPLETED']} were fully completed.
+Since this survey focuses on students, all subsequent graphs will exclusively use data from the student group.
+This resulted in data from {COUNT['DF_FILTERED_STUDENT']} students, corresponding to around {(COUNT['DF_FILTERED'] / STUDENTS_TOTAL) * 100:.0f}\\% of the total student population on the main campus (approximately {STUDENTS_TOTAL} students).
+These were further filtered to exclude participants who spent less than 15 seconds on the information page. Furthermore, we excluded participants who claimed to have a student ticket but were above the age of 26. This yielded a final dataset of {COUNT['DF_FILTERED']} students.
+""",
+            'de': f"""% TEX root = ../../../Main.tex
+Insgesamt wurden {COUNT['DF']} Umfragen begonnen, von denen {COUNT['DF_COMPLETED']} vollständig ausgefüllt wurden.
+Da sich diese Umfrage an Studierende richtet, verwenden alle folgenden Grafiken ausschließlich die Daten der Studierenden.
+Damit liegen Daten von {COUNT['DF_FILTERED_STUDENT']} Studierenden vor, was etwa {(COUNT['DF_FILTERED'] / STUDENTS_TOTAL) * 100:.0f}\\% aller Studierenden am Hauptcampus entspricht (etwa {STUDENTS_TOTAL} Studierende).
+Diese wurden weiter gefiltert, um Teilnehmende auszuschließen, die weniger als 15 Sekunden auf der Informationsseite verbracht haben. Außerdem wurden Teilnehmende ausgeschlossen, die angaben, ein Schülerticket zu besitzen, aber älter als 26 Jahre sind. Daraus ergibt sich ein finaler Datensatz von {COUNT['DF_FILTERED']} Studierenden.
+""",
+        }))
+
+    # Write the FunnelTable.tex
+    with snippet(folder, 'FunnelTable.tex') as f:
+        f.write(f"""% TEX root = ../../../Main.tex
+\\begin{{table}}[H]
+\\centering
+\\begin{{tabular}}{{|l|c|c|c|}}
+\\hline
+{translate({'en': 'Filter', 'de': 'Filter'})} & {translate({'en': 'Remaining', 'de': 'Verbleibend'})} & {translate({'en': 'Excluded', 'de': 'Ausgeschlossen'})} & {translate({'en': 'Share', 'de': 'Anteil'})} \\\\
+\\hline
+""")
+
+        for caption, count, excluded, share in FUNNEL[['caption', 'count', 'excluded', 'share']].itertuples(index=False):
+            f.write(f'{translate(caption)} & {count} & {excluded} & {share * 100:.0f}\\% \\\\\n')
+
+        f.write(f"""\\hline
+\\end{{tabular}}
+\\caption{{{translate({'en': 'Number of surveys remaining after each filter', 'de': 'Anzahl der nach jedem Filter verbleibenden Umfragen'})}}}
+\\label{{tab:FunnelTable}}
+\\end{{table}}
+""")
+
+    ESTIMATES = estimates(DF_FILTERED)
+
+    # Reasonable Amounts
+    G06Q02.make_numeric(DF_FILTERED)
+
+    # Weighted counts; The number of participants if unweighted
+    WEIGHTS = weights_of(DF_FILTERED)
+
+    BETWEEN_0_8 = WEIGHTS[DF_FILTERED[G06Q02.code].between(0, 8)].sum()
+    BETWEEN_96_104 = WEIGHTS[DF_FILTERED[G06Q02.code].between(96, 104)].sum()
+
+    with snippet(folder, 'AmountsConsideredReasonable.tex') as f:
+        f.write(translate({
+            'en': f"""% TEX root = ../../../Main.tex
+Since the pricing structure is of particular interest, participants who disagreed with G06Q1 ({tex_estimate(ESTIMATES['NOT_REASONABLE'])}, \\ref{{fig:AmountReasonable}}) were given the option to propose their own pricing.
+\\ref{{fig:AmountsConsideredReasonable}} visualizes these suggested price points, grouped by bins of 8 Euros. Interestingly, the most frequently suggested price points were 0 Euros and 100 Euros, with {BETWEEN_0_8:.0f} participants selecting the 0-8 Euro range and {BETWEEN_96_104:.0f} participants selecting the 96-104 Euro range.
+The median suggested amount is {tex_estimate(ESTIMATES['AMOUNT_MEDIAN'], '.0f')} Euros, the mean {tex_estimate(ESTIMATES['AMOUNT_MEAN'], '.0f')} Euros.
+""",
+            'de': f"""% TEX root = ../../../Main.tex
+Da die Preisgestaltung von besonderem Interesse ist, konnten Teilnehmende, die G06Q1 nicht zustimmten ({tex_estimate(ESTIMATES['NOT_REASONABLE'])}, \\ref{{fig:AmountReasonable}}), einen eigenen Preis vorschlagen.
+\\ref{{fig:AmountsConsideredReasonable}} zeigt diese vorgeschlagenen Preise, gruppiert in Intervalle von 8 Euro. Interessanterweise wurden 0 Euro und 100 Euro am häufigsten vorgeschlagen: {BETWEEN_0_8:.0f} Teilnehmende wählten den Bereich von 0-8 Euro und {BETWEEN_96_104:.0f} Teilnehmende den Bereich von 96-104 Euro.
+Der Median der vorgeschlagenen Beträge liegt bei {tex_estimate(ESTIMATES['AMOUNT_MEDIAN'], '.0f')} Euro, der Mittelwert bei {tex_estimate(ESTIMATES['AMOUNT_MEAN'], '.0f')} Euro.
+""",
+        }))
+
+    # Fairness
+    with snippet(folder, 'Fairness.tex') as f:
+        f.write(translate({
+            'en': f"""% TEX root = ../../../Main.tex
+Interestingly whilst {tex_estimate(ESTIMATES['REASONABLE'])} of participants thought the amount was appropriate and {tex_estimate(ESTIMATES['SUPPORT'])} supported the \\gls{{dt}} in the \\gls{{fsm}}, {tex_estimate(ESTIMATES['UNFAIR'])} of all participants answering this question thought the concept was unfair with {tex_estimate(ESTIMATES['VERY_UNFAIR'])} deeming it very unfair.
+""",
+            'de': f"""% TEX root = ../../../Main.tex
+Interessanterweise hielten zwar {tex_estimate(ESTIMATES['REASONABLE'])} der Teilnehmenden den Betrag für angemessen und {tex_estimate(ESTIMATES['SUPPORT'])} unterstützten das \\gls{{dt}} im \\gls{{fsm}}, dennoch hielten {tex_estimate(ESTIMATES['UNFAIR'])} aller Antwortenden das Konzept für unfair, {tex_estimate(ESTIMATES['VERY_UNFAIR'])} sogar für sehr unfair.
+""",
+        }))
+
+    # Significance of the crosstabs of the figures; Ranking questions are tested on their first slot
+    DF_BINNED, G04Q05_BINNED = G04Q05.numeric_to_bins_options(DF_FILTERED, 10, max=50)
+
+    TESTS = [(a.against(b), datasets[name]) for a, b, name in SIGNIFICANCE_TESTS] + [(G04Q05_BINNED.against(G04Q01), DF_BINNED)]
+
+    with snippet(folder, 'SignificanceTable.tex') as f:
+        f.write(f"""% TEX root = ../../../Main.tex
+\\begin{{table}}[H]
+\\centering
+\\begin{{tabular}}{{|p{{0.45\\textwidth}}|c|c|c|c|l|}}
+\\hline
+{translate({'en': 'Questions', 'de': 'Fragen'})} & $n$ & $\\chi^2$ ({translate({'en': 'df', 'de': 'FG'})}) & $V$ & $p$ & {translate({'en': 'Test', 'de': 'Test'})} \\\\
+\\hline
+""")
+
+        for correlation, df in TESTS:
+            significance = correlation.significance(df)
+
+            f.write(
+                f'{escape_tex(correlation.question_a.text)} {translate("against")} {escape_tex(correlation.question_b.text)} & '
+                f'{significance.n} & {significance.statistic:.2f} ({significance.dof}) & {significance.cramers_v:.2f} & '
+                f'{"$<$ 0.001" if significance.p < 0.001 else f"{significance.p:.3f}"} & {translate(significance.method)} \\\\\n'
+            )
+
+        f.write(f"""\\hline
+\\end{{tabular}}
+\\caption{{{translate({'en': 'Tests of independence of the answers shown in the bar charts (ranking questions on their first slot)', 'de': 'Unabhängigkeitstests der in den Balkendiagrammen gezeigten Antworten (Rangfragen auf ihrem ersten Rang)'})}}}
+\\label{{tab:SignificanceTable}}
+\\end{{table}}
+""")
+
+    # How often do these words appear in the last question (Free Text)
+    COUNTS = WORD_GROUPS.counts(DF_FILTERED[G08Q01.code], WEIGHTS)
+
+    COUNTS_TUPLES_SORTED = sorted(COUNTS.items(), key=lambda x: x[1], reverse=True)
+
+    # Write the LaTeX Table
+    with snippet(folder, 'WordCountTable.tex') as f:
+        f.write(f"""% TEX root = ../../../Main.tex
+\\begin{{table}}[H]
+\\centering
+\\begin{{tabular}}{{|l|c|}}
+\\hline
+{translate({'en': 'Word Group', 'de': 'Wortgruppe'})} & {translate({'en': 'Count', 'de': 'Anzahl'})} \\\\
+\\hline
+""")
+
+        for key, value in COUNTS_TUPLES_SORTED:
+            f.write(f'{translate(WORD_GROUP_TEXTS[key])} & {value:.0f} \\\\\n')
+
+        f.write(f"""\\hline
+\\end{{tabular}}
+\\caption{{{translate({'en': 'Counts per Word Group in the last question (Free Text)', 'de': 'Anzahl je Wortgruppe in der letzten Frage (Freitext)'})}}}
+\\label{{tab:WordCountTable}}
+\\end{{table}}
+""")
+
+    # Most frequent terms and phrases in the last question (Free Text)
+    TEXT_INDEX = TextIndex(G08Q01, DF_FILTERED)
+
+    TOP_TERMS = TEXT_INDEX.top_k(TOP_TERMS_COUNT, n=1)
+    TOP_PHRASES = TEXT_INDEX.top_k(TOP_TERMS_COUNT, n=2)
+
+    with snippet(folder, 'TopTermsTable.tex') as f:
+        f.write(f"""% TEX root = ../../../Main.tex
+\\begin{{table}}[H]
+\\centering
+\\begin{{tabular}}{{|l|c|l|c|}}
+\\hline
+{translate({'en': 'Term', 'de': 'Begriff'})} & {translate({'en': 'Answers', 'de': 'Antworten'})} & {translate({'en': 'Phrase', 'de': 'Wortfolge'})} & {translate({'en': 'Answers', 'de': 'Antworten'})} \\\\
+\\hline
+""")
+
+        for i in range(max(len(TOP_TERMS), len(TOP_PHRASES))):
+            term = f'{escape_tex(TOP_TERMS.term[i])} & {TOP_TERMS.answers[i]}' if i < len(TOP_TERMS) else ' & '
+            phrase = f'{escape_tex(TOP_PHRASES.term[i])} & {TOP_PHRASES.answers[i]}' if i < len(TOP_PHRASES) else ' & '
+
+            f.write(f'{term} & {phrase} \\\\\n')
+
+        f.write(f"""\\hline
+\\end{{tabular}}
+\\caption{{{translate({'en': 'Most frequent terms and phrases in the last question (Free Text)', 'de': 'Häufigste Begriffe und Wortfolgen in der letzten Frage (Freitext)'})}}}
+\\label{{tab:TopTermsTable}}
+\\end{{table}}
+""")
+
+    ## Groups used
+    with snippet(folder, 'WordCountGroupsTable.tex') as f:
+        f.write(f"""% TEX root = ../../../Main.tex
+\\begin{{table}}[H]
+\\centering
+\\begin{{tabular}}{{|l|c|}}
+\\hline
+{translate({'en': 'Word Group', 'de': 'Wortgruppe'})} & {translate({'en': 'Words', 'de': 'Wörter'})} \\\\
+\\hline
+""")
+
+        for key, value in WORDS.items():
+            f.write(f'{translate(WORD_GROUP_TEXTS[key])} & {" \\\\\n & ".join(v.replace('€', '\\texttt{\\{euro\\}}') for v in value)} \\\\\n')
+
+        f.write(f"""\\hline
+\\end{{tabular}}
+\\caption{{{translate({'en': 'Groups used in the Word Count Table', 'de': 'Verwendete Wortgruppen der Tabelle der Wortzählung'})}}}
+\\label{{tab:WordCountGroupsTable}}
+\\end{{table}}
+""")
@@ -0,0 +1,266 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark the evaluation end to end on synthetic LimeSurvey exports of increasing size.
+"""
+
+import argparse
+from contextlib import redirect_stdout
+from datetime import datetime
+import gc
+import io
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from Evaluation.Classes import FigureSpec
+from Evaluation.Data.Questions.language import LANGUAGES, use_language
+
+# Numbers of responses of the synthetic exports
+SIZES = [1_000, 100_000, 1_000_000]
+
+class Benchmark:
+    """
+    Wall and CPU times and the peak of the traced memory of the stages of the evaluation, by export size.
+
+    Every run of a stage starts with empty transform caches, so no stage reuses the memoized results of another one.
+    The memory is traced in a separate run, as tracing slows down the allocations of the timed runs.
+    """
+
+    __repeat: int
+    __memory: bool
+    __folder: str
+
+    __results: List[Dict[str, Any]]
+
+    def __init__(self, folder: str, repeat: int=1, memory: bool=True):
+        self.__folder = folder
+        self.__repeat = repeat
+        self.__memory = memory
+        self.__results = []
+
+    @property
+    def results(self) -> List[Dict[str, Any]]:
+        return self.__results
+
+    def caches(self):
+        # Import the questions only once the benchmark runs
+        from Evaluation.Data.Questions.memo import TransformCache
+        from Evaluation.Data.Questions.question import Question
+        from Evaluation.Data.Questions.store import ResultStore
+
+        return Question.caches(TransformCache(), ResultStore(tempfile.mkdtemp(dir=self.__folder, prefix='cache-')))
+
+    def measure(self, size: int, stage: str, function: Callable[[], Any]) -> Any:
+        """
+        Run `function` as the stage of the export of `size` responses and record it; Returns the result of the last run.
+        """
+
+        wall = []
+        cpu = []
+
+        for _ in range(self.__repeat):
+            gc.collect()
+
+            with self.caches():
+                start_wall, start_cpu = time.perf_counter(), time.process_time()
+                result = function()
+                wall.append(time.perf_counter() - start_wall)
+                cpu.append(time.process_time() - start_cpu)
+
+        peak = None
+
+        if self.__memory:
+            gc.collect()
+
+            with self.caches():
+                tracemalloc.start()
+
+                try:
+                    function()
+                    peak = tracemalloc.get_traced_memory()[1]
+                finally:
+                    tracemalloc.stop()
+
+        self.__results.append({'size': size, 'stage': stage, 'wall': wall, 'cpu': cpu, 'peak_bytes': peak})
+
+        memory = f', peak {peak / 2 ** 20:.1f} MiB' if peak is not None else ''
+        print(f'\x1b[1;32m[INFO]\x1b[0m {size:>9} {stage:<45} {min(wall):9.3f} s (CPU {min(cpu):.3f} s){memory}')
+
+        return result
+
+    def report(self, **environment: Any) -> Dict[str, Any]:
+        return {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'environment': {
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                **environment,
+            },
+            'repeat': self.__repeat,
+            'results': self.__results,
+        }
+
+def versions() -> Dict[str, str]:
+    import matplotlib
+    import numpy
+    import pandas
+
+    return {'numpy': numpy.__version__, 'pandas': pandas.__version__, 'matplotlib': matplotlib.__version__}
+
+def render_figure(spec: FigureSpec, datasets: Any, folder: str, language: str) -> None:
+    """
+    Render a figure into `folder` (its build folders are relative to the working directory), without its log.
+    """
+
+    cwd = os.getcwd()
+    os.chdir(folder)
+
+    try:
+        with redirect_stdout(io.StringIO()), use_language(language):
+            spec.save_fig(force=True, language=language).render(lambda fig: spec.draw(fig, datasets))
+    finally:
+        os.chdir(cwd)
+
+def benchmark_size(benchmark: Benchmark, export: Any, size: int, folder: str, specs: List[FigureSpec], language: str) -> None:
+    """
+    Benchmark the stages of the evaluation on a synthetic export of `size` responses.
+    """
+
+    from Evaluation.Data.Questions import G04Q01, G04Q05, G08Q01
+    from Evaluation.Data.Questions.text_index import TextIndex
+    from Evaluation.Data.reader import read_responses
+    from Evaluation.Data.snapshot import Snapshot
+    from Evaluation.datasets import Datasets, survey_filters
+    from Evaluation.tex import SIGNIFICANCE_TESTS, TOP_TERMS_COUNT, WORD_GROUPS
+
+    filename = os.path.join(folder, f'synthetic-{size}.json')
+
+    benchmark.measure(size, 'generate', lambda: export.write(filename, size))
+
+    # Ingestion: Streaming the export into typed columns, writing and mapping its snapshot
+    df = benchmark.measure(size, 'read_responses', lambda: read_responses(filename, export.schema))
+
+    snapshot = Snapshot(filename, export.schema, folder=os.path.join(folder, 'snapshots'))
+
+    benchmark.measure(size, 'snapshot_save', lambda: snapshot.save(df))
+    benchmark.measure(size, 'snapshot_load', snapshot.load)
+
+    def filter_all() -> Datasets:
+        datasets = Datasets(survey_filters(lambda: df))
+
+        for name in datasets:
+            datasets[name]
+
+        return datasets
+
+    datasets = benchmark.measure(size, 'filter_chain', filter_all)
+
+    DF_FILTERED = datasets['DF_FILTERED']
+
+    benchmark.measure(size, 'merge_ranks', lambda: G04Q01.merge_ranks(DF_FILTERED))
+    benchmark.measure(size, 'numeric_to_bins_options', lambda: G04Q05.numeric_to_bins_options(DF_FILTERED, 10, max=50))
+    benchmark.measure(size, 'crosstab', lambda: [
+        question_a.against(question_b).crosstab(datasets[name]) for question_a, question_b, name in SIGNIFICANCE_TESTS
+    ])
+
+    # Word counting of the free texts
+    benchmark.measure(size, 'word_groups', lambda: WORD_GROUPS.counts(DF_FILTERED[G08Q01.code]))
+    benchmark.measure(size, 'text_index', lambda: TextIndex(G08Q01, DF_FILTERED).top_k(TOP_TERMS_COUNT))
+
+    for spec in specs:
+        benchmark.measure(size, f'figure:{spec.name}', lambda: render_figure(spec, datasets, folder, language))
+
+    os.unlink(filename)
+
+def compare(results: List[Dict[str, Any]], filename: str) -> None:
+    """
+    Print the ratio of the fastest wall time of each stage to the one of an earlier report.
+    """
+
+    with open(filename, 'r') as f:
+        previous = {(result['size'], result['stage']): result for result in json.load(f)['results']}
+
+    print(f'\x1b[1;32m[INFO]\x1b[0m Compared to {filename}:')
+
+    for result in results:
+        before = previous.get((result['size'], result['stage']))
+
+        if before is None:
+            continue
+
+        ratio = min(result['wall']) / max(min(before['wall']), 1e-9)
+
+        # Flag stages at least 20% slower
+        color = 33 if ratio >= 1.2 else 32
+
+        print(f'\x1b[1;{color}m[INFO]\x1b[0m {result["size"]:>9} {result["stage"]:<45} {min(before["wall"]):9.3f} s -> {min(result["wall"]):9.3f} s ({ratio:.2f}x)')
+
+def main(argv: List[str] | None=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', nargs='+', type=int, default=SIZES, help='Numbers of responses of the synthetic exports (default: %(default)s)')
+    parser.add_argument('--figures', nargs='*', metavar='PATTERN', help='Only render the figures matching these names or glob patterns; None without patterns')
+    parser.add_argument('--repeat', type=int, default=1, help='Timed runs per stage; The fastest one is reported')
+    parser.add_argument('--no-memory', action='store_true', help='Do not trace the peak memory of the stages')
+    parser.add_argument('--template', default='latest', help="Export to resample the answers from: A file, 'latest' (default) or 'none'")
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic exports')
+    parser.add_argument('--lang', choices=LANGUAGES, default=LANGUAGES[0], help='Language of the figures')
+    parser.add_argument('--output', help='JSON report to write (default: Build/Benchmarks/<date>.json)')
+    parser.add_argument('--compare', metavar='REPORT', help='Earlier JSON report to compare the wall times with')
+    parser.add_argument('--write-export', metavar='FILE', help='Only write a synthetic export of the first size to FILE and exit')
+
+    args = parser.parse_args(argv)
+
+    from Evaluation.Data import latest_export, load
+    from Evaluation.Data.synthetic import SyntheticExport
+
+    # Register the figures
+    import Evaluation.figures
+
+    template = None
+
+    if args.template != 'none':
+        filename = latest_export() if args.template == 'latest' else args.template
+        template = load(filename)
+
+        print(f'\x1b[1;32m[INFO]\x1b[0m Resampling the answers of {filename} ({len(template)} responses)')
+
+    export = SyntheticExport(template=template, seed=args.seed)
+
+    if args.write_export:
+        export.write(args.write_export, args.sizes[0])
+        print(f'\x1b[1;32m[INFO]\x1b[0m Wrote {args.sizes[0]} responses to {args.write_export}')
+        return
+
+    specs = FigureSpec.select(args.figures) if args.figures is None or args.figures else []
+
+    output = args.output or os.path.join('Build/Benchmarks', f'{datetime.now():%Y%m%d-%H%M%S}.json')
+    folder = tempfile.mkdtemp(prefix='benchmark-')
+
+    benchmark = Benchmark(folder, repeat=args.repeat, memory=not args.no_memory)
+
+    try:
+        for size in args.sizes:
+            benchmark_size(benchmark, export, size, folder, specs, args.lang)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+        if benchmark.results:
+            os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+
+            with open(output, 'w') as f:
+                json.dump(benchmark.report(seed=args.seed, template=template is not None, **versions()), f, indent=1)
+
+            print(f'\x1b[1;32m[INFO]\x1b[0m Wrote {output}')
+
+    if args.compare:
+        compare(benchmark.results, args.compare)
+
+if __name__ == '__main__':
+    main()
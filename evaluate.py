@@ -5,4 +5,119 @@ Evaluate the survey results from LimeSurvey using pandas
 and matplotlib.
 """
 
-import Evaluation
\ No newline at end of file
+import argparse
+import os
+from typing import List
+
+from Evaluation.Classes import ARTIFACTS, FORMATS, FigureSpec, plan_figures, render_figures
+from Evaluation.Data.Questions.instrumentation import RECORDER
+from Evaluation.Data.Questions.language import LANGUAGES, use_language
+
+# Report of the stages of a run with --report
+REPORT = 'Build/Report.json'
+
+# Files the last run created, changed or left unchanged
+CHANGES = 'Build/Changes.json'
+
+def run(
+        patterns: List[str] | None=None,
+        force: bool=False,
+        workers: int | None=None,
+        languages: List[str]=LANGUAGES,
+        weighted: bool=False,
+        report: str | None=None,
+        trace_memory: bool=False,
+        profile: List[str] | None=None,
+        format: str | None=None,
+        preview: bool=False,
+        changes: str | None=CHANGES
+    ) -> None:
+    """
+    Write the TeX snippets and render the outdated figures matching `patterns` (all figures by default) in each of the `languages`.
+
+    With `weighted`, the respondents are raked to the known faculty distribution. With a `report` file, the wall and CPU time
+    of every stage (and its peak memory with `trace_memory`) and the cache hits of the transforms are written to it as JSON
+    and printed as a table. The figures matching `profile` are profiled with cProfile.
+
+    Figures are saved as `format` (SVG by default, included with \\includesvg; Others with \\includegraphics, so
+    LaTeX does not convert them), unless they have a format of their own; With `preview`, PNG previews are saved as well.
+
+    Figures and snippets are only written if their content changed; The files written are listed in `changes`.
+    """
+
+    import Evaluation.figures
+    from Evaluation.datasets import load_datasets
+    from Evaluation.tex import write_tex
+
+    specs = FigureSpec.select(patterns)
+
+    if report is not None:
+        RECORDER.enable(memory=trace_memory)
+
+    try:
+        with RECORDER.stage('load_datasets', 'load'):
+            datasets = load_datasets(weighted)
+
+        for language in languages:
+            with use_language(language), RECORDER.stage(f'write_tex [{language}]', 'tex'):
+                write_tex(datasets)
+
+        # Render the outdated figures of all languages in parallel
+        with RECORDER.stage('render_figures', 'render'):
+            render_figures(specs, datasets, workers=workers, force=force, languages=languages, profile=profile, format=format, preview=preview)
+
+        if changes is not None:
+            ARTIFACTS.write_manifest(changes)
+            print(f'\x1b[1;32m[INFO]\x1b[0m Files: {ARTIFACTS.format()}; Listed in {changes}')
+    finally:
+        if report is not None:
+            RECORDER.write(report)
+            RECORDER.disable()
+
+            print(RECORDER.format())
+            print(f'\x1b[1;32m[INFO]\x1b[0m Wrote the report to {report}')
+
+def main(argv: List[str] | None=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--list', action='store_true', help='List the registered figures and exit')
+    parser.add_argument('--only', nargs='+', metavar='PATTERN', help='Only build the figures matching these names or glob patterns')
+    parser.add_argument('--dry-run', action='store_true', help='Print which of the selected figures are outdated and exit')
+    parser.add_argument('--force', action='store_true', help='Rebuild the selected figures even if they are up to date')
+    parser.add_argument(
+        '--jobs', '-j', type=int, default=int(os.environ.get('EVALUATION_WORKERS', 0)) or None,
+        help='Number of processes rendering the figures (default: all cores)'
+    )
+    parser.add_argument('--lang', nargs='+', choices=LANGUAGES, default=LANGUAGES, help='Languages to render (default: all)')
+    parser.add_argument('--weighted', action='store_true', help='Weight the respondents to the known faculty distribution (raking)')
+    parser.add_argument('--report', nargs='?', const=REPORT, metavar='FILE', help=f'Time every stage of the run and write the report (default: {REPORT})')
+    parser.add_argument('--trace-memory', action='store_true', help='Trace the peak memory of every stage (slower; implies --report)')
+    parser.add_argument('--profile', nargs='+', metavar='PATTERN', help='Profile the figures matching these names or glob patterns with cProfile (into Build/Profiles)')
+    parser.add_argument('--format', choices=FORMATS, help='Format of the figures without one of their own (default: svg); Only SVG is converted by LaTeX')
+    parser.add_argument('--preview', action='store_true', help='Save a PNG preview next to every figure')
+
+    args = parser.parse_args(argv)
+
+    if args.list or args.dry_run:
+        # Register the figures without loading the survey results or matplotlib
+        import Evaluation.figures
+
+        specs = FigureSpec.select(args.only)
+
+        if args.list:
+            for spec in specs:
+                print(f'{spec.name:<45} {", ".join(spec.inputs) or "-":<22} {spec.caption!r}')
+        else:
+            from Evaluation.datasets import load_datasets
+
+            for spec, _, outdated in plan_figures(specs, load_datasets(args.weighted), args.lang, args.format, args.preview):
+                outdated = args.lang if args.force else outdated
+                print(f'{"rebuild" if outdated else "skip":<8} {spec.name:<45} {", ".join(outdated)}')
+    else:
+        run(
+            args.only, force=args.force, workers=args.jobs, languages=args.lang, weighted=args.weighted,
+            report=args.report or (REPORT if args.trace_memory else None), trace_memory=args.trace_memory, profile=args.profile,
+            format=args.format, preview=args.preview
+        )
+
+if __name__ == '__main__':
+    main()